@@ -0,0 +1,154 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+CRQMClient benchmark suite against the local RQM mock server.
+
+    - paging: fetch all entries of a multi-page feed
+    - listener: RQM overhead per test as done by FunctionListener.end_test
+    - import: full-suite throughput of RQMImporter from output.xml
+
+python scripts/benchmark/rqm_client.py --tests 200 --latency 5
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+from loguru import logger
+
+ROOT = os.sep.join(os.path.abspath(__file__).split(os.sep)[:-3])
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from rqm_mock_server import PROJECT_NAME, start_server
+
+from vta.core.rqm.CRQM import CRQMClient
+from vta.core.rqm.RQMImporter import RQMImporter
+
+PLAN_ID = "1"
+
+
+def connect(port: int) -> CRQMClient:
+    client = CRQMClient("mock", "mock", PROJECT_NAME, f"http://127.0.0.1:{port}")
+    if not client.login():
+        raise Exception("Login mock server failed!")
+    client.config(PLAN_ID)
+    return client
+
+
+def write_output(file: Path, tests: int) -> None:
+    now = datetime.now().isoformat()
+    with open(file, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<robot schemaversion="5">\n')
+        f.write('<suite id="s1" name="Benchmark">\n')
+        for i in range(tests):
+            status = "PASS" if i % 10 else "FAIL"
+            f.write(
+                f'<test id="s1-t{i}" name="Test_{i}"><tag>bench</tag>'
+                f'<status status="{status}" start="{now}" elapsed="0.5"/></test>\n'
+            )
+        f.write(f'<status status="FAIL" start="{now}" elapsed="1.0"/>\n</suite>\n')
+        f.write("</robot>\n")
+
+
+def report(name: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+    logger.info(
+        f"{name:<10} n={len(samples):<5} mean: {statistics.mean(samples) * 1000:8.2f}ms  "
+        f"p50: {statistics.median(samples) * 1000:8.2f}ms  p95: {p95 * 1000:8.2f}ms"
+    )
+
+
+def bench_paging(server, port: int, entries: int) -> None:
+    server.RequestHandlerClass.store.seed("buildrecord", entries)
+    client = connect(port)
+    start = time.perf_counter()
+    res = client.getAllByResource("buildrecord")
+    elapsed = time.perf_counter() - start
+    client.disconnect()
+    logger.info(
+        f"{'paging':<10} entries={len(res['data'])} "
+        f"pages={-(-entries // server.RequestHandlerClass.store.page_size)} "
+        f"elapsed: {elapsed * 1000:.2f}ms"
+    )
+
+
+def bench_listener(server, port: int, tests: int) -> None:
+    client = connect(port)
+    samples = []
+    for i in range(tests):
+        name = f"Listener_{i}"
+        res = client.createResource("testcase", client.createTestcaseTemplate(name))
+        tc_id = res["id"]
+        client.createResource(
+            "executionworkitem", client.createTCERTemplate(tc_id, name, PLAN_ID)
+        )
+        # FunctionListener._upload_test_case_result
+        start = time.perf_counter()
+        tcer_id = client.getTCERbyTPandID(tp_id=PLAN_ID, tc_id=tc_id)
+        content = client.createExecutionResultTemplate(
+            testcaseID=tc_id,
+            testcaseName=name,
+            TCERID=tcer_id,
+            resultState="passed",
+        )
+        client.createResource(resourceType="executionresult", content=content)
+        samples.append(time.perf_counter() - start)
+    client.disconnect()
+    report("listener", samples)
+
+
+def bench_import(server, port: int, tests: int, workers: int) -> None:
+    client = connect(port)
+    store = server.RequestHandlerClass.store
+    for i in range(tests):
+        client.createResource("testcase", client.createTestcaseTemplate(f"Test_{i}"))
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "output_1.xml"
+        write_output(output, tests)
+        requests_before = store.requests
+        start = time.perf_counter()
+        RQMImporter(client, PLAN_ID, workers=workers, rate=0).run(Path(tmp))
+        elapsed = time.perf_counter() - start
+    metrics = client.getRequestMetrics()
+    client.disconnect()
+    for method, metric in metrics.items():
+        logger.info(
+            f"{'transport':<10} {method:<4} n={metric['count']:<5} "
+            f"mean: {metric['mean'] * 1000:8.2f}ms  max: {metric['max'] * 1000:8.2f}ms"
+        )
+    logger.info(
+        f"{'import':<10} tests={tests} workers={workers} "
+        f"requests={store.requests - requests_before} elapsed: {elapsed:.2f}s  "
+        f"throughput: {tests / elapsed:.1f} tests/s"
+    )
+
+
+@click.command()
+@click.option("--tests", default=100, type=int, help="number of tests")
+@click.option("--entries", default=500, type=int, help="feed entries for paging")
+@click.option("--workers", default=4, type=int, help="importer workers")
+@click.option("--latency", default=0, type=int, help="mock server latency in ms")
+def main(tests: int, entries: int, workers: int, latency: int) -> None:
+    logger.remove()
+    logger.add(sys.stdout, level="INFO")
+    server = start_server(latency=latency / 1000)
+    port = server.server_port
+    try:
+        bench_paging(server, port, entries)
+        bench_listener(server, port, tests)
+        bench_import(server, port, tests, workers)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
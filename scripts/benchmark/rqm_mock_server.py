@@ -0,0 +1,284 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Local mock of the RQM/ETM endpoints used by `vta.core.rqm.CRQM`.
+
+Implemented:
+    - POST /qm/j_security_check
+    - GET  /qm/process/project-areas
+    - GET  /qm/process/project-areas/{project}/team-areas
+    - GET  .../IIntegrationService/resources/{project}/{type}[?page=N]  (feed paging)
+    - GET  .../IIntegrationService/resources/{project}/{type}?fields=...  (filters)
+    - GET  .../IIntegrationService/resources/{project}/{type}/{id}
+    - POST .../IIntegrationService/resources/{project}/{type}  (201/303 + Content-Location)
+    - PUT  .../IIntegrationService/resources/{project}/{type}/{id}
+
+python scripts/benchmark/rqm_mock_server.py --port 8443 --latency 20
+"""
+import itertools
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import click
+from loguru import logger
+from lxml import etree
+
+INTEGRATION = (
+    "/qm/service/com.ibm.rqm.integration.service.IIntegrationService/resources/"
+)
+PROJECT_NAME = "Mock"
+PROJECT_ID = "_mockProjectUUID"
+TEAMS = ["TeamA", "TeamB"]
+
+NS_ATOM = "http://www.w3.org/2005/Atom"
+NS_QM = "http://jazz.net/xmlns/alm/qm/v0.1/"
+NS_DC = "http://purl.org/dc/elements/1.1/"
+NS_PROCESS = "http://jazz.net/xmlns/prod/jazz/process/0.6/"
+
+
+class MockStore:
+    """
+    In-memory RQM resources: {resource type: {web id: title}}.
+    """
+
+    def __init__(self, page_size: int = 50) -> None:
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1000)
+        self.resources: dict[str, dict[str, str]] = {}
+        self.requests = 0
+
+    def add(self, resource_type: str, title: str) -> tuple[str, bool]:
+        """
+        Return (web id, created), existing id is returned for duplicated title
+        except for execution results which are always created.
+        """
+        with self.lock:
+            entries = self.resources.setdefault(resource_type, {})
+            if resource_type != "executionresult":
+                for web_id, existing in entries.items():
+                    if existing == title:
+                        return web_id, False
+            web_id = str(next(self.counter))
+            entries[web_id] = title
+            return web_id, True
+
+    def seed(self, resource_type: str, count: int, prefix: str = "") -> None:
+        for i in range(count):
+            self.add(resource_type, f"{prefix or resource_type}_{i}")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    store: MockStore
+    latency: float = 0.0
+
+    def log_message(self, format, *args) -> None:
+        logger.trace(format % args)
+
+    def _host(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    def _resource_url(self, resource_type: str, web_id: Optional[str] = None) -> str:
+        url = f"{self._host()}{INTEGRATION}{PROJECT_ID}/{resource_type}"
+        if web_id is not None:
+            url += f"/urn:com.ibm.rqm:{resource_type}:{web_id}"
+        return url
+
+    def _reply(
+        self, code: int, body: bytes = b"", headers: Optional[dict] = None
+    ) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self.store.requests += 1
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _split_path(self) -> tuple[list[str], dict]:
+        parsed = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        path = parsed.path[len(INTEGRATION) :]
+        return [urllib.parse.unquote(p) for p in path.split("/") if p], query
+
+    # ---------------------------------------------------------------- xml bodies
+
+    def _project_areas(self) -> bytes:
+        root = etree.Element(
+            f"{{{NS_PROCESS}}}project-areas", nsmap={"jp06": NS_PROCESS}
+        )
+        area = etree.SubElement(root, f"{{{NS_PROCESS}}}project-area")
+        area.set(f"{{{NS_PROCESS}}}name", PROJECT_NAME)
+        url = etree.SubElement(area, f"{{{NS_PROCESS}}}url")
+        url.text = f"{self._host()}/qm/process/project-areas/{PROJECT_ID}"
+        return etree.tostring(root)
+
+    def _team_areas(self) -> bytes:
+        root = etree.Element(f"{{{NS_PROCESS}}}team-areas", nsmap={"jp06": NS_PROCESS})
+        for team in TEAMS:
+            area = etree.SubElement(root, f"{{{NS_PROCESS}}}team-area")
+            area.set(f"{{{NS_PROCESS}}}name", team)
+            url = etree.SubElement(area, f"{{{NS_PROCESS}}}url")
+            url.text = f"{self._host()}/qm/process/project-areas/{PROJECT_ID}/team-areas/{team}"
+        return etree.tostring(root)
+
+    def _feed(
+        self, resource_type: str, entries: list[tuple[str, str]], page: int = 0
+    ) -> bytes:
+        root = etree.Element(f"{{{NS_ATOM}}}feed", nsmap={None: NS_ATOM, "ns2": NS_QM})
+        size = self.store.page_size
+        for web_id, title in entries[page * size : (page + 1) * size]:
+            entry = etree.SubElement(root, f"{{{NS_ATOM}}}entry")
+            etree.SubElement(entry, f"{{{NS_ATOM}}}id").text = self._resource_url(
+                resource_type, web_id
+            )
+            etree.SubElement(entry, f"{{{NS_ATOM}}}title").text = title
+            content = etree.SubElement(entry, f"{{{NS_ATOM}}}content")
+            resource = etree.SubElement(content, f"{{{NS_QM}}}{resource_type}")
+            etree.SubElement(resource, f"{{{NS_QM}}}webId").text = web_id
+        if (page + 1) * size < len(entries):
+            link = etree.SubElement(root, f"{{{NS_ATOM}}}link")
+            link.set("rel", "next")
+            link.set("href", f"{self._resource_url(resource_type)}?page={page + 1}")
+        return etree.tostring(root)
+
+    def _resource(self, resource_type: str, web_id: str, title: str) -> bytes:
+        root = etree.Element(
+            f"{{{NS_QM}}}{resource_type}", nsmap={"ns2": NS_QM, "ns3": NS_DC}
+        )
+        etree.SubElement(root, f"{{{NS_QM}}}webId").text = web_id
+        etree.SubElement(root, f"{{{NS_DC}}}title").text = title
+        if resource_type == "testcase":
+            script = etree.SubElement(root, f"{{{NS_QM}}}testscript")
+            script.set("href", self._resource_url("testscript", "1"))
+        if resource_type == "testsuite":
+            etree.SubElement(root, f"{{{NS_QM}}}suiteelements")
+        return etree.tostring(root)
+
+    # ------------------------------------------------------------------ handlers
+
+    def do_POST(self) -> None:
+        body = self._read_body()
+        if self.path.startswith("/qm/j_security_check"):
+            self._reply(200, headers={"Set-Cookie": "JSESSIONID=mock-session; Path=/"})
+            return
+        if not self.path.startswith(INTEGRATION):
+            self._reply(404)
+            return
+
+        parts, _ = self._split_path()
+        resource_type = parts[1]
+        titles = etree.fromstring(body).xpath("//*[local-name()='title']/text()")
+        web_id, created = self.store.add(resource_type, titles[0] if titles else "")
+        location = self._resource_url(resource_type, web_id)
+        if not created:
+            self._reply(303, headers={"Content-Location": location})
+        elif resource_type == "executionresult":
+            self._reply(
+                201,
+                (
+                    '<rqm:result xmlns:rqm="http://schema.ibm.com/rqm/2007#">'
+                    f"<rqm:resultId>{web_id}</rqm:resultId></rqm:result>"
+                ).encode(),
+                headers={"Content-Location": location},
+            )
+        else:
+            # generated external ID (slug) as returned by RQM
+            self._reply(201, headers={"Content-Location": f"slug_{web_id}"})
+
+    def do_PUT(self) -> None:
+        self._read_body()
+        self._reply(200)
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/qm/process/project-areas"):
+            if self.path.rstrip("/").endswith("team-areas"):
+                self._reply(200, self._team_areas())
+            else:
+                self._reply(200, self._project_areas())
+            return
+        if not self.path.startswith(INTEGRATION):
+            self._reply(404)
+            return
+
+        parts, query = self._split_path()
+        # `webIDfromTitle` requests resources without project
+        if len(parts) == 1:
+            parts = [PROJECT_ID] + parts
+        resource_type = parts[1]
+        entries = self.store.resources.get(resource_type, {})
+
+        if "fields" in query:
+            fields = query["fields"][0]
+            title = re.search(r"\[title='(.*)'\]", fields)
+            testcase = re.search(r"testcase\[@href='[^']*:(\d+)'\]", fields)
+            if testcase:
+                # `getTCERbyTPandID`: TCER is titled after its testcase
+                testcases = self.store.resources.get("testcase", {})
+                title = "TCER: " + testcases.get(testcase.group(1), "")
+                matched = [(k, v) for k, v in entries.items() if v == title]
+            elif title:
+                matched = [(k, v) for k, v in entries.items() if v == title.group(1)]
+            else:
+                matched = list(entries.items())
+            self._reply(200, self._feed(resource_type, matched))
+        elif len(parts) == 2:
+            page = int(query.get("page", ["0"])[0])
+            self._reply(200, self._feed(resource_type, list(entries.items()), page))
+        else:
+            web_id = parts[2].split(":")[-1].replace("slug_", "")
+            if resource_type in ("testplan", "testscript"):
+                self._reply(200, self._resource(resource_type, web_id, web_id))
+            elif web_id in entries:
+                self._reply(200, self._resource(resource_type, web_id, entries[web_id]))
+            else:
+                self._reply(404)
+
+
+def start_server(
+    port: int = 0, latency: float = 0.0, page_size: int = 50
+) -> ThreadingHTTPServer:
+    """
+    Start mock server in a daemon thread, port 0 picks a free port.
+    """
+    handler = type(
+        "Handler",
+        (MockHandler,),
+        {"store": MockStore(page_size), "latency": latency},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"RQM mock server listening on http://127.0.0.1:{server.server_port}")
+    return server
+
+
+@click.command()
+@click.option("--port", default=8443, type=int, help="listening port")
+@click.option("--latency", default=0, type=int, help="server latency in ms")
+@click.option("--page-size", default=50, type=int, help="entries per feed page")
+def main(port: int, latency: int, page_size: int) -> None:
+    server = start_server(port, latency / 1000, page_size)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Micro-benchmark for CRQM xml templates: parse template file on every call
+vs. deep-copy of the pre-parsed template.
+
+python scripts/benchmark/rqm_templates.py --number 1000
+"""
+import os
+import sys
+import timeit
+
+import click
+from loguru import logger
+
+ROOT = os.sep.join(os.path.abspath(__file__).split(os.sep)[:-3])
+sys.path.append(ROOT)
+from vta.core.rqm.CRQM import get_xml_template, get_xml_tree
+
+TEMPLATES = [
+    "executionresult.xml",
+    "executionworkitem.xml",
+    "suiteexecutionrecord.xml",
+    "testcase.xml",
+    "testsuitelog.xml",
+]
+
+
+@click.command()
+@click.option("--number", default=1000, type=int, help="calls per template")
+def main(number: int) -> None:
+    templates_dir = os.path.join(ROOT, "vta", "core", "rqm", "templates")
+    for template in TEMPLATES:
+        path = os.path.join(templates_dir, template)
+        parse = timeit.timeit(
+            lambda: get_xml_tree(path, bdtd_validation=False), number=number
+        )
+        cached = timeit.timeit(lambda: get_xml_template(path), number=number)
+        logger.info(
+            f"{template:<26} parse: {parse * 1000:8.2f}ms  "
+            f"cached: {cached * 1000:8.2f}ms  speedup: {parse / cached:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,31 +4,62 @@
 # \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
 # ============================================================================================================
 
-import sqlite3
-
-import MySQLdb
+"""
+Import stability rows of a legacy local SQLite database into the database
+buffer and sync them to MySQL.
 
-# SQLite connection
-sqlite_conn = sqlite3.connect("database.db")
-sqlite_cursor = sqlite_conn.cursor()
+Rows get a run ID derived from their content, so running the migration
+again does not duplicate rows. New results are buffered and synced by
+`StabilityListener` itself, see `vta.core.db.DBBuffer`.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+from datetime import datetime
 
-# MySQL connection
-mysql_conn = MySQLdb.connect(
-    host="10.161.235.42", user="ets1szh", passwd="estbangbangde", db="zeekr"
-)
-mysql_cursor = mysql_conn.cursor()
+sys.path.append(os.sep.join(os.path.abspath(__file__).split(os.sep)[:-2]))
+from vta.core.db.DBBuffer import DBBuffer
+from vta.core.dispatcher import register_credential
 
-# Retrieve data from SQLite
-sqlite_cursor.execute(
-    "SELECT soc_version, cus_version, tester, bench_id, test_type, start_time, end_time, error_keyword, result FROM stability"
+COLUMNS = (
+    "soc_version",
+    "cus_version",
+    "tester",
+    "bench_id",
+    "test_type",
+    "start_time",
+    "end_time",
+    "error_keyword",
+    "result",
 )
-rows = sqlite_cursor.fetchall()
 
-# Insert data into MySQL
-insert_query = "INSERT INTO stability (soc_version, cus_version, tester, bench_id, test_type, start_time, end_time, error_keyword, result) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"
-mysql_cursor.executemany(insert_query, rows)
+credential = {
+    "drivername": "mysql",
+    "username": "ets1szh",
+    "password": "estbangbangde",
+    "host": "10.161.235.42",
+    "database": "zeekr",
+}
 
-# Commit changes and close connections
-mysql_conn.commit()
-mysql_conn.close()
+# SQLite connection
+sqlite_conn = sqlite3.connect("database.db")
+rows = sqlite_conn.execute(f"SELECT {', '.join(COLUMNS)} FROM stability").fetchall()
 sqlite_conn.close()
+
+# rows left pending are synced later with DB_CREDENTIAL of vta/conf/settings.py
+register_credential("DB_CREDENTIAL", credential)
+buffer = DBBuffer()
+for row in rows:
+    data = dict(zip(COLUMNS, row))
+    for key in ("start_time", "end_time"):
+        if data[key]:
+            data[key] = datetime.fromisoformat(data[key])
+    run_id = hashlib.sha1(repr(row).encode()).hexdigest()
+    buffer.put("Stability", "DB_CREDENTIAL", data, run_id)
+
+while True:
+    synced, failed = buffer.sync()
+    if failed or not synced:
+        break
+print(f"Migrated {len(rows)} rows, pending: {buffer.pending()}")
@@ -0,0 +1,12 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import sys
+from pathlib import Path
+
+# performance scripts import their siblings by module name, like run.py does
+PERFORMANCE = Path(__file__).parents[1] / "vta" / "tasks" / "performance"
+sys.path.insert(0, str(PERFORMANCE))
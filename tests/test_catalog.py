@@ -0,0 +1,93 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import pytest
+
+from vta.core.runner.catalog import AmbiguousTaskError, TaskCatalog
+
+TASK = """\
+*** Settings ***
+Test Tags       stability
+
+*** Test Cases ***
+GetVersion
+    Log    version
+
+PowerCycle
+    [Tags]    slow
+    Log    cycle
+"""
+
+
+@pytest.fixture
+def tasks(tmp_path):
+    for relative in (
+        "stability/powercycle.robot",
+        "qvta/swup.robot",
+        "stability/swup.robot",
+    ):
+        file = tmp_path / relative
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(TASK)
+    return tmp_path
+
+
+def test_unique_name_is_found(tasks):
+    catalog = TaskCatalog(tasks)
+
+    assert catalog.find("powercycle.robot") == tasks / "stability/powercycle.robot"
+    assert catalog.find("missing.robot") is None
+
+
+def test_duplicated_name_is_ambiguous(tasks):
+    catalog = TaskCatalog(tasks)
+
+    with pytest.raises(AmbiguousTaskError) as error:
+        catalog.find("swup.robot")
+
+    assert error.value.matches == [
+        tasks / "qvta/swup.robot",
+        tasks / "stability/swup.robot",
+    ]
+    assert list(catalog.ambiguous) == ["swup.robot"]
+
+
+def test_relative_path_selects_one_of_duplicates(tasks):
+    catalog = TaskCatalog(tasks)
+
+    assert catalog.find("qvta/swup.robot") == tasks / "qvta/swup.robot"
+
+
+def test_new_file_invalidates_catalog(tasks):
+    catalog = TaskCatalog(tasks)
+    assert catalog.find("new.robot") is None
+
+    (tasks / "qvta" / "new.robot").write_text(TASK)
+
+    assert catalog.find("new.robot") == tasks / "qvta/new.robot"
+
+
+def test_tests_are_read_with_tags(tasks):
+    catalog = TaskCatalog(tasks)
+
+    assert catalog.tests(tasks / "stability/powercycle.robot") == [
+        {"name": "GetVersion", "tags": ["stability"]},
+        {"name": "PowerCycle", "tags": ["stability", "slow"]},
+    ]
+
+
+def test_tasks_are_found_by_tag(tasks):
+    (tasks / "qvta" / "untagged.robot").write_text(
+        "*** Test Cases ***\nGetVersion\n    Log    version\n"
+    )
+    catalog = TaskCatalog(tasks)
+
+    assert catalog.by_tag("SLOW") == [
+        tasks / "qvta/swup.robot",
+        tasks / "stability/powercycle.robot",
+        tasks / "stability/swup.robot",
+    ]
+    assert catalog.by_tag("missing") == []
@@ -0,0 +1,105 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import sqlite3
+
+import pytest
+
+from vta.core import dispatcher
+from vta.core.db.DBBuffer import DBBuffer, DBSyncWorker
+from vta.core.db.DBHelper import DBHelper
+from vta.core.db.DBtables import Stability
+from vta.core.dispatcher import register_credential
+
+
+def row(run_id, result="PASS"):
+    return {
+        "run_id": run_id,
+        "tester": "tester",
+        "bench_id": "bench",
+        "test_type": "powercycle",
+        # datetime columns depend on the sqlmodel version, keep them empty
+        "start_time": None,
+        "end_time": None,
+        "result": result,
+    }
+
+
+def stored(target):
+    with sqlite3.connect(target) as conn:
+        return conn.execute(
+            "SELECT run_id, result FROM stability ORDER BY run_id"
+        ).fetchall()
+
+
+@pytest.fixture
+def target(tmp_path, monkeypatch):
+    monkeypatch.setattr(dispatcher, "_credentials", {})
+    file = tmp_path / "target.db"
+    register_credential(
+        "DB_CREDENTIAL", {"drivername": "sqlite", "database": str(file)}
+    )
+    return file
+
+
+def test_upsert_is_idempotent(target):
+    mdb = DBHelper()
+    mdb.connect(Stability, {"drivername": "sqlite", "database": str(target)})
+    mdb.create_table()
+
+    mdb.upsert([row("a"), row("b")])
+    mdb.upsert([row("a", "FAIL"), row("b")])
+    mdb.disconnect()
+
+    assert stored(target) == [("a", "FAIL"), ("b", "PASS")]
+
+
+def test_buffer_keeps_credential_key_only(tmp_path, target):
+    buffer = DBBuffer(tmp_path / "buffer.db")
+
+    buffer.put("Stability", "DB_CREDENTIAL", row("a"), "a")
+
+    with sqlite3.connect(buffer.file) as conn:
+        assert conn.execute("SELECT credential FROM buffer").fetchall() == [
+            ("DB_CREDENTIAL",)
+        ]
+    with pytest.raises(TypeError):
+        buffer.put("Stability", {"password": "secret"}, row("b"), "b")
+
+
+def test_sync_writes_each_run_once(tmp_path, target):
+    buffer = DBBuffer(tmp_path / "buffer.db")
+    buffer.put("Stability", "DB_CREDENTIAL", row("a"), "a")
+    assert buffer.sync() == (1, 0)
+
+    buffer.put("Stability", "DB_CREDENTIAL", row("a", "FAIL"), "a")
+    buffer.put("Stability", "DB_CREDENTIAL", row("b"), "b")
+    assert buffer.sync() == (2, 0)
+
+    assert buffer.pending() == 0
+    assert stored(target) == [("a", "FAIL"), ("b", "PASS")]
+
+
+def test_unknown_credential_stays_pending(tmp_path, target, monkeypatch):
+    monkeypatch.setattr(dispatcher, "SETTINGS_MODULE", "vta.conf.missing_settings")
+    buffer = DBBuffer(tmp_path / "buffer.db")
+    buffer.put("Stability", "OTHER_CREDENTIAL", row("a"), "a")
+
+    assert buffer.sync() == (0, 1)
+    assert buffer.pending() == 1
+
+
+def test_stopped_worker_syncs_rows_put_before(tmp_path, target):
+    buffer = DBBuffer(tmp_path / "buffer.db")
+    worker = DBSyncWorker(buffer, interval=3600)
+    worker.start()
+
+    buffer.put("Stability", "DB_CREDENTIAL", row("a"), "a")
+    worker.stop()
+    worker.join(10)
+
+    assert not worker.is_alive()
+    assert stored(target) == [("a", "PASS")]
@@ -0,0 +1,74 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import os
+import stat
+
+import pytest
+
+from vta.core import dispatcher
+from vta.core.dispatcher import (
+    Dispatcher,
+    flush_spool,
+    register_credential,
+    resolve_credential,
+)
+
+CREDENTIAL = {"username": "tester", "password": "secret"}
+
+
+@pytest.fixture
+def received(monkeypatch):
+    calls = []
+
+    def handle(payload):
+        calls.append(resolve_credential(payload["credential"]))
+        if payload.get("fail"):
+            raise ConnectionError("relay unreachable")
+
+    monkeypatch.setitem(dispatcher.HANDLERS, "mail", handle)
+    monkeypatch.setattr(dispatcher, "_credentials", {})
+    return calls
+
+
+def test_job_resolves_registered_credential(tmp_path, received):
+    key = register_credential("MAIL_CREDENTIAL", CREDENTIAL)
+    spool = Dispatcher(tmp_path)
+
+    spool.submit("mail", {"credential": key})
+    assert spool.drain(5)
+
+    assert received == [CREDENTIAL]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spooled_job_holds_no_secret(tmp_path, received):
+    key = register_credential("MAIL_CREDENTIAL", CREDENTIAL)
+    spool = Dispatcher(tmp_path / "spool")
+
+    file = spool.submit("mail", {"credential": key, "fail": True})
+    assert spool.drain(5)
+
+    assert received == [CREDENTIAL]
+    assert "secret" not in file.read_text()
+    if os.name == "posix":
+        assert stat.S_IMODE(file.stat().st_mode) == 0o600
+        assert stat.S_IMODE(spool.spool_dir.stat().st_mode) == 0o700
+
+
+def test_credential_is_not_accepted(tmp_path, received):
+    with pytest.raises(TypeError):
+        Dispatcher(tmp_path).submit("mail", {"credential": CREDENTIAL})
+
+
+def test_unknown_credential_keeps_job_spooled(tmp_path, received, monkeypatch):
+    monkeypatch.setattr(dispatcher, "SETTINGS_MODULE", "vta.conf.missing_settings")
+    spool = Dispatcher(tmp_path)
+    spool.submit("mail", {"credential": "MAIL_CREDENTIAL"})
+    assert spool.drain(5)
+
+    assert received == []
+    assert flush_spool(tmp_path) == (0, 1)
@@ -0,0 +1,61 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import os
+
+from vta.core.runner.journal import CampaignJournal
+
+
+def make_campaign(log_root, name, task="powercycle.robot", slot=1, loops=()):
+    journal = CampaignJournal(log_root / f"{name}_SLOT{slot}")
+    journal.open(task, slot, 10)
+    for count, rc in loops:
+        journal.start(count)
+        if rc is not None:
+            journal.end(count, rc)
+    return journal
+
+
+def test_next_loop_reruns_unended_loop(tmp_path):
+    journal = make_campaign(tmp_path, "run", loops=[(1, 0), (2, 0), (3, None)])
+
+    reloaded = CampaignJournal(journal.log_path)
+
+    assert reloaded.completed == {1: 0, 2: 0}
+    assert reloaded.next_loop == 3
+    assert not reloaded.finished
+
+
+def test_truncated_record_is_skipped(tmp_path):
+    journal = make_campaign(tmp_path, "run", loops=[(1, 0)])
+    with open(journal.file, "a") as f:
+        f.write('{"event": "end", "lo')
+
+    reloaded = CampaignJournal(journal.log_path)
+
+    assert reloaded.completed == {1: 0}
+    assert reloaded.next_loop == 2
+
+
+def test_latest_returns_newest_unfinished_campaign_of_task_and_slot(tmp_path):
+    old = make_campaign(tmp_path, "old", loops=[(1, 0)])
+    new = make_campaign(tmp_path, "new", loops=[(1, 0), (2, 0)])
+    make_campaign(tmp_path, "other_task", task="swup.robot")
+    make_campaign(tmp_path, "other_slot", slot=2)
+    os.utime(old.file, (1, 1))
+
+    latest = CampaignJournal.latest(tmp_path, "powercycle.robot", 1)
+
+    assert latest.log_path == new.log_path
+    assert latest.next_loop == 3
+
+
+def test_latest_ignores_finished_campaign(tmp_path):
+    journal = make_campaign(tmp_path, "run", loops=[(1, 0)])
+    journal.finish()
+
+    assert CampaignJournal.latest(tmp_path, "powercycle.robot", 1) is None
+    assert CampaignJournal.latest(tmp_path / "missing", "powercycle.robot", 1) is None
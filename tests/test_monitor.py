@@ -0,0 +1,72 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+from vta.tasks.ota.monitor import LogMonitor
+
+
+class Console:
+    """
+    Serial console echoing commands, the tail answers with its pid.
+    """
+
+    def __init__(self):
+        self.trace_listeners = []
+        self.sent = []
+        self.queued = []
+
+    def send_command(self, cmd):
+        self.sent.append(cmd)
+        self.receive(cmd)
+        if "TAILPID" in cmd:
+            self.receive("OTALOG:TAILPID=4242")
+
+    def receive(self, line):
+        consumed = [listener(0.0, line) for listener in self.trace_listeners]
+        if not any(consumed):
+            self.queued.append(line)
+
+
+def test_tail_pid_is_read_from_tagged_line():
+    console = Console()
+    monitor = LogMonitor(console)
+
+    assert monitor.start()
+    assert monitor.tail_pid == "4242"
+
+    monitor.stop()
+
+    assert console.sent[-1] == "kill 4242"
+    assert console.trace_listeners == []
+
+
+def test_only_tagged_lines_match_and_are_consumed():
+    console = Console()
+    monitor = LogMonitor(console)
+    monitor.start()
+    console.queued.clear()
+    subscription = monitor.subscribe("DOWNLOAD-COMPLETED")
+
+    console.receive("# grep DOWNLOAD-COMPLETED /ota/bsw/log/subda.log")
+    assert not subscription.matched
+
+    console.receive("# OTALOG:\x1b[0m[subda] DOWNLOAD-COMPLETED\r")
+    assert subscription.matched
+    assert subscription.match.group(0) == "DOWNLOAD-COMPLETED"
+    assert console.queued == ["# grep DOWNLOAD-COMPLETED /ota/bsw/log/subda.log"]
+
+
+def test_progress_is_reported_once_per_change():
+    console = Console()
+    monitor = LogMonitor(console)
+    monitor.start()
+    reported = []
+    monitor.on_progress = reported.append
+
+    for line in ("download progress: 10%", "progress 10 %", "Progress=55.5%"):
+        console.receive(f"OTALOG:{line}")
+
+    assert reported == [10, 55.5]
+    assert monitor.progress == 55.5
@@ -0,0 +1,63 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import re
+
+import pytest
+from conftest import PERFORMANCE
+from performance import Performance
+
+CAPTURES = {
+    "qnxcpu": ("qnx_cpu.txt", ["slogger2", "qvm", "spi_service"]),
+    "qnxmem": ("qnx_mem.txt", ["procnto-smp-instr", "slogger2", "watchdog"]),
+    "aoscpu": ("aos_cpu.txt", ["system_server", "[system]"]),
+    "aosmem": ("aos_mem.txt", ["system_server", "/system/bin/audioserver"]),
+}
+
+
+def test_line_pattern_prefers_longest_name():
+    pattern = Performance("qnxcpu").line_pattern(["io", "io-audio"])
+
+    match = pattern.search("  1  2  10 Rcv  0:00:01   0.25% io-audio   ")
+
+    assert match.group("name") == "io-audio"
+    assert match.group("value") == "0.25"
+
+
+def test_line_pattern_escapes_names():
+    pattern = Performance("aoscpu").line_pattern(["[system]"])
+
+    assert pattern.search(" 1 root 20 0 0 0 0 S  1.5  0.0 0:01.00 [system]")
+    assert not pattern.search(" 1 root 20 0 0 0 0 S  1.5  0.0 0:01.00 s")
+
+
+def test_iter_lines_joins_lines_across_blocks(tmp_path):
+    file = tmp_path / "capture.txt"
+    file.write_bytes(b"first \x1b[1mline\x1b[0m\nsecond line\nlast")
+
+    lines = list(Performance.iter_lines(str(file), block_size=4))
+
+    assert lines == ["first line", "second line", "last"]
+
+
+@pytest.mark.parametrize("per_type", CAPTURES)
+def test_parse_matches_legacy_extraction(per_type):
+    source, processes = CAPTURES[per_type]
+    file = str(PERFORMANCE / source)
+    performance = Performance(per_type)
+
+    result = performance.parse(file, processes, block_size=4096)
+
+    chunks = Performance.content_splits(file, performance.seperator_pattern)
+    for process in processes:
+        legacy = Performance.data_extraction(
+            chunks, performance.match_pattern(re.escape(process))
+        )
+        assert len(legacy) > 0
+        assert result[process]["value"].tolist() == legacy
+        assert result[process]["snapshot"].tolist() == sorted(
+            set(result[process]["snapshot"].tolist())
+        )
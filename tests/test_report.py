@@ -0,0 +1,41 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import numpy as np
+from report import lttb
+
+
+def test_short_series_is_not_downsampled():
+    x, y = np.arange(10), np.arange(10) * 2.0
+
+    sampled_x, sampled_y = lttb(x, y, 10)
+
+    assert sampled_x is x
+    assert sampled_y is y
+
+
+def test_downsampled_series_keeps_ends_and_order():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 100)
+
+    sampled_x, sampled_y = lttb(x, y, 200)
+
+    assert len(sampled_x) == len(sampled_y) == 200
+    assert (sampled_x[0], sampled_x[-1]) == (0, 9_999)
+    assert np.all(np.diff(sampled_x) > 0)
+    assert np.array_equal(sampled_y, y[sampled_x.astype(np.int64)])
+
+
+def test_spikes_survive_downsampling():
+    y = np.zeros(5_000)
+    y[1_234], y[3_210] = 90.0, -40.0
+
+    sampled_x, sampled_y = lttb(np.arange(5_000), y, 50)
+
+    assert 1_234 in sampled_x
+    assert 3_210 in sampled_x
+    assert sampled_y.max() == 90.0
+    assert sampled_y.min() == -40.0
@@ -0,0 +1,121 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import os
+import time
+import zipfile
+
+import psutil
+
+from vta.core.runner.journal import CampaignJournal
+from vta.core.runner.utils import RetentionService
+
+DAY = 24 * 60 * 60
+
+
+def make_run(log_root, name, age_days, content="log"):
+    folder = log_root / name
+    folder.mkdir(parents=True)
+    (folder / "log_1.log").write_text(content)
+    mtime = time.time() - age_days * DAY
+    os.utime(folder, (mtime, mtime))
+    return folder
+
+
+def free_pid():
+    pid = 999999
+    while psutil.pid_exists(pid):
+        pid += 1
+    return pid
+
+
+def test_old_run_is_compressed_and_recent_run_kept(tmp_path):
+    make_run(tmp_path, "old", 2)
+    make_run(tmp_path, "recent", 0)
+
+    RetentionService(tmp_path).run()
+
+    assert not (tmp_path / "old").exists()
+    assert zipfile.ZipFile(tmp_path / "old.zip").read("log_1.log") == b"log"
+    assert (tmp_path / "recent").exists()
+    assert not (tmp_path / RetentionService.LOCK_FILE).exists()
+
+
+def test_existing_archive_is_never_overwritten(tmp_path):
+    # left over by a service stopped between archive and folder deletion
+    make_run(tmp_path, "run", 2, content="partly deleted")
+    with zipfile.ZipFile(tmp_path / "run.zip", "w") as archive:
+        archive.writestr("log_1.log", "complete")
+
+    RetentionService(tmp_path).run()
+
+    assert zipfile.ZipFile(tmp_path / "run.zip").read("log_1.log") == b"complete"
+    assert zipfile.ZipFile(tmp_path / "run_1.zip").read("log_1.log") == (
+        b"partly deleted"
+    )
+
+
+def test_expired_runs_are_deleted(tmp_path):
+    make_run(tmp_path, "expired", 8)
+
+    RetentionService(tmp_path, days=7).run()
+
+    assert list(tmp_path.iterdir()) == [tmp_path / RetentionService.INDEX_FILE]
+
+
+def test_old_unfinished_campaign_is_kept(tmp_path):
+    folder = make_run(tmp_path, "campaign", 0)
+    CampaignJournal(folder).open("powercycle.robot", 1, 10)
+    make_run(tmp_path, "finished", 9)
+    mtime = time.time() - 9 * DAY
+    os.utime(folder, (mtime, mtime))
+
+    RetentionService(tmp_path, days=7, max_size_gb=1e-9).run()
+
+    assert (tmp_path / "campaign" / CampaignJournal.FILE_NAME).exists()
+    assert not (tmp_path / "finished").exists()
+
+
+def test_lock_of_running_service_is_respected(tmp_path):
+    make_run(tmp_path, "old", 2)
+    (tmp_path / RetentionService.LOCK_FILE).write_text(str(os.getpid()))
+
+    RetentionService(tmp_path).run()
+
+    assert (tmp_path / "old").exists()
+
+
+def test_old_lock_of_running_service_is_respected(tmp_path):
+    make_run(tmp_path, "old", 2)
+    lock = tmp_path / RetentionService.LOCK_FILE
+    lock.write_text(str(os.getpid()))
+    mtime = time.time() - 2 * RetentionService.STALE_LOCK
+    os.utime(lock, (mtime, mtime))
+
+    RetentionService(tmp_path).run()
+
+    assert (tmp_path / "old").exists()
+
+
+def test_lock_of_dead_service_is_taken_over(tmp_path):
+    make_run(tmp_path, "old", 2)
+    (tmp_path / RetentionService.LOCK_FILE).write_text(str(free_pid()))
+
+    RetentionService(tmp_path).run()
+
+    assert (tmp_path / "old.zip").exists()
+    assert not (tmp_path / RetentionService.LOCK_FILE).exists()
+
+
+def test_stopped_service_skips_remaining_entries(tmp_path):
+    make_run(tmp_path, "old", 2)
+    service = RetentionService(tmp_path)
+    service.stop()
+
+    service.run()
+
+    assert (tmp_path / "old").exists()
+    assert not (tmp_path / RetentionService.LOCK_FILE).exists()
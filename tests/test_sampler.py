@@ -0,0 +1,101 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import numpy as np
+import pytest
+from conftest import PERFORMANCE
+from performance import Performance
+from sampler import (
+    RingBuffer,
+    parse_aos_top,
+    parse_meminfo,
+    parse_procrank,
+    parse_qnx_top,
+    parse_showmem,
+)
+
+
+def first_snapshot(source, per_type):
+    performance = Performance(per_type)
+    chunks = Performance.content_splits(
+        str(PERFORMANCE / source), performance.seperator_pattern
+    )
+    # top output follows its separator, showmem and procrank precede it
+    return chunks[1 if per_type.endswith("cpu") else 0].splitlines()
+
+
+def test_ring_buffer_keeps_latest_in_order():
+    buffer = RingBuffer(["a", "b", "a"], capacity=3)
+    for tick in range(5):
+        buffer.append(tick, {"a": tick * 10})
+
+    times, values = buffer.snapshot()
+
+    assert buffer.columns == ["a", "b"]
+    assert times.tolist() == [2, 3, 4]
+    assert values[:, 0].tolist() == [20, 30, 40]
+    assert np.isnan(values[:, 1]).all()
+    assert buffer.snapshot("a")[1].tolist() == [20, 30, 40]
+
+
+def test_parse_qnx_top_sums_threads():
+    table = parse_qnx_top(first_snapshot("qnx_cpu.txt", "qnxcpu"))
+
+    assert table[2494471]["name"] == "qvm"
+    assert table[2494471]["cpu"] == pytest.approx(0.67)
+    assert table[65552] == {"name": "qcore", "cpu": pytest.approx(0.43)}
+
+
+def test_parse_showmem_converts_to_kb():
+    table = parse_showmem(first_snapshot("qnx_mem.txt", "qnxmem"))
+
+    assert table[12291]["name"] == "slogger2"
+    assert table[12291]["total"] == 1866
+    assert table[12291]["heap"] == 440
+    # 0(bytes) cells
+    assert table[1]["as"] == 0
+
+
+def test_parse_aos_top_reads_cpu_and_sizes():
+    table = parse_aos_top(first_snapshot("aos_cpu.txt", "aoscpu"))
+
+    assert table[1217] == {
+        "name": "system_server",
+        "cpu": 30.0,
+        "mem": 4.1,
+        "virt": 18 * 1024 * 1024,
+        "res": 384 * 1024,
+        "shr": 297 * 1024,
+    }
+
+
+def test_parse_procrank_uses_header_columns():
+    table = parse_procrank(first_snapshot("aos_mem.txt", "aosmem"))
+
+    assert table[1217]["pss"] == 233979
+    assert table[668]["name"] == "/system/bin/surfaceflinger"
+    assert set(table[668]) == {
+        "name",
+        *("vss", "rss", "pss", "uss", "swap", "pswap", "uswap", "zswap"),
+    }
+
+
+def test_parse_meminfo_reads_by_process_sections_only():
+    lines = [
+        "Total PSS by process:",
+        "    233,979K: system_server (pid 1217)",
+        "    121,459K: surfaceflinger (pid 668 / activities)",
+        "Total PSS by OOM adjustment:",
+        "    233,979K: System",
+        "        233,979K: system_server (pid 1217)",
+        "Total RSS by process:",
+        "    402,460K: system_server (pid 1217)",
+    ]
+
+    table = parse_meminfo(lines)
+
+    assert table[1217] == {"name": "system_server", "pss": 233979, "rss": 402460}
+    assert table[668] == {"name": "surfaceflinger", "pss": 121459}
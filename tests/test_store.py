@@ -0,0 +1,54 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import numpy as np
+from store import SampleStore
+
+
+def column(*values):
+    return {"snapshot": np.arange(len(values)), "value": np.array(values)}
+
+
+def test_snapshots_are_stamped_from_start(tmp_path):
+    store = SampleStore(tmp_path)
+
+    store.write("B1", "bench", "qnxcpu", {"qvm": column(1, 2, 3)}, 100, 2)
+
+    times, values = store.series("B1", "bench", "qnxcpu", "qvm")
+    assert times.tolist() == [100, 102, 104]
+    assert values.tolist() == [1, 2, 3]
+    assert store.series("B1", "bench", "qnxcpu", "qvm", 101, 104)[1].tolist() == [2]
+
+
+def test_write_replaces_written_processes_and_keeps_others(tmp_path):
+    store = SampleStore(tmp_path)
+    store.write(
+        "B1",
+        "bench",
+        "tiotest",
+        {"read": column(10, 10), "write": column(5)},
+        higher_is_better=["read", "write"],
+    )
+
+    store.write("B1", "bench", "tiotest", {"write": column(6, 7)})
+
+    assert store.processes("B1", "bench", "tiotest") == ["read", "write"]
+    assert store.series("B1", "bench", "tiotest", "read")[1].tolist() == [10, 10]
+    assert store.series("B1", "bench", "tiotest", "write")[1].tolist() == [6, 7]
+    assert store._read("B1", "bench", "tiotest")[1] == {"read"}
+
+
+def test_compare_flags_regression_by_direction(tmp_path):
+    store = SampleStore(tmp_path)
+    store.write("B1", "b", "t", {"cpu": column(10), "read": column(100)}, 0)
+    store.write("B2", "b", "t", {"cpu": column(12), "read": column(80)}, 0)
+    store.write("B2", "b", "t", {"read": column(80)}, 0, higher_is_better=["read"])
+
+    result = {row["process"]: row for row in store.compare("B1", "B2", "b", "t")}
+
+    assert result["cpu"]["regression"]
+    assert result["read"]["regression"]
+    assert result["cpu"]["change"] == 0.2
@@ -0,0 +1,75 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+from vta.tasks.ota.timeline import Timeline, percentiles
+
+
+def make_timeline(download, installation=None, package_size_mb=100.0):
+    timeline = Timeline(1, package_size_mb)
+    timeline.events = [
+        {"event": "download.start", "t": 0.0},
+        {"event": "download.end", "t": download, "ok": True},
+    ]
+    if installation is not None:
+        timeline.events += [
+            {"event": "installation.start", "t": download},
+            {"event": "installation.end", "t": download + installation, "ok": True},
+        ]
+    return timeline
+
+
+def test_metrics_are_durations_of_ended_phases():
+    timeline = make_timeline(50.0)
+    timeline.start("reboot")
+    timeline.end("installation", ok=False)
+
+    assert timeline.metrics == {"download": 50.0, "download_mbps": 2.0}
+
+
+def test_download_progress_carries_throughput():
+    timeline = Timeline(1, package_size_mb=100.0)
+    timeline.events = [{"event": "download.progress", "t": -10.0, "percent": 0.0}]
+
+    timeline.progress(50.0)
+
+    event = timeline.events[-1]
+    assert event["percent"] == 50.0
+    assert 0 < event["mbps"] <= 5.0
+
+
+def test_saved_timeline_is_loaded(tmp_path):
+    timeline = make_timeline(20.0, 30.0)
+
+    timeline.save(tmp_path / "timeline_1.json")
+    loaded = Timeline.load(tmp_path / "timeline_1.json")
+
+    assert loaded.events == timeline.events
+    assert loaded.metrics == {
+        "download": 20.0,
+        "installation": 30.0,
+        "download_mbps": 5.0,
+    }
+    assert not (tmp_path / "timeline_1.tmp").exists()
+
+
+def test_percentiles_across_iterations():
+    timelines = [make_timeline(float(d)) for d in range(10, 110, 10)]
+    timelines.append(make_timeline(10.0, 5.0))
+
+    result = percentiles(timelines, points=(50, 90))
+
+    assert result["download"]["count"] == 11
+    assert result["download"]["min"] == 10.0
+    assert result["download"]["p50"] == 50.0
+    assert result["download"]["p90"] == 90.0
+    assert result["download"]["max"] == 100.0
+    assert result["installation"] == {
+        "count": 1,
+        "min": 5.0,
+        "p50": 5.0,
+        "p90": 5.0,
+        "max": 5.0,
+    }
@@ -0,0 +1,70 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+from tiotest import parse_tiotest, tiotest_command
+
+# output of tiotest v0.4.2 with 4 threads
+OUTPUT = """\
+Tiotest results for 4 concurrent io threads:
+,-----------------------------------------------------------------------------.
+| Item                  | Time     | Rate          |  IOPS   | Usr CPU  | Sys CPU |
++-----------------------+----------+---------------+---------+----------+---------+
+| Write         256 MBs |    1.3 s |  196.923 MB/s |         |   1.2 %  |  60.8 % |
+| Random Write   31 MBs |    2.5 s |   12.500 MB/s |    3200 |   0.4 %  |  12.1 % |
+| Random Read    31 MBs |    0.9 s |   34.722 MB/s |    8889 |   2.2 %  |  40.0 % |
+`-----------------------------------------------------------------------------'
+Tiotest latency results:
+,-------------------------------------------------------------------------.
+| Item         | Average latency | Maximum latency | % >2 sec | % >10 sec |
++--------------+-----------------+-----------------+----------+-----------+
+| Write        |        0.074 ms |       48.611 ms |  0.00000 |   0.00000 |
+| Random Write |        1.213 ms |      103.020 ms |  0.00000 |   0.00000 |
+| Random Read  |        0.431 ms |        9.875 ms |  0.00000 |   0.00000 |
+|--------------+-----------------+-----------------+----------+-----------|
+| Total        |        0.297 ms |      103.020 ms |  0.00000 |   0.00000 |
+`--------------+-----------------+-----------------+----------+-----------'
+"""
+
+
+def test_parse_tiotest_reads_rate_and_latency_tables():
+    result = parse_tiotest(OUTPUT.splitlines())
+
+    assert list(result) == ["Write", "Random Write", "Random Read", "Total"]
+    assert result["Write"] == {
+        "time": 1.3,
+        "rate": 196.923,
+        "usr_cpu": 1.2,
+        "sys_cpu": 60.8,
+        "latency_avg": 0.074,
+        "latency_max": 48.611,
+    }
+    assert result["Random Read"]["iops"] == 8889
+    assert result["Total"] == {"latency_avg": 0.297, "latency_max": 103.02}
+
+
+def test_parse_tiotest_ignores_other_output():
+    assert parse_tiotest(["tiotest: command not found", ""]) == {}
+
+
+def test_tiotest_command_skips_tests_not_selected():
+    scenario = {
+        "threads": 4,
+        "size": 64,
+        "block": 4096,
+        "random": 2000,
+        "tests": ["write", "random_write", "random_read"],
+        "sync": True,
+    }
+
+    command = tiotest_command("/data/tiotest", "/data/files", scenario)
+
+    assert command == "/data/tiotest -d /data/files -t 4 -f 64 -b 4096 -r 2000 -k 2 -S"
+
+
+def test_tiotest_command_defaults():
+    command = tiotest_command("tiotest", "/tmp", {"direct": True})
+
+    assert command == "tiotest -d /tmp -t 1 -f 64 -b 4096 -r 1000 --direct-io"
@@ -8,7 +8,7 @@ import queue
 import re
 import threading
 import time
-from typing import Optional, Tuple
+from typing import Callable, Optional, Tuple
 
 import serial
 from loguru import logger
@@ -24,6 +24,10 @@ class PuttyHelper:
         self.event_waitTrace = threading.Event()
         self.event_monitorTrace = threading.Event()
         self.event_reader = threading.Event()
+        # called with (tick, line) of every trace on the reader thread, a
+        # listener returning True consumes the line, it is not queued for
+        # `wait_for_trace` and `send_command_and_return_traces`
+        self.trace_listeners: list[Callable[[float, str], Optional[bool]]] = []
 
     def _serial_reader(self) -> None:
         """
@@ -38,6 +42,14 @@ class PuttyHelper:
             if line:
                 logger.debug("[{stream}] - {message}", stream="PuttyRx", message=line)
                 now_tick = time.time()
+                consumed = False
+                for listener in self.trace_listeners:
+                    try:
+                        consumed = bool(listener(now_tick, line)) or consumed
+                    except Exception:
+                        logger.exception("Trace listener failed!")
+                if consumed:
+                    continue
                 if self.event_monitorTrace.isSet():
                     self.monitorTrace_queue.put((now_tick, line))
                 if self.event_waitTrace.isSet():
@@ -66,11 +78,20 @@ class PuttyHelper:
             logger.warning("[Putty] Putty disabled, skip initiating")
             return
 
-        logger.info("Start initiating PuTTY interface ...")
         comport = dPutty.get("putty_comport")
         baudrate = int(dPutty.get("putty_baudrate", 115200))
         self.username = dPutty.get("putty_username", "root")
         self.password = dPutty.get("putty_password")
+        if (
+            self.putty_object
+            and self.putty_object.is_open
+            and self.putty_object.port == comport
+        ):
+            # keep the connection when INIT is re-run in the same process
+            logger.info(f"PuTTY interface {comport} already connected")
+            return
+
+        logger.info("Start initiating PuTTY interface ...")
         self.event_reader.set()
         try:
             self.putty_object = serial.Serial(
@@ -24,6 +24,9 @@ class TSCOM:
         if not self.tsmaster_enabled:
             logger.warning("[TSMaster] TSMaster disabled, skip initiating ...")
             return
+        if self.app:
+            logger.info("[TSMaster] TSMaster already connected")
+            return
         self.app = win32com.client.Dispatch("TSMaster.TSApplication")
         self.com = self.app.TSCOM()
         self.app.connect()
@@ -48,3 +51,5 @@ class TSCOM:
     def disconnect(self):
         if self.app:
             self.app.disconnect()
+            self.app = None
+            self.com = None
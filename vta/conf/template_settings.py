@@ -34,6 +34,14 @@ DB_CREDENTIAL = {
     "database": "zeekr",
 }
 
+# RQM credential of spooled jobs flushed by another process
+# RQM_CREDENTIAL = {
+#     "user": "",
+#     "password": "",
+#     "project": "Zeekr",
+#     "host": "https://rb-alm-20-p.de.bosch.com",
+# }
+
 # enable mail
 MAIL = False
 MAIL_CREDENTIAL = {
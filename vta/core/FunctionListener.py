@@ -14,10 +14,10 @@ from typing import Optional
 
 from loguru import logger
 from robot.libraries.BuiltIn import BuiltIn
-from RobotVisitor import getallTestCases
+from RobotVisitor import getTestCases
 
 # robot --listener .\PythonListener.py --outputdir temp --output start.xml -X .\TEST.robot
-from vta.core.mail.EMAILClient import EmailClient
+from vta.core.dispatcher import get_dispatcher, register_credential
 from vta.core.mail.mail_template import html_body, html_head, html_signature
 from vta.core.rqm.CRQM import CRQMClient
 
@@ -148,19 +148,21 @@ class FunctionListener:
         self.tc_name_id_map = {}
         self.tcerID = []
         self.tcresultID = []
-        self.cRQM = CRQMClient(
-            user="ets1szh",
-            password="estbangbangde6",
-            project="Zeekr",
-            host="https://rb-alm-20-p.de.bosch.com",
-        )
+        self.rqm_credential = {
+            "user": "ets1szh",
+            "password": "estbangbangde6",
+            "project": "Zeekr",
+            "host": "https://rb-alm-20-p.de.bosch.com",
+        }
+        self.cRQM = CRQMClient(**self.rqm_credential)
 
     def _prepare_RQM(self, data, result):
         self._init_RQM()
         logger.success(self.cRQM.login())
         self.cRQM.lStartTimes.append(datetime.now())
         # get testcase and testcase ids
-        self.testcases = getallTestCases(result.source)
+        # introspect the running suite instead of building it again from file
+        self.testcases = getTestCases(data)
         self.tcID = [self.cRQM.webIDfromTitle("testcase", tc) for tc in self.testcases]
         logger.info(f"tcID: {self.tcID}")
         # create build record
@@ -238,24 +240,35 @@ class FunctionListener:
             buildrecordID=self.brID,
             lstates=self.testcaseresults,
         )
-        response = self.cRQM.createResource(
-            resourceType="testsuitelog", content=content
+        # nothing depends on the created result, upload it in background
+        get_dispatcher().submit(
+            "rqm",
+            {
+                "credential": register_credential(
+                    "RQM_CREDENTIAL", self.rqm_credential
+                ),
+                "resource_type": "testsuitelog",
+                "content": content,
+            },
         )
-        logger.info(f"create testsuite result: {response}")
+        logger.info("create testsuite result is queued")
         self.cRQM.disconnect()
-        return response["id"]
 
     def _send_mail(self) -> None:
         if not self.mail_enabled:
             logger.warning("Mail is disabled!")
             return
 
-        mail = EmailClient(
-            sender=self.mail_credential.get("sender"),
-            username=self.mail_credential.get("username"),
-            password=self.mail_credential.get("password"),
+        get_dispatcher().submit(
+            "mail",
+            {
+                "credential": register_credential(
+                    "MAIL_CREDENTIAL", self.mail_credential
+                ),
+                "subject": self.subject,
+                "body": self.body,
+            },
         )
-        mail.send_mail(self.mail_credential.get("recepients"), self.subject, self.body)
 
     def start_suite(self, data, result):
         self.start_time = datetime.now().replace(microsecond=0)
@@ -307,10 +320,13 @@ class FunctionListener:
         self.artifact = BuiltIn().get_variable_value("${artifact}")
         self.result = result.status
         if self.rqm_enabled:
-            tsrID = self._upload_test_suite_result(data, result)
-            if tsrID:
-                tsrURL = self.cRQM.resourceURL(resourceType="testsuitelog", id=tsrID)
-                tsrLink = f"<a href='{tsrURL}'>{tsrID}</a>"
+            self._upload_test_suite_result(data, result)
+            # link the TSER, its result is created in background
+            if self.tserID:
+                tserURL = self.cRQM.resourceURL(
+                    resourceType="suiteexecutionrecord", id=self.tserID
+                )
+                tsrLink = f"<a href='{tserURL}'>{self.tserID}</a>"
             else:
                 tsrLink = "No test suite result found!"
             self.info_container.update({"tsrLink": tsrLink})
@@ -334,3 +350,5 @@ class FunctionListener:
         except:
             self.subject = BuiltIn().get_variable_value("${mail_body}")
         self._send_mail()
+        # bounded wait, unfinished side effects stay spooled
+        get_dispatcher().drain()
@@ -0,0 +1,122 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Streaming reader for Robot Framework `output.xml` files.
+
+Tests are parsed with `iterparse` and released right after they are yielded,
+so memory usage stays constant regardless of the output size.
+"""
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from lxml import etree
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value or value == "N/A":
+        return None
+    # RF >= 7: 2024-03-25T10:00:00.123456, RF < 7: 20240325 10:00:00.123
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f", "%Y%m%d %H:%M:%S.%f"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_status(status) -> tuple:
+    start = _parse_time(status.get("start") or status.get("starttime"))
+    if status.get("elapsed") is not None:
+        end = start + timedelta(seconds=float(status.get("elapsed"))) if start else None
+    else:
+        end = _parse_time(status.get("endtime"))
+    return start, end
+
+
+def _failed_keyword(test) -> str:
+    # deepest failed keyword is the last one in document order
+    failed = test.xpath(".//kw[status/@status='FAIL']")
+    if not failed:
+        return ""
+    kw = failed[-1]
+    owner = kw.get("owner") or kw.get("library")
+    return f"{owner}.{kw.get('name')}" if owner else kw.get("name")
+
+
+def iter_test_results(file: Union[str, Path]) -> Iterator[dict]:
+    """
+    Yield one dictionary per executed test of given output file.
+
+    {
+        "index": 0,
+        "name": "Test1",
+        "suite": "Suite",
+        "status": "PASS",
+        "message": "",
+        "tags": ["tag"],
+        "start_time": datetime,
+        "end_time": datetime,
+        "duration": 1234,  # milliseconds
+        "failed_keyword": "BuiltIn.Fail",  # empty if no keyword failed
+    }
+    """
+    suites: list[str] = []
+    index = 0
+    for event, elem in etree.iterparse(
+        str(file), events=("start", "end"), tag=("suite", "test")
+    ):
+        if elem.tag == "suite":
+            if event == "start":
+                suites.append(elem.get("name"))
+            else:
+                suites.pop()
+            continue
+        if event == "start":
+            continue
+
+        status = elem.find("status")
+        start, end = _parse_status(status)
+        tags = [t.text for t in elem.findall("tag")] or [
+            t.text for t in elem.findall("tags/tag")
+        ]
+        yield {
+            "index": index,
+            "name": elem.get("name"),
+            "suite": suites[-1] if suites else "",
+            "status": status.get("status"),
+            "message": status.text or "",
+            "tags": tags,
+            "start_time": start,
+            "end_time": end,
+            "duration": (
+                int((end - start).total_seconds() * 1000) if start and end else 0
+            ),
+            "failed_keyword": _failed_keyword(elem),
+        }
+        index += 1
+        # release parsed test and already processed siblings
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def output_files(path: Union[str, Path]) -> list[Path]:
+    """
+    Return output files from a single `output.xml` or a folder of `output_N.xml`
+    generated by stability runner, sorted by loop number.
+    """
+    path = Path(path)
+    if path.is_file():
+        return [path]
+
+    def loop_number(file: Path) -> int:
+        match = re.search(r"output_(\d+)\.xml$", file.name)
+        return int(match.group(1)) if match else 0
+
+    return sorted(path.glob("output*.xml"), key=loop_number)
@@ -4,10 +4,22 @@
 # \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
 # ============================================================================================================
 
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
 from robot.api.deco import keyword, library
 from robot.model import SuiteVisitor
 from robot.running import TestSuiteBuilder
 
+from vta.core.runner.catalog import get_catalog
+
+CACHE_DIR = Path(tempfile.gettempdir()) / "vta_suite_cache"
+
+_cache: dict[str, list] = {}
+
 
 class TestCasesFinder(SuiteVisitor):
     def __init__(self):
@@ -17,10 +29,58 @@ class TestCasesFinder(SuiteVisitor):
         self.tests.append(test)
 
 
-@keyword
-def getallTestCases(file) -> list:
-    builder = TestSuiteBuilder()
-    testsuite = builder.build(file)
+def getTestCases(suite) -> list:
+    """
+    Return names of all tests of an already built suite, e.g. the running
+    suite passed to listener `start_suite`.
+    """
     finder = TestCasesFinder()
-    testsuite.visit(finder)
+    suite.visit(finder)
     return [str(i) for i in finder.tests]
+
+
+def _content_hash(file) -> str:
+    path = Path(file)
+    files = [path] if path.is_file() else sorted(path.rglob("*.robot"))
+    sha = hashlib.sha1()
+    for f in files:
+        sha.update(str(f.relative_to(path) if f != path else f.name).encode())
+        sha.update(f.read_bytes())
+    return sha.hexdigest()
+
+
+@keyword
+def getallTestCases(file) -> list:
+    """
+    Return names of all tests of given suite file or directory.
+
+    Tests of a task file are read from its parsing model by the task catalog.
+    Directories are built, and the parsed suites are cached by content hash in
+    memory and in the temp directory, so unchanged suites are only built once.
+    """
+    path = Path(file)
+    if path.is_file():
+        return [test["name"] for test in get_catalog(path.parent).tests(path)]
+    key = _content_hash(file)
+    if key in _cache:
+        return list(_cache[key])
+    cache_file = CACHE_DIR / f"{key}.json"
+    try:
+        with open(cache_file, "r") as f:
+            _cache[key] = json.load(f)
+        return list(_cache[key])
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    tests = getTestCases(TestSuiteBuilder().build(file))
+    _cache[key] = tests
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(tests, f)
+        os.replace(tmp, cache_file)
+    except OSError:
+        # cache is optional, e.g. read-only temp directory
+        pass
+    return list(tests)
@@ -4,22 +4,22 @@
 # \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
 # ============================================================================================================
 
+import uuid
 from datetime import datetime
 from typing import Optional
 
 from loguru import logger
 from robot.libraries.BuiltIn import BuiltIn
 
-from vta.core.db.DBHelper import DBHelper
+from vta.core.db.DBBuffer import get_buffer, stop_sync, sync_now
 from vta.core.db.DBtables import Stability
-from vta.core.mail.EMAILClient import EmailClient
+from vta.core.dispatcher import get_dispatcher, register_credential
 
 
 class StabilityListener:
     ROBOT_LISTENER_API_VERSION = 3
 
     def __init__(self):
-        self.mdb = DBHelper()
         self.db_enabled: Optional[bool] = None
         self.db_credential: Optional[dict] = None
         self.mail_enabled: Optional[bool] = None
@@ -28,6 +28,7 @@ class StabilityListener:
         self.body: Optional[str] = None
         self.table = Stability
 
+        self.run_id: Optional[str] = None
         self.disabled = []
         self.error_keywords = []
         self.start_time: Optional[datetime] = None
@@ -67,24 +68,29 @@ class StabilityListener:
             "error_keyword": str(self.error_keywords),
             "result": self.result,
         }
-        self.mdb.connect(self.table, self.db_credential)
-        self.mdb.create_table()
-        self.mdb.insert_row(data)
-        logger.success("Upload to database successfully!")
+        # committed locally first, synced to the central database in background
+        credential = register_credential("DB_CREDENTIAL", self.db_credential)
+        get_buffer().put(self.table.__name__, credential, data, self.run_id)
+        sync_now()
 
     def _send_mail(self) -> None:
         if not self.mail_enabled:
             logger.warning("Mail is disabled!")
             return
 
-        mail = EmailClient(
-            sender=self.mail_credential.get("sender"),
-            username=self.mail_credential.get("username"),
-            password=self.mail_credential.get("password"),
+        get_dispatcher().submit(
+            "mail",
+            {
+                "credential": register_credential(
+                    "MAIL_CREDENTIAL", self.mail_credential
+                ),
+                "subject": self.subject,
+                "body": self.body,
+            },
         )
-        mail.send_mail(self.mail_credential.get("recepients"), self.subject, self.body)
 
     def start_suite(self, test, result):
+        self.run_id = uuid.uuid4().hex
         self.start_time = datetime.now().replace(microsecond=0)
         self.db_enabled = BuiltIn().get_variable_value("${DATABASE}")
         self.db_credential = BuiltIn().get_variable_value("${DB_CREDENTIAL}")
@@ -115,3 +121,5 @@ class StabilityListener:
     def close(self):
         self._upload_database()
         # self._send_mail()
+        # bounded wait, rows not synced stay buffered
+        stop_sync(10)
@@ -0,0 +1,288 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Local write-ahead buffer for database rows.
+
+Rows are first committed to a local SQLite store in WAL mode, which never
+depends on the network, and then synced in batches to their target database
+by `DBSyncWorker`. Targets are written with upserts keyed by `run_id`, so a
+batch interrupted after the remote commit is simply written again.
+
+Rows only keep the key of their target credential (e.g. "DB_CREDENTIAL"),
+which is resolved like the credentials of dispatcher jobs, see
+`vta.core.dispatcher.resolve_credential`.
+
+Continuous sync, e.g. as a bench service:
+python -m vta.core.db.DBBuffer --interval 60
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import click
+from loguru import logger
+
+from vta.core.dispatcher import resolve_credential
+
+try:
+    from . import DBtables
+    from .DBHelper import DBHelper
+except:
+    import DBtables
+    from DBHelper import DBHelper
+
+BUFFER_FILE = Path.home() / ".vta" / "buffer.db"
+
+
+def _encode(obj):
+    if isinstance(obj, datetime):
+        return {"__datetime__": obj.isoformat()}
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class DBBuffer:
+    def __init__(self, file: Path = BUFFER_FILE) -> None:
+        self.file = Path(file)
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        # rows hold results of the bench, readable by its owner only
+        os.close(os.open(self.file, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(self.file, 0o600)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buffer (
+                    run_id TEXT PRIMARY KEY,
+                    table_name TEXT NOT NULL,
+                    credential TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    synced REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_synced ON buffer (synced)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread, WAL lets the listener write while syncing
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, table: str, credential: str, data: dict, run_id: str) -> None:
+        """
+        Commit one row locally, a row of the same run replaces the former one.
+        `credential` is the key of the target credential, never the credential.
+        """
+        if not isinstance(credential, str):
+            raise TypeError("Credentials are not buffered, pass its key instead")
+        data = {**data, "run_id": run_id}
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO buffer (run_id, table_name, credential, data, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    table,
+                    credential,
+                    json.dumps(data, default=_encode),
+                    time.time(),
+                ),
+            )
+        logger.info(f"Buffer {table} row of run {run_id}")
+
+    def pending(self) -> int:
+        return (
+            self._conn()
+            .execute("SELECT COUNT(*) FROM buffer WHERE synced IS NULL")
+            .fetchone()[0]
+        )
+
+    def sync(self, batch: int = 500) -> tuple[int, int]:
+        """
+        Upsert pending rows to their targets, return (synced, failed).
+        """
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT run_id, table_name, credential, data FROM buffer "
+            "WHERE synced IS NULL ORDER BY attempts, created LIMIT ?",
+            (batch,),
+        ).fetchall()
+        groups: dict[tuple[str, str], list[tuple[str, dict]]] = {}
+        for run_id, table, credential, data in rows:
+            groups.setdefault((table, credential), []).append(
+                (run_id, json.loads(data, object_hook=_decode))
+            )
+
+        synced = failed = 0
+        for (table, credential), items in groups.items():
+            run_ids = [run_id for run_id, _ in items]
+            mdb = DBHelper()
+            try:
+                mdb.connect(getattr(DBtables, table), self._credential(credential))
+                try:
+                    mdb.create_table()
+                    mdb.upsert([data for _, data in items])
+                finally:
+                    mdb.disconnect()
+            except Exception as e:
+                failed += len(items)
+                with conn:
+                    conn.executemany(
+                        "UPDATE buffer SET attempts = attempts + 1, error = ? "
+                        "WHERE run_id = ?",
+                        [(str(e), run_id) for run_id in run_ids],
+                    )
+                logger.warning(f"Sync {len(items)} {table} rows failed: {e}")
+                continue
+            synced += len(items)
+            with conn:
+                conn.executemany(
+                    "UPDATE buffer SET synced = ?, error = NULL WHERE run_id = ?",
+                    [(time.time(), run_id) for run_id in run_ids],
+                )
+            logger.success(f"Sync {len(items)} {table} rows")
+        return synced, failed
+
+    @staticmethod
+    def _credential(credential: str) -> dict:
+        # rows buffered by an older version hold the credential as json
+        if credential.startswith("{"):
+            return json.loads(credential)
+        return resolve_credential(credential)
+
+    def purge(self, days: int = 30) -> None:
+        """
+        Drop rows synced more than `days` ago.
+        """
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM buffer WHERE synced < ?", (time.time() - days * 86400,)
+            )
+
+
+class DBSyncWorker(threading.Thread):
+    """
+    Sync the buffer every `interval` seconds or as soon as woken up, a
+    stopped worker still syncs the rows put before `stop()`.
+    """
+
+    def __init__(self, buffer: DBBuffer, interval: float = 60, batch: int = 500):
+        super().__init__(name="DBSyncWorker", daemon=True)
+        self.buffer = buffer
+        self.interval = interval
+        self.batch = batch
+        self.event_wake = threading.Event()
+        self.event_stop = threading.Event()
+
+    def wake(self) -> None:
+        self.event_wake.set()
+
+    def stop(self) -> None:
+        self.event_stop.set()
+        self.event_wake.set()
+
+    def run(self) -> None:
+        while True:
+            self.event_wake.wait(self.interval)
+            self.event_wake.clear()
+            try:
+                # keep syncing while full batches are pending
+                while True:
+                    synced, failed = self.buffer.sync(self.batch)
+                    if failed or synced < self.batch:
+                        break
+                self.buffer.purge()
+            except Exception:
+                logger.exception("Unable to sync database buffer!")
+            # woken up during the sync, rows put meanwhile are synced first
+            if self.event_stop.is_set() and not self.event_wake.is_set():
+                break
+
+
+_buffer: Optional[DBBuffer] = None
+_worker: Optional[DBSyncWorker] = None
+_lock = threading.Lock()
+
+
+def get_buffer() -> DBBuffer:
+    """
+    Return the process wide buffer with its sync worker started.
+    """
+    global _buffer, _worker
+    with _lock:
+        if _buffer is None:
+            _buffer = DBBuffer()
+        if _worker is None or not _worker.is_alive():
+            _worker = DBSyncWorker(_buffer)
+            _worker.start()
+        return _buffer
+
+
+def sync_now() -> None:
+    """
+    Wake up the sync worker of the process.
+    """
+    get_buffer()
+    _worker.wake()
+
+
+def stop_sync(timeout: float = 10.0) -> bool:
+    """
+    Sync pending rows and stop the worker of the process, wait up to
+    `timeout` seconds. Return True if it finished, rows not synced stay
+    buffered for the next run.
+    """
+    global _worker
+    with _lock:
+        worker, _worker = _worker, None
+    if worker is None:
+        return True
+    worker.stop()
+    worker.join(timeout)
+    if worker.is_alive():
+        logger.warning(f"Database sync still running, rows stay in {BUFFER_FILE}!")
+        return False
+    return True
+
+
+@click.command()
+@click.option("--file", default=str(BUFFER_FILE), help="local buffer database")
+@click.option("--interval", default=0, type=int, help="sync interval, 0 syncs once")
+@click.option("--batch", default=500, type=int, help="rows per upsert")
+def main(file: str, interval: int, batch: int) -> None:
+    buffer = DBBuffer(Path(file))
+    while True:
+        synced, failed = buffer.sync(batch)
+        logger.info(f"synced: {synced}, failed: {failed}, pending: {buffer.pending()}")
+        if failed or synced < batch:
+            if not interval:
+                break
+            time.sleep(interval)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,13 @@
 # \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
 # ============================================================================================================
 
+import threading
 from datetime import datetime
 from typing import Union
 
 from loguru import logger
-from sqlalchemy.engine import URL
+from sqlalchemy import delete, insert, inspect, text
+from sqlalchemy.engine import URL, Engine
 from sqlmodel import Session, SQLModel, create_engine, select
 
 try:
@@ -17,6 +19,34 @@ except:
     from DBtables import BaseModel, BugTicket, Hero, Stability
 
 
+_engines: dict[str, Engine] = {}
+_verified: set[str] = set()
+_lock = threading.Lock()
+
+
+def get_engine(url_object: URL, echo=False) -> Engine:
+    """
+    Return the pooled engine of given database url, one engine is shared by
+    the whole process. Pre-ping replaces connections dropped by the server.
+    """
+    key = url_object.render_as_string(hide_password=False)
+    with _lock:
+        if key not in _engines:
+            _engines[key] = create_engine(
+                url_object, echo=echo, pool_pre_ping=True, pool_recycle=3600
+            )
+            logger.info(f"Create database engine {url_object}")
+        return _engines[key]
+
+
+def dispose_engines() -> None:
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _verified.clear()
+
+
 class DBHelper:
     def __init__(self) -> None: ...
 
@@ -36,24 +66,94 @@ class DBHelper:
         """
         self.table = table
         url_object = URL.create(**credential)
-        # Create the engine, we should use a single one shared by all the application code, and that's what we are doing here.
+        # The engine is shared by all the application code, and pooled connections are reused between sessions.
         # Echo prints out SQL syntax && details
-        self.engine = create_engine(url_object, echo=echo)
+        self.engine = get_engine(url_object, echo=echo)
         self.session = Session(self.engine)
         logger.info(f"Open database session with engine {url_object}")
 
     def create_table(self) -> None:
         # Create all the tables for the models registered in SQLModel.metadata, which is Hero here. However it can be multiple.
         # This also creates the database if it doesn't exist already.
+        # Schema is only verified once per engine, table and process.
+        key = f"{self.engine.url.render_as_string(hide_password=False)}#{self.table.__tablename__}"
+        if key in _verified:
+            return
         SQLModel.metadata.create_all(self.engine)
+        self._add_missing_columns()
+        _verified.add(key)
         # logger.success("Create database and table")
 
+    def _add_missing_columns(self) -> None:
+        # `create_all` never alters existing tables, add columns introduced to the model afterwards.
+        table = self.table.__table__
+        existing = {c["name"] for c in inspect(self.engine).get_columns(table.name)}
+        added = [c for c in table.columns if c.name not in existing]
+        if not added:
+            return
+        with self.engine.begin() as conn:
+            for column in added:
+                column_type = column.type.compile(dialect=self.engine.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+                logger.warning(f"Add column {column.name} to table {table.name}")
+        for index in table.indexes:
+            if any(c.name not in existing for c in index.columns):
+                index.create(self.engine, checkfirst=True)
+
     def insert_row(self, data: dict) -> None:
         row = self.table.new_item(data)
         self.session.add(row)
         self.session.commit()
         logger.success(f"Insert new row into database {data}")
 
+    def bulk_insert(self, rows: list[dict]) -> None:
+        """
+        Insert all rows in one executemany round-trip.
+        """
+        if not rows:
+            return
+        self.session.execute(insert(self.table), rows)
+        self.session.commit()
+        logger.success(f"Insert {len(rows)} rows into database")
+
+    def upsert(self, rows: list[dict], key: str = "run_id") -> None:
+        """
+        Insert rows or update existing rows with the same unique `key`, so
+        uploading the same rows again is harmless.
+        """
+        if not rows:
+            return
+        table = self.table.__table__
+        columns = [c.name for c in table.columns if not c.primary_key and c.name != key]
+        dialect = self.engine.dialect.name
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+            stmt = mysql_insert(table)
+            stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns})
+        elif dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key], set_={c: stmt.excluded[c] for c in columns}
+            )
+        else:
+            self.session.execute(
+                delete(table).where(table.c[key].in_([row[key] for row in rows]))
+            )
+            stmt = insert(table)
+        self.session.execute(stmt, rows)
+        self.session.commit()
+        logger.success(f"Upsert {len(rows)} rows into database")
+
     def select_all(self) -> list:
         # just for simple usage, not support query filter here. Pls refer to docs for advanced filter.
         # statement = select(Hero).where(Hero.name == "Deadpond")
@@ -52,6 +52,8 @@ class TestRecords(BaseModel):
 
 class Stability(BaseModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    # unique key of a suite run, makes buffered uploads idempotent
+    run_id: Optional[str] = Field(default=None, max_length=64, unique=True, index=True)
     soc_version: Optional[str] = None
     cus_version: Optional[str] = None
     tester: str
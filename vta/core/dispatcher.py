@@ -0,0 +1,271 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Background dispatcher for listener side effects (database, mail, RQM).
+
+Every job is written to the spool directory before it is queued, and its
+spool file is only removed once the job succeeded. Listeners therefore never
+block on a slow database or SMTP relay: jobs not finished when Robot exits,
+or failed because the target was unreachable, stay spooled and are sent
+later with
+
+python -m vta.core.dispatcher --spool ~/.vta/spool
+
+Credentials are never spooled. A job only carries the key of its credential,
+e.g. "MAIL_CREDENTIAL", which is resolved when the job runs from the
+credentials registered by the listener process, or else from the variable of
+that name in `vta/conf/settings.py`. The spool is readable by its owner only.
+"""
+import importlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import click
+from loguru import logger
+
+SPOOL_DIR = Path.home() / ".vta" / "spool"
+# a running job older than this is considered orphaned by a killed process
+STALE_RUNNING = 10 * 60
+SETTINGS_MODULE = "vta.conf.settings"
+
+_credentials: dict[str, dict] = {}
+
+
+def register_credential(key: str, credential: dict) -> str:
+    """
+    Keep a credential in memory for the jobs of this process, return the key
+    to pass as "credential" of a job payload.
+    """
+    _credentials[key] = credential
+    return key
+
+
+def resolve_credential(key) -> dict:
+    """
+    Return the registered credential of given key, or the variable of that
+    name in the settings module.
+    """
+    if isinstance(key, dict):
+        # spooled by an older version
+        return key
+    if key in _credentials:
+        return _credentials[key]
+    try:
+        credential = getattr(importlib.import_module(SETTINGS_MODULE), key)
+    except (ImportError, AttributeError):
+        raise KeyError(
+            f"Credential {key} is neither registered nor defined in {SETTINGS_MODULE}"
+        )
+    return credential
+
+
+def _encode(obj):
+    if isinstance(obj, datetime):
+        return {"__datetime__": obj.isoformat()}
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _handle_db(payload: dict) -> None:
+    from vta.core.db import DBtables
+    from vta.core.db.DBHelper import DBHelper
+
+    mdb = DBHelper()
+    mdb.connect(
+        getattr(DBtables, payload["table"]), resolve_credential(payload["credential"])
+    )
+    try:
+        mdb.create_table()
+        if "rows" in payload:
+            mdb.bulk_insert(payload["rows"])
+        else:
+            mdb.insert_row(payload["data"])
+    finally:
+        mdb.disconnect()
+
+
+def _handle_mail(payload: dict) -> None:
+    from vta.core.mail.EMAILClient import EmailClient
+
+    credential = resolve_credential(payload["credential"])
+    mail = EmailClient(
+        sender=credential.get("sender"),
+        username=credential.get("username"),
+        password=credential.get("password"),
+    )
+    mail.send_mail(credential.get("recepients"), payload["subject"], payload["body"])
+
+
+def _handle_rqm(payload: dict) -> None:
+    from vta.core.rqm.CRQM import CRQMClient
+
+    client = CRQMClient(**resolve_credential(payload["credential"]))
+    if not client.login():
+        raise Exception("Login RQM failed!")
+    try:
+        res = client.createResource(payload["resource_type"], payload["content"])
+        if not res["success"]:
+            raise Exception(res["message"])
+    finally:
+        client.disconnect()
+
+
+HANDLERS: dict[str, Callable[[dict], None]] = {
+    "db": _handle_db,
+    "mail": _handle_mail,
+    "rqm": _handle_rqm,
+}
+
+
+def _write(file: Path, job: dict) -> None:
+    tmp = file.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(job, f, default=_encode)
+    os.replace(tmp, file)
+
+
+def _read(file: Path) -> dict:
+    with open(file, "r") as f:
+        return json.load(f, object_hook=_decode)
+
+
+def run_job(file: Path) -> bool:
+    """
+    Claim and run one spooled job, return True if it succeeded.
+    """
+    running = file.with_suffix(".running")
+    try:
+        os.replace(file, running)
+    except FileNotFoundError:
+        # claimed by another worker
+        return False
+    job = _read(running)
+    try:
+        HANDLERS[job["kind"]](job["payload"])
+    except Exception as e:
+        job["attempts"] = job.get("attempts", 0) + 1
+        job["error"] = str(e)
+        _write(file, job)
+        running.unlink(missing_ok=True)
+        logger.warning(f"Side effect {job['kind']} failed, spooled to {file}: {e}")
+        return False
+    running.unlink(missing_ok=True)
+    logger.success(f"Side effect {job['kind']} done")
+    return True
+
+
+class Dispatcher:
+    def __init__(self, spool_dir: Path = SPOOL_DIR) -> None:
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.chmod(self.spool_dir, 0o700)
+        self.queue: queue.Queue[Path] = queue.Queue()
+        # daemon, pending jobs must never keep the robot process alive
+        self.worker = threading.Thread(
+            target=self._work, name="SideEffectDispatcher", daemon=True
+        )
+        self.worker.start()
+
+    def _work(self) -> None:
+        while True:
+            file = self.queue.get()
+            try:
+                run_job(file)
+            except Exception:
+                logger.exception(f"Unable to run side effect {file}!")
+            finally:
+                self.queue.task_done()
+
+    def submit(self, kind: str, payload: dict) -> Path:
+        """
+        Spool a job of given kind ("db", "mail", "rqm") and queue it, the
+        "credential" of the payload is the key of a registered credential.
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown side effect: {kind}")
+        if not isinstance(payload.get("credential"), str):
+            raise TypeError("Credentials are not spooled, pass its key instead")
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_{kind}_{uuid.uuid4().hex[:8]}"
+        file = self.spool_dir / f"{name}.json"
+        _write(file, {"kind": kind, "payload": payload, "attempts": 0})
+        self.queue.put(file)
+        return file
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """
+        Wait up to `timeout` seconds for queued jobs, return True if all
+        finished. Unfinished jobs stay spooled for `flush`.
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                logger.warning(
+                    f"{self.queue.unfinished_tasks} side effects pending, "
+                    f"flush {self.spool_dir} later!"
+                )
+                return False
+            time.sleep(0.1)
+        return True
+
+
+_dispatcher: Optional[Dispatcher] = None
+_lock = threading.Lock()
+
+
+def get_dispatcher() -> Dispatcher:
+    """
+    Return the dispatcher shared by all listeners of the process.
+    """
+    global _dispatcher
+    with _lock:
+        if _dispatcher is None:
+            _dispatcher = Dispatcher()
+        return _dispatcher
+
+
+def flush_spool(spool_dir: Path = SPOOL_DIR) -> tuple[int, int]:
+    """
+    Run all spooled jobs in order, return (succeeded, failed).
+    """
+    spool_dir = Path(spool_dir)
+    now = time.time()
+    for running in spool_dir.glob("*.running"):
+        if now - running.stat().st_mtime > STALE_RUNNING:
+            os.replace(running, running.with_suffix(".json"))
+    succeeded = failed = 0
+    for file in sorted(spool_dir.glob("*.json")):
+        if run_job(file):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+@click.command()
+@click.option("--spool", default=str(SPOOL_DIR), help="spool directory")
+def flush(spool: str) -> None:
+    succeeded, failed = flush_spool(Path(spool))
+    logger.info(f"Flush finished, succeeded: {succeeded}, failed: {failed}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    flush()
@@ -33,18 +33,24 @@
 # 2022-05-20:
 #  -
 # ******************************************************************************
+import copy
 import os
+import threading
 import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 
 import requests
 from loguru import logger
 from lxml import etree
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 
 # Disable request warning
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from urllib3.util.retry import Retry
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 #
@@ -74,6 +80,102 @@ def get_xml_tree(file_name, bdtd_validation=True):
     return oTree
 
 
+@lru_cache(maxsize=None)
+def _parse_xml_template(file_name):
+    """
+    Parse xml template file once per process.
+
+    Note:
+       The returned tree is shared between all callers and must never be
+       modified, use `get_xml_template` to get a modifiable copy.
+    """
+    return get_xml_tree(file_name, bdtd_validation=False)
+
+
+def get_xml_template(file_name):
+    """
+    Return a modifiable copy of the xml template from file.
+
+    Note:
+       Template file is only read and parsed at the first call, later calls
+       deep-copy the cached tree.
+
+    Args:
+       file_name : path to template file.
+
+    Returns:
+       oTree : xml etree object
+    """
+    return copy.deepcopy(_parse_xml_template(os.path.abspath(file_name)))
+
+
+#
+#  HTTP transport
+#
+###########################################################################
+
+
+class CRQMTransport(HTTPAdapter):
+    """
+    HTTP adapter for CRQMClient session with sized keep-alive connection pool,
+    retry with exponential backoff on idempotent methods, default timeout per
+    request and request timing metrics.
+    """
+
+    # POST is not idempotent on RQM (would create duplicated resources)
+    RETRY_METHODS = frozenset(["GET", "HEAD", "PUT", "OPTIONS"])
+    RETRY_STATUS = (500, 502, 503, 504)
+
+    def __init__(self, pool_size=10, retries=3, backoff=0.5, timeout=(10, 60)):
+        """
+        Constructor for CRQMTransport class
+
+        Args:
+           pool_size : number of kept-alive connections per host.
+
+           retries : retry times for connection errors and 5xx responses.
+
+           backoff : backoff factor, waits backoff * 2^(retry - 1) seconds.
+
+           timeout : default (connect, read) timeout in seconds of each request.
+        """
+        self.timeout = timeout
+        # optional object with acquire(), called before every request is sent
+        self.limiter = None
+        self.metrics = dict()
+        self._metricsLock = threading.Lock()
+        oRetry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=self.RETRY_STATUS,
+            allowed_methods=self.RETRY_METHODS,
+            raise_on_status=False,
+        )
+        super().__init__(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=oRetry
+        )
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = time.perf_counter()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            self._record(request.method, time.perf_counter() - start)
+
+    def _record(self, method, elapsed):
+        with self._metricsLock:
+            dMetric = self.metrics.setdefault(
+                method, {"count": 0, "total": 0.0, "max": 0.0}
+            )
+            dMetric["count"] += 1
+            dMetric["total"] += elapsed
+            dMetric["max"] = max(dMetric["max"], elapsed)
+
+
 #
 #  IBM Rational Quality Manager
 #
@@ -141,7 +243,18 @@ class CRQMClient:
         "ns21": "http://www.w3.org/1999/XSL/Transform",
     }
 
-    def __init__(self, user, password, project, host):
+    def __init__(
+        self,
+        user,
+        password,
+        project,
+        host,
+        verify=False,
+        pool_size=10,
+        retries=3,
+        backoff=0.5,
+        timeout=(10, 60),
+    ):
         """
         Constructor for CRQMClient class
 
@@ -154,6 +267,17 @@ class CRQMClient:
 
            host : the url that RQM is hosted.
 
+           verify (optional) : verify server certificate, or path to CA bundle.
+
+           pool_size (optional) : number of kept-alive connections to RQM.
+
+           retries (optional) : retry times of idempotent requests on
+              connection errors and 5xx responses.
+
+           backoff (optional) : exponential backoff factor between retries.
+
+           timeout (optional) : default (connect, read) timeout of each request.
+
         Returns:
            CRQMClient instance
 
@@ -164,7 +288,15 @@ class CRQMClient:
         self.pw = password
         self.projectname = project
         self.projectID = urllib.parse.quote_plus(project)  # encode URI for project name
+        # passed on every request, a session setting is overridden by
+        # REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE of the environment
+        self.verify = verify
         self.session = requests.Session()
+        self.transport = CRQMTransport(
+            pool_size=pool_size, retries=retries, backoff=backoff, timeout=timeout
+        )
+        self.session.mount("https://", self.transport)
+        self.session.mount("http://", self.transport)
         # Required request headers for creating new resource
         self.headers = {
             "Accept": "application/xml",
@@ -218,7 +350,7 @@ class CRQMClient:
             res = self.session.post(
                 self.host + "/qm/j_security_check",
                 allow_redirects=True,
-                verify=False,
+                verify=self.verify,
                 data={"j_username": self.userID, "j_password": self.pw},
             )
         except ConnectionError as e:
@@ -255,7 +387,9 @@ class CRQMClient:
         # Try to get project UUID from provided project name
         # Then use project UUID instead of name in request URL
         resProjects = self.session.get(
-            self.host + "/qm/process/project-areas", allow_redirects=True, verify=False
+            self.host + "/qm/process/project-areas",
+            allow_redirects=True,
+            verify=self.verify,
         )
         if resProjects.status_code == 200:
             oProjects = get_xml_tree(
@@ -280,6 +414,23 @@ class CRQMClient:
         """
         self.session.close()
 
+    def getRequestMetrics(self):
+        """
+        Return timing metrics of all requests sent by this client.
+
+        Returns:
+           dMetrics : a dictionary of metrics per HTTP method.
+              {\
+                 'GET' : {'count': 10, 'total': 1.2, 'max': 0.3, 'mean': 0.12}\
+              }
+        """
+        dMetrics = dict()
+        with self.transport._metricsLock:
+            for sMethod, dMetric in self.transport.metrics.items():
+                dMetrics[sMethod] = dict(dMetric)
+                dMetrics[sMethod]["mean"] = dMetric["total"] / dMetric["count"]
+        return dMetrics
+
     def config(
         self,
         plan_id,
@@ -501,7 +652,9 @@ class CRQMClient:
             + "[title='{0}']".format(title)
         )
         try:
-            resData = self.session.get(fieldURL, allow_redirects=True, verify=False)
+            resData = self.session.get(
+                fieldURL, allow_redirects=True, verify=self.verify
+            )
             oResData = get_xml_tree(
                 BytesIO(str(resData.text).encode()), bdtd_validation=False
             )
@@ -533,10 +686,54 @@ class CRQMClient:
            res : response data of GET request.
         """
         res = self.session.get(
-            self.resourceURL(resourceType, id), allow_redirects=True, verify=False
+            self.resourceURL(resourceType, id), allow_redirects=True, verify=self.verify
         )
         return res
 
+    def iterAllByResource(self, resourceType):
+        """
+        Yield all entries of provided resource page by page.
+
+        Note:
+           Pages are fetched iteratively by following the `rel="next"` link.
+           The next page is requested in background while the current one is
+           parsed, so the session must not be used concurrently by the caller
+           until the generator is exhausted.
+
+        Args:
+           resourrceType : the RQM resource type.
+
+        Yields:
+           (sEntryID, sEntryName) : ID and title of each entry.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            oFuture = executor.submit(self.getResourceByID, resourceType, None)
+            while oFuture is not None:
+                resData = oFuture.result()
+                if resData.status_code != 200:
+                    raise Exception(
+                        "Get data of %s failed. Reason: %s"
+                        % (resourceType, resData.reason)
+                    )
+                oResData = get_xml_tree(BytesIO(resData.content), bdtd_validation=False)
+                nsmap = oResData.getroot().nsmap
+
+                # prefetch next page before parsing entries of current page
+                oFuture = None
+                oNextPage = oResData.find('./link[@rel="next"]', nsmap)
+                if oNextPage != None:
+                    sNextPageURL = oNextPage.attrib["href"]
+                    sResourceWithPageIdx = sNextPageURL.split("/")[-1]
+                    oFuture = executor.submit(
+                        self.getResourceByID, sResourceWithPageIdx, None
+                    )
+
+                for oEntry in oResData.iterfind("entry", nsmap):
+                    sURLID = oEntry.find("./id", nsmap).text
+                    sEntryID = (sURLID.split("/")[-1]).split(":")[-1]
+                    sEntryName = oEntry.find("./title", nsmap).text
+                    yield sEntryID, sEntryName
+
     def getAllByResource(self, resourceType):
         """
         Return all entries of provided resource by GET method.
@@ -553,31 +750,8 @@ class CRQMClient:
         dReturn = {"success": False, "message": "", "data": {}}
 
         try:
-            resData = self.getResourceByID(resourceType, None)
-            oResData = get_xml_tree(
-                BytesIO(str(resData.text).encode()), bdtd_validation=False
-            )
-            nsmap = oResData.getroot().nsmap
-
-            for oEntry in oResData.findall("entry", nsmap):
-                sURLID = oEntry.find("./id", nsmap).text
-                sEntryID = (sURLID.split("/")[-1]).split(":")[-1]
-                sEntryName = oEntry.find("./title", nsmap).text
+            for sEntryID, sEntryName in self.iterAllByResource(resourceType):
                 dReturn["data"][sEntryID] = sEntryName
-
-            # Try to get data from next page
-            oNextPage = oResData.find('./link[@rel="next"]', nsmap)
-            if oNextPage != None:
-                sNextPageURL = oNextPage.attrib["href"]
-                sResourceWithPageIdx = sNextPageURL.split("/")[-1]
-                res = self.getAllByResource(sResourceWithPageIdx)
-                if res["success"]:
-                    dReturn["data"].update(res["data"])
-                else:
-                    raise Exception(
-                        "Get data of %s failed. Reason: %s"
-                        % (resourceType, res["message"])
-                    )
             dReturn["success"] = True
         except Exception as error:
             dReturn["message"] = str(error)
@@ -632,7 +806,9 @@ class CRQMClient:
            }
         """
         req_url = f"{self.host}/qm/process/project-areas/{self.projectID}/team-areas"
-        resTeamAreas = self.session.get(req_url, allow_redirects=True, verify=False)
+        resTeamAreas = self.session.get(
+            req_url, allow_redirects=True, verify=self.verify
+        )
         if resTeamAreas.status_code == 200:
             oTeams = get_xml_tree(
                 BytesIO(str(resTeamAreas.text).encode()), bdtd_validation=False
@@ -678,7 +854,7 @@ class CRQMClient:
         )
         try:
             req_url = self.resourceURL("executionworkitem") + filter_url
-            result = self.session.get(req_url, allow_redirects=True, verify=False)
+            result = self.session.get(req_url, allow_redirects=True, verify=self.verify)
             oTree = get_xml_tree(
                 BytesIO(str(result.text).encode()), bdtd_validation=False
             )
@@ -744,7 +920,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "testsuite.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
 
         nsmap = oTree.getroot().nsmap
         oTittle = oTree.find("ns4:title", nsmap)
@@ -797,7 +973,7 @@ class CRQMClient:
         """
         if not sTCtemplate:
             sTemplatePath = os.path.join(self.templatesDir, "testcase.xml")
-            oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+            oTree = get_xml_template(sTemplatePath)
         else:
             oTree = get_xml_tree(BytesIO(sTCtemplate.encode()), bdtd_validation=False)
 
@@ -925,9 +1101,9 @@ class CRQMClient:
             nsmap,
         )
         if oRobotFile != None:
-            oRobotFile.find(
-                f'{{{self.NAMESPACES["ns2"]}}}value', nsmap
-            ).text = sRobotFile
+            oRobotFile.find(f'{{{self.NAMESPACES["ns2"]}}}value', nsmap).text = (
+                sRobotFile
+            )
 
         # link to provided valid team-area
         if sTeam:
@@ -951,7 +1127,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "testscript.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
         root = oTree.getroot()
         nsmap = root.nsmap
         testerURL = self.userURL(self.userID)
@@ -1036,7 +1212,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "executionworkitem.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
         root = oTree.getroot()
         nsmap = root.nsmap
         # prepare required data for template
@@ -1136,7 +1312,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "executionresult.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
         root = oTree.getroot()
         nsmap = root.nsmap
         # prepare required data for template
@@ -1281,7 +1457,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "buildrecord.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
 
         nsmap = oTree.getroot().nsmap
         oTittle = oTree.find("ns3:title", nsmap)
@@ -1300,7 +1476,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "configuration.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
 
         nsmap = oTree.getroot().nsmap
         oTittle = oTree.find("ns3:title", nsmap)
@@ -1330,7 +1506,7 @@ class CRQMClient:
            xml template as string.
         """
         sTemplatePath = os.path.join(self.templatesDir, "suiteexecutionrecord.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
         root = oTree.getroot()
         # prepare required data for template
         TSERTittle = "TSER: " + testsuiteName
@@ -1410,7 +1586,7 @@ class CRQMClient:
 
         """
         sTemplatePath = os.path.join(self.templatesDir, "testsuitelog.xml")
-        oTree = get_xml_tree(sTemplatePath, bdtd_validation=False)
+        oTree = get_xml_template(sTemplatePath)
 
         # prepare required data for template
         resultTittle = "Testsuite result: " + testsuiteName
@@ -1520,7 +1696,7 @@ class CRQMClient:
         res = self.session.post(
             self.resourceURL(resourceType),
             allow_redirects=True,
-            verify=False,
+            verify=self.verify,
             data=content,
             headers=self.headers,
         )
@@ -1543,10 +1719,9 @@ class CRQMClient:
                         res.text, tagID="ns2:webId"
                     )
                 except Exception as error:
-                    returnObj[
-                        "message"
-                    ] = "Extract ID information from response failed. Reason: %s" % str(
-                        error
+                    returnObj["message"] = (
+                        "Extract ID information from response failed. Reason: %s"
+                        % str(error)
                     )
         else:
             # Get new creation ID from response
@@ -1564,10 +1739,9 @@ class CRQMClient:
                 returnObj["success"] = True
 
             except Exception as error:
-                returnObj[
-                    "message"
-                ] = "Extract ID information from response failed. Reason: %s" % str(
-                    error
+                returnObj["message"] = (
+                    "Extract ID information from response failed. Reason: %s"
+                    % str(error)
                 )
 
         return returnObj
@@ -1708,7 +1882,7 @@ class CRQMClient:
         res = self.session.put(
             self.resourceURL(resourceType, id),
             allow_redirects=True,
-            verify=False,
+            verify=self.verify,
             data=content,
         )
         return res
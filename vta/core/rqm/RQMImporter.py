@@ -0,0 +1,234 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Offline importer which uploads Robot results to RQM from `output.xml`.
+
+Results are streamed from a single `output.xml` or a folder of `output_N.xml`
+files, TCERs and execution results are created concurrently by a thread
+pool, every request of the client (including lookups made inside CRQMClient)
+is rate limited at its transport, and every uploaded test is appended to a
+checkpoint file so an interrupted import can be resumed.
+
+python -m vta.core.rqm.RQMImporter --source log/<run> --plan 2933 ...
+"""
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional
+
+import click
+from loguru import logger
+
+from vta.core.RobotOutput import iter_test_results, output_files
+from vta.core.rqm.CRQM import CRQMClient
+
+
+class RateLimiter:
+    """
+    Allow at most `rate` acquisitions per second across all threads.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class RQMImporter:
+    STATE_MAPPING = {
+        "PASS": "passed",
+        "FAIL": "failed",
+        "SKIP": "notrun",
+        "NOT RUN": "notrun",
+    }
+
+    def __init__(
+        self,
+        client: CRQMClient,
+        plan_id: str,
+        workers: int = 4,
+        rate: float = 10.0,
+        checkpoint: Optional[Path] = None,
+    ) -> None:
+        self.client = client
+        self.plan_id = plan_id
+        self.workers = workers
+        self.limiter = RateLimiter(rate)
+        self.client.transport.limiter = self.limiter
+        self.checkpoint = checkpoint
+        self.done: set[str] = set()
+        self.lock = threading.Lock()
+        self.tc_ids: dict[str, str] = {}
+        self.tcer_ids: dict[str, str] = {}
+        self.key_locks: dict[str, threading.Lock] = {}
+        self.passed = 0
+        self.failed = 0
+        if self.checkpoint and self.checkpoint.exists():
+            self.done = set(self.checkpoint.read_text().splitlines())
+            logger.info(f"Resume from checkpoint {self.checkpoint}: {len(self.done)}")
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def _mark_done(self, key: str) -> None:
+        with self.lock:
+            self.done.add(key)
+            if self.checkpoint:
+                with open(self.checkpoint, "a") as f:
+                    f.write(key + "\n")
+
+    def _get_testcase_id(self, name: str) -> str:
+        if name not in self.tc_ids:
+            # concurrent misses on the same name wait for the first lookup
+            with self._key_lock(f"testcase:{name}"):
+                if name not in self.tc_ids:
+                    self.tc_ids[name] = self.client.webIDfromTitle("testcase", name)
+        return self.tc_ids[name]
+
+    def _get_tcer_id(self, tc_id: str, name: str) -> str:
+        if tc_id not in self.tcer_ids:
+            # one create per testcase, concurrent creates would duplicate TCERs
+            with self._key_lock(f"executionworkitem:{tc_id}"):
+                if tc_id not in self.tcer_ids:
+                    self.tcer_ids[tc_id] = self._create_tcer(tc_id, name)
+        return self.tcer_ids[tc_id]
+
+    def _create_tcer(self, tc_id: str, name: str) -> str:
+        # existing TCER of testcase & testplan is returned by RQM (303/200)
+        content = self.client.createTCERTemplate(
+            tc_id,
+            name,
+            self.plan_id,
+            confID=self.client.configuration or "",
+        )
+        res = self.client.createResource("executionworkitem", content)
+        if not res["id"]:
+            raise Exception(f"Cannot create TCER of '{name}': {res['message']}")
+        return res["id"]
+
+    def _upload(self, key: str, test: dict) -> None:
+        tc_id = self._get_testcase_id(test["name"])
+        tcer_id = self._get_tcer_id(tc_id, test["name"])
+        if "block" in test["tags"]:
+            state = "blocked"
+        else:
+            state = self.STATE_MAPPING.get(test["status"], "inconclusive")
+        content = self.client.createExecutionResultTemplate(
+            testcaseID=tc_id,
+            testcaseName=test["name"],
+            TCERID=tcer_id,
+            resultState=state,
+            testplanID=self.plan_id,
+            startTime=test["start_time"] or "",
+            endTime=test["end_time"] or "",
+            duration=test["duration"],
+            buildrecordID=self.client.build or "",
+        )
+        res = self.client.createResource("executionresult", content)
+        if not res["success"]:
+            raise Exception(f"Cannot create result of '{key}': {res['message']}")
+        self._mark_done(key)
+
+    def run(self, source: Path) -> bool:
+        """
+        Upload all results of given source, return True if nothing failed.
+        """
+        files = output_files(source)
+        if not files:
+            logger.error(f"No output file found in {source}!")
+            return False
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            for file in files:
+                for test in iter_test_results(file):
+                    key = f"{file.name}::{test['index']}::{test['name']}"
+                    if key in self.done:
+                        continue
+                    # bound in-flight uploads to keep memory constant
+                    if len(pending) >= self.workers * 2:
+                        self._collect(pending, FIRST_COMPLETED)
+                    pending[executor.submit(self._upload, key, test)] = key
+            self._collect(pending)
+
+        logger.info(f"Import finished, uploaded: {self.passed}, failed: {self.failed}")
+        return self.failed == 0
+
+    def _collect(self, pending: dict, return_when: str = ALL_COMPLETED) -> None:
+        finished, _ = wait(pending, return_when=return_when)
+        for future in finished:
+            key = pending.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Upload {key} failed: {e}")
+            else:
+                self.passed += 1
+                logger.success(f"Upload {key} successfully!")
+
+
+@click.command()
+@click.option("--source", required=True, help="output.xml or folder of output_N.xml")
+@click.option("--user", required=True, help="RQM user")
+@click.option("--password", required=True, envvar="RQM_PASSWORD", help="RQM password")
+@click.option("--project", required=True, help="RQM project name")
+@click.option("--host", default="https://rb-alm-20-p.de.bosch.com", help="RQM host")
+@click.option("--plan", required=True, help="testplan ID")
+@click.option("--build", default=None, help="build record name")
+@click.option("--config", default=None, help="test environment name")
+@click.option("--workers", default=4, type=int, help="concurrent uploads")
+@click.option("--rate", default=10.0, type=float, help="max requests per second")
+@click.option("--checkpoint", default=None, help="checkpoint file for resuming")
+def importer(
+    source: str,
+    user: str,
+    password: str,
+    project: str,
+    host: str,
+    plan: str,
+    build: Optional[str],
+    config: Optional[str],
+    workers: int,
+    rate: float,
+    checkpoint: Optional[str],
+) -> None:
+    source_path = Path(source)
+    checkpoint_path = (
+        Path(checkpoint)
+        if checkpoint
+        else (source_path if source_path.is_dir() else source_path.parent)
+        / "rqm_import.checkpoint"
+    )
+    client = CRQMClient(user, password, project, host)
+    if not client.login():
+        raise click.ClickException("Login RQM failed!")
+    try:
+        client.config(plan, build_name=build, config_name=config)
+        result = RQMImporter(
+            client, plan, workers=workers, rate=rate, checkpoint=checkpoint_path
+        ).run(source_path)
+    finally:
+        client.disconnect()
+    if not result:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    importer()
@@ -0,0 +1,175 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Cached catalog of task files.
+
+The task tree is walked once per process and only walked again when the
+mtime of one of its directories changed. Tests and tags of a `.robot` file
+are read from its parsing model, which is much cheaper than building the
+whole suite with `TestSuiteBuilder` since no resource or library is imported.
+"""
+import os
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+from robot.api import get_model
+from robot.utils import normalize
+
+
+class AmbiguousTaskError(Exception):
+    def __init__(self, name: str, matches: list[Path]) -> None:
+        self.name = name
+        self.matches = matches
+        super().__init__(
+            f"Task '{name}' is ambiguous: {', '.join(str(m) for m in matches)}"
+        )
+
+
+class TaskCatalog:
+    SKIP_DIRS = ("__pycache__", ".git")
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory).resolve()
+        self.dir_mtimes: dict[str, float] = {}
+        self.files: dict[str, list[Path]] = {}
+        # {path: (mtime, [{"name", "tags"}])}
+        self._tests: dict[Path, tuple[float, list[dict]]] = {}
+
+    def _stale(self) -> bool:
+        if not self.dir_mtimes:
+            return True
+        try:
+            return any(
+                os.stat(d).st_mtime != mtime for d, mtime in self.dir_mtimes.items()
+            )
+        except FileNotFoundError:
+            return True
+
+    def refresh(self) -> None:
+        if not self._stale():
+            return
+        dir_mtimes = {}
+        files: dict[str, list[Path]] = {}
+        for root, dirs, filenames in os.walk(self.directory):
+            dirs[:] = sorted(d for d in dirs if d not in self.SKIP_DIRS)
+            dir_mtimes[root] = os.stat(root).st_mtime
+            for filename in filenames:
+                files.setdefault(filename, []).append(Path(root) / filename)
+        self.dir_mtimes = dir_mtimes
+        self.files = {name: sorted(paths) for name, paths in files.items()}
+        logger.debug(f"Task catalog of {self.directory}: {len(self.files)} files")
+
+    def lookup(self, name: str) -> list[Path]:
+        """
+        Return all files matching the basename, or the relative path to the
+        catalog directory if `name` contains a directory.
+        """
+        self.refresh()
+        relative = Path(name)
+        if len(relative.parts) == 1:
+            return list(self.files.get(name, []))
+        return [
+            path
+            for path in self.files.get(relative.name, [])
+            if path.relative_to(self.directory).parts[-len(relative.parts) :]
+            == relative.parts
+        ]
+
+    def find(self, name: str) -> Optional[Path]:
+        """
+        Return the unique file of given name, None if not found.
+
+        Raise AmbiguousTaskError if several files match, pass a relative path
+        like `qvta/qvta_binary.robot` to select one of them.
+        """
+        matches = self.lookup(name)
+        if len(matches) > 1:
+            raise AmbiguousTaskError(name, matches)
+        return matches[0] if matches else None
+
+    @property
+    def tasks(self) -> list[Path]:
+        self.refresh()
+        return sorted(
+            p for paths in self.files.values() for p in paths if p.suffix == ".robot"
+        )
+
+    @property
+    def ambiguous(self) -> dict[str, list[Path]]:
+        """
+        Return {task name: [paths]} of task names existing more than once.
+        """
+        self.refresh()
+        return {
+            name: paths
+            for name, paths in self.files.items()
+            if name.endswith(".robot") and len(paths) > 1
+        }
+
+    def tests(self, path: Path) -> list[dict]:
+        """
+        Return [{"name": test name, "tags": [tag]}] of given task file.
+        """
+        path = Path(path).resolve()
+        mtime = path.stat().st_mtime
+        cached = self._tests.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        file_tags: list[str] = []
+        default_tags: list[str] = []
+        tests = []
+        for section in get_model(str(path), data_only=True).sections:
+            for node in section.body:
+                node_type = type(node).__name__
+                if node_type in ("TestTags", "ForceTags"):
+                    file_tags += list(node.values)
+                elif node_type == "DefaultTags":
+                    default_tags += list(node.values)
+                elif node_type == "TestCase":
+                    tags = None
+                    for item in node.body:
+                        if type(item).__name__ == "Tags":
+                            tags = list(item.values)
+                    tests.append(
+                        {
+                            "name": node.name,
+                            "tags": file_tags
+                            + (tags if tags is not None else default_tags),
+                        }
+                    )
+        self._tests[path] = (mtime, tests)
+        return tests
+
+    def by_tag(self, tag: str) -> list[Path]:
+        """
+        Return task files having a test with given tag, tags are matched like
+        robot does, case, space and underscore insensitive.
+        """
+        tag = normalize(tag, ignore="_")
+        return [
+            path
+            for path in self.tasks
+            if any(
+                tag in (normalize(t, ignore="_") for t in test["tags"])
+                for test in self.tests(path)
+            )
+        ]
+
+
+_catalogs: dict[Path, TaskCatalog] = {}
+
+
+def get_catalog(directory: Path) -> TaskCatalog:
+    """
+    Return the process wide catalog of given directory.
+    """
+    directory = Path(directory).resolve()
+    if directory not in _catalogs:
+        _catalogs[directory] = TaskCatalog(directory)
+    return _catalogs[directory]
@@ -14,7 +14,7 @@ import click
 from loguru import logger
 from robot import run_cli
 
-from .utils import find_file, rotate_folder
+from .utils import find_file, rotate_folder, stop_retention
 
 
 @click.command()
@@ -85,7 +85,9 @@ def runner(
     if MODIFIER_PATH:
         common.extend(["--prerunmodifier", str(MODIFIER_PATH)])
     variable: list[str] = ["--variable", f"SLOT:SLOT_{slot}"]
-    run_cli(common + variable + ["--exclude", "skip", str(TASK_PATH)], exit=True)
+    rc = run_cli(common + variable + ["--exclude", "skip", str(TASK_PATH)], exit=False)
+    stop_retention()
+    sys.exit(rc)
 
 
 if __name__ == "__main__":
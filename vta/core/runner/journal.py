@@ -0,0 +1,102 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Append-only journal of a stability campaign.
+
+Every record is one JSON line which is flushed to disk before the runner
+continues, so the journal survives a host restart:
+
+    {"event": "campaign", "task": "powercycle.robot", "slot": 1, "time": ...}
+    {"event": "start", "loop": 1, "time": ...}
+    {"event": "end", "loop": 1, "rc": 0, "time": ...}
+    {"event": "finish", "time": ...}
+
+A loop which was started but never ended is run again on resume.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+
+class CampaignJournal:
+    FILE_NAME = "journal.jsonl"
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = Path(log_path)
+        self.file = self.log_path / self.FILE_NAME
+        self.records: list[dict] = []
+        if self.file.exists():
+            with open(self.file, "r") as f:
+                for line in f:
+                    try:
+                        self.records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # last line may be truncated by a power loss
+                        logger.warning(f"Skip broken journal record: {line!r}")
+
+    def _append(self, event: str, **kwargs) -> None:
+        record = {"event": event, **kwargs, "time": datetime.now().isoformat()}
+        self.log_path.mkdir(parents=True, exist_ok=True)
+        with open(self.file, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.records.append(record)
+
+    def open(self, task: str, slot: int, max_loop: int) -> None:
+        self._append("campaign", task=task, slot=slot, max_loop=max_loop)
+
+    def start(self, count: int) -> None:
+        self._append("start", loop=count)
+
+    def end(self, count: int, rc: int) -> None:
+        self._append("end", loop=count, rc=rc)
+
+    def finish(self) -> None:
+        self._append("finish")
+
+    @property
+    def campaign(self) -> dict:
+        return next((r for r in self.records if r["event"] == "campaign"), {})
+
+    @property
+    def finished(self) -> bool:
+        return any(r["event"] == "finish" for r in self.records)
+
+    @property
+    def completed(self) -> dict[int, int]:
+        """
+        Return {loop: exit code} of all ended loops.
+        """
+        return {r["loop"]: r["rc"] for r in self.records if r["event"] == "end"}
+
+    @property
+    def next_loop(self) -> int:
+        return max(self.completed, default=0) + 1
+
+    @classmethod
+    def latest(
+        cls, log_root: Path, task: str, slot: int
+    ) -> Optional["CampaignJournal"]:
+        """
+        Return journal of the latest unfinished campaign of given task & slot.
+        """
+        journals = sorted(
+            Path(log_root).glob(f"*_SLOT{slot}/{cls.FILE_NAME}"),
+            key=lambda file: file.stat().st_mtime,
+            reverse=True,
+        )
+        for file in journals:
+            journal = cls(file.parent)
+            if journal.campaign.get("task") != task:
+                continue
+            return None if journal.finished else journal
+        return None
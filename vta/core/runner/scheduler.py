@@ -0,0 +1,222 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Run stability loops of multiple slots of one bench concurrently.
+
+Each slot runs its loops in a dedicated worker process. Hardware resources
+listed for a slot are leased for the duration of each loop, so slots sharing
+a resource (e.g. one TSMaster instance) are serialised while all others run
+in parallel. Refer to `vta/conf/template_bench.json` for the bench format.
+"""
+import io
+import json
+import multiprocessing
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import click
+from loguru import logger
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from .stability import combine_outputs, run_loop
+from .summary import LoopSummary
+from .utils import find_file, rotate_folder, stop_retention
+
+STOP_POLICIES = ("stop_slot", "stop_all", "continue")
+
+console = Console()
+
+
+def _slot_worker(
+    slot: dict,
+    root: Path,
+    log_path: Path,
+    name: str,
+    stop_policy: str,
+    leases: dict,
+    status_queue,
+    stop_event,
+) -> None:
+    """
+    Run all loops of one slot and report status after each loop.
+    """
+    task_path = find_file(root / "vta" / "tasks", slot["task"])
+    listener = slot.get("listener")
+    modifier = slot.get("modifier")
+    listener_path = root / "vta" / "core" / listener if listener else None
+    modifier_path = root / "vta" / "core" / modifier if modifier else None
+    status = {
+        "slot": slot["slot"],
+        "task": slot["task"],
+        "loop": 0,
+        "max_loop": slot["max_loop"],
+        "passed": 0,
+        "failed": 0,
+        "state": "running",
+        "log": str(log_path),
+    }
+    if task_path is None:
+        status_queue.put({**status, "state": "task not found"})
+        return
+
+    summary = LoopSummary(log_path, f"{name} SLOT{slot['slot']}")
+    status_queue.put(status)
+    for count in range(1, slot["max_loop"] + 1):
+        if stop_event.is_set():
+            status["state"] = "stopped"
+            break
+        status["state"] = "waiting lease"
+        status_queue.put(dict(status))
+        with ExitStack() as stack:
+            # acquire in sorted order to avoid deadlocks between slots
+            for resource in sorted(slot.get("hardware", [])):
+                stack.enter_context(leases[resource])
+            status.update({"loop": count, "state": "running"})
+            status_queue.put(dict(status))
+            rc = run_loop(
+                task_path,
+                log_path,
+                count,
+                slot["slot"],
+                listener_path,
+                modifier_path,
+                extra=["--console", "none"],
+            )
+        summary.add(count, rc)
+        if rc == 0:
+            status["passed"] += 1
+            continue
+        status["failed"] += 1
+        if stop_policy == "stop_all":
+            stop_event.set()
+        if stop_policy != "continue":
+            status["state"] = f"stopped (rc={rc})"
+            break
+    else:
+        status["state"] = "finished"
+
+    status_queue.put(dict(status))
+    # slot tables are only saved to html, the live view owns the terminal
+    summary.report(Console(record=True, file=io.StringIO()))
+    combine_outputs(
+        log_path, f"{name} SLOT{slot['slot']}", summary.selected_loops(slot["sample"])
+    )
+
+
+def _render(statuses: dict) -> Table:
+    table = Table(title="Stability Scheduler")
+    for column in ("Slot", "Task", "Loop", "Pass", "Fail", "State"):
+        table.add_column(column, justify="center")
+    for slot in sorted(statuses):
+        s = statuses[slot]
+        table.add_row(
+            str(slot),
+            s["task"],
+            f"{s['loop']}/{s['max_loop']}",
+            f"[green]{s['passed']}[/green]",
+            f"[red]{s['failed']}[/red]",
+            s["state"],
+        )
+    return table
+
+
+def load_bench(file: Path) -> dict:
+    with open(file, "r") as f:
+        bench: dict = json.load(f)
+    for slot in bench["slots"]:
+        for key in ("task", "listener", "modifier", "max_loop"):
+            slot.setdefault(key, bench.get(key))
+        slot.setdefault("hardware", [])
+        slot.setdefault("sample", bench.get("sample", 10))
+    bench.setdefault("stop_policy", "stop_slot")
+    if bench["stop_policy"] not in STOP_POLICIES:
+        raise ValueError(f"Unknown stop policy: {bench['stop_policy']}")
+    return bench
+
+
+@click.command()
+@click.option("--bench", type=str, required=True, help="bench description file")
+@click.option(
+    "--stop-policy",
+    type=click.Choice(STOP_POLICIES),
+    default=None,
+    help="override stop policy of bench file",
+)
+def scheduler(bench: str, stop_policy: Optional[str]) -> None:
+    # ====================================DO NOT CHANGE====================================
+    ROOT: Path = Path(__file__).resolve().parent.parent.parent.parent
+    TIMESTAMP = f"{datetime.now().strftime('%A')}_{time.strftime('%m%d%Y_%H%M')}"
+    logger.remove()
+    logger.add(sys.stdout, level="INFO")
+    rotate_folder(ROOT / "log")
+    # ====================================DO NOT CHANGE====================================
+
+    config = load_bench(Path(bench))
+    policy = stop_policy or config["stop_policy"]
+    name = config.get("name", "Stability Test")
+    ctx = multiprocessing.get_context("spawn")
+    manager = ctx.Manager()
+    resources = {r for slot in config["slots"] for r in slot["hardware"]}
+    leases = {resource: manager.Lock() for resource in resources}
+    status_queue = manager.Queue()
+    stop_event = manager.Event()
+
+    workers = []
+    statuses: dict[int, dict] = {}
+    for slot in config["slots"]:
+        log_path = ROOT / "log" / f"{TIMESTAMP}_SLOT{slot['slot']}"
+        statuses[slot["slot"]] = {
+            "task": slot["task"],
+            "loop": 0,
+            "max_loop": slot["max_loop"],
+            "passed": 0,
+            "failed": 0,
+            "state": "starting",
+        }
+        worker = ctx.Process(
+            target=_slot_worker,
+            args=(
+                slot,
+                ROOT,
+                log_path,
+                name,
+                policy,
+                leases,
+                status_queue,
+                stop_event,
+            ),
+            name=f"SLOT{slot['slot']}",
+        )
+        worker.start()
+        workers.append(worker)
+
+    with Live(_render(statuses), console=console, refresh_per_second=2) as live:
+        while any(w.is_alive() for w in workers) or not status_queue.empty():
+            while not status_queue.empty():
+                status = status_queue.get()
+                statuses[status["slot"]] = status
+            live.update(_render(statuses))
+            time.sleep(0.5)
+
+    for worker in workers:
+        worker.join()
+        if worker.exitcode != 0:
+            logger.error(f"{worker.name} exited with code {worker.exitcode}!")
+    manager.shutdown()
+    stop_retention()
+    if any(s["failed"] for s in statuses.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    scheduler()
@@ -6,15 +6,22 @@
 
 import sys
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import click
 from loguru import logger
 from robot import rebot_cli, run_cli
+from robot.model import ModelModifier
+from robot.output import LOGGER
+from robot.running import TestSuite, TestSuiteBuilder
+from robot.running.namespace import IMPORTER
 
-from .utils import find_file, rotate_folder
+from .journal import CampaignJournal
+from .summary import LoopSummary
+from .utils import find_file, rotate_folder, stop_retention
 
 
 @click.command()
@@ -34,6 +41,22 @@ from .utils import find_file, rotate_folder
     help="listener file",
 )
 @click.option("--modifier", type=str, help="modifier file")
+@click.option(
+    "--in-process",
+    is_flag=True,
+    help="build suite once and keep libraries connected between loops",
+)
+@click.option(
+    "--sample",
+    default=10,
+    type=int,
+    help="number of passed loops included in combined rebot report",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="continue latest unfinished campaign of task and slot",
+)
 def runner(
     task: str,
     slot: int,
@@ -41,6 +64,9 @@ def runner(
     name: str,
     listener: str,
     modifier: Optional[str],
+    in_process: bool,
+    sample: int,
+    resume: bool,
 ) -> None:
     # ====================================DO NOT CHANGE====================================
     ROOT: Path = Path(__file__).resolve().parent.parent.parent.parent
@@ -49,6 +75,10 @@ def runner(
         / "log"
         / f"{datetime.now().strftime('%A')}_{time.strftime('%m%d%Y_%H%M')}_SLOT{slot}"
     )
+    # a resumed campaign logs to its own folder, no new run folder is created
+    journal = CampaignJournal.latest(ROOT / "log", task, slot) if resume else None
+    if journal:
+        LOG_PATH = journal.log_path
     TASK_PATH: Path = find_file(ROOT / "vta" / "tasks", task)
     LISTENER_PATH: Optional[Path] = (
         ROOT / "vta" / "core" / listener if listener else None
@@ -70,58 +100,223 @@ def runner(
     rotate_folder(ROOT / "log")
     # ====================================DO NOT CHANGE====================================
 
-    if not TASK_PATH.exists():
+    if TASK_PATH is None or not TASK_PATH.exists():
         logger.error(f"{task} not exist!")
         sys.exit(1)
 
-    count = 1
-    for i in range(max_loop):
-        logger.info("!!Start running stability test!!")
-        try:
-            logger.remove()
-        except ValueError:
-            logger.warning("Logger handler has been removed!")
-        logger.add(
-            f"{LOG_PATH}/log_{count}.log",
-            backtrace=True,
-            diagnose=False,
-            format="{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}",
-            rotation="1 week",
-            level="TRACE",
-        )
-        common = [
-            "--exitonfailure",
-            "--outputdir",
-            f"{LOG_PATH}",
-            "--output",
-            f"output_{count}.xml",
-            "--log",
-            f"log_{count}.html",
-            "--report",
-            "none",
-        ]
-        if LISTENER_PATH:
-            common += ["--listener", str(LISTENER_PATH)]
-        if MODIFIER_PATH:
-            common += ["--prerunmodifier", str(MODIFIER_PATH)]
-        variable = ["--variable", f"SLOT:SLOT_{slot}"]
-        rc = run_cli(
-            common + variable + ["--exclude", "skip", str(TASK_PATH)], exit=False
+    if journal:
+        logger.info(f"Resume campaign {LOG_PATH} from loop {journal.next_loop}")
+    else:
+        if resume:
+            logger.warning("No unfinished campaign found, start a new one")
+        journal = CampaignJournal(LOG_PATH)
+        journal.open(task, slot, max_loop)
+
+    summary = LoopSummary(LOG_PATH, name)
+
+    def on_loop(count: int, rc: int) -> None:
+        # summary first, a loop without end record is run again on resume
+        summary.add(count, rc)
+        journal.end(count, rc)
+
+    if in_process:
+        run_in_process(
+            TASK_PATH,
+            LOG_PATH,
+            max_loop,
+            slot,
+            LISTENER_PATH,
+            MODIFIER_PATH,
+            first=journal.next_loop,
+            on_start=journal.start,
+            on_loop=on_loop,
         )
-        logger.info(f"Finish running loop {i+1}")
-        if rc != 0:
-            logger.warning(f"Test terminated due to exitcode {rc}!")
-            break
-        count += 1
+    else:
+        for count in range(journal.next_loop, max_loop + 1):
+            logger.info("!!Start running stability test!!")
+            journal.start(count)
+            rc = run_loop(
+                TASK_PATH, LOG_PATH, count, slot, LISTENER_PATH, MODIFIER_PATH
+            )
+            on_loop(count, rc)
+            logger.info(f"Finish running loop {count}")
+            if rc != 0:
+                logger.warning(f"Test terminated due to exitcode {rc}!")
+                break
+
+    summary.report()
+    combine_outputs(LOG_PATH, name, summary.selected_loops(sample))
+    journal.finish()
+    stop_retention()
+
+
+def run_loop(
+    task_path: Path,
+    log_path: Path,
+    count: int,
+    slot: int,
+    listener_path: Optional[Path] = None,
+    modifier_path: Optional[Path] = None,
+    extra: Optional[list[str]] = None,
+) -> int:
+    """
+    Run one stability loop and return robot exit code.
+    """
+    _rotate_log(log_path, count)
+    common = [
+        "--exitonfailure",
+        "--outputdir",
+        f"{log_path}",
+        "--output",
+        f"output_{count}.xml",
+        "--log",
+        f"log_{count}.html",
+        "--report",
+        "none",
+    ]
+    if listener_path:
+        common += ["--listener", str(listener_path)]
+    if modifier_path:
+        common += ["--prerunmodifier", str(modifier_path)]
+    common += extra or []
+    variable = ["--variable", f"SLOT:SLOT_{slot}"]
+    return run_cli(
+        common + variable + ["--exclude", "skip", str(task_path)], exit=False
+    )
+
+
+def _rotate_log(log_path: Path, count: int) -> None:
+    try:
+        logger.remove()
+    except ValueError:
+        logger.warning("Logger handler has been removed!")
+    logger.add(
+        f"{log_path}/log_{count}.log",
+        backtrace=True,
+        diagnose=False,
+        format="{time:YYYY-MM-DD at HH:mm:ss} | {level} | {message}",
+        rotation="1 week",
+        level="TRACE",
+    )
+
+
+@contextmanager
+def persistent_libraries():
+    """
+    Keep imported libraries and resources between `TestSuite.run` calls.
+
+    Robot resets its importer on every run, which would create new instances
+    of GLOBAL scoped libraries and drop their open connections.
+    """
+    IMPORTER.reset()
+    IMPORTER.reset = lambda: None
+    try:
+        yield
+    finally:
+        del IMPORTER.reset
+        IMPORTER.reset()
+
+
+def _release_suite(suite: TestSuite) -> Optional[TestSuite]:
+    """
+    Return a suite running the teardown of given suite as its only test.
+    """
+    if not suite.has_teardown:
+        return None
+    release = TestSuite(name=suite.name, source=suite.source)
+    release.resource = suite.resource
+    test = release.tests.create(name="Release")
+    test.body.create_keyword(name=suite.teardown.name, args=suite.teardown.args)
+    return release
 
+
+def run_in_process(
+    task_path: Path,
+    log_path: Path,
+    max_loop: int,
+    slot: int,
+    listener_path: Optional[Path] = None,
+    modifier_path: Optional[Path] = None,
+    console: str = "verbose",
+    first: int = 1,
+    on_start: Optional[Callable[[int], object]] = None,
+    on_loop: Optional[Callable[[int, int], object]] = None,
+) -> int:
+    """
+    Run all stability loops in the current process and return exit code of
+    the last loop.
+
+    The suite is built once, libraries keep their instances between loops
+    and suite teardown is only run after the last loop, so hardware connected
+    by suite setup stays open. Only `output_N.xml` is written per loop,
+    `on_start(count)` and `on_loop(count, rc)` are called around each of them.
+    """
+    suite = TestSuiteBuilder().build(str(task_path))
+    suite.configure(exclude_tags=["skip"])
+    if modifier_path:
+        suite.visit(ModelModifier([str(modifier_path)], False, LOGGER))
+    release = _release_suite(suite)
+    suite.teardown.config(name=None)
+
+    options = {
+        "outputdir": str(log_path),
+        "exitonfailure": True,
+        "variable": [f"SLOT:SLOT_{slot}"],
+        "console": console,
+    }
+    if listener_path:
+        options["listener"] = str(listener_path)
+
+    rc = 0
+    with persistent_libraries():
+        for count in range(first, max_loop + 1):
+            _rotate_log(log_path, count)
+            if on_start:
+                on_start(count)
+            logger.info(f"!!Start running stability loop {count} in process!!")
+            rc = suite.run(output=f"output_{count}.xml", **options).return_code
+            if on_loop:
+                on_loop(count, rc)
+            logger.info(f"Finish running loop {count}")
+            if rc != 0:
+                logger.warning(f"Test terminated due to exitcode {rc}!")
+                break
+        if release:
+            release.run(
+                output=None,
+                outputdir=str(log_path),
+                variable=options["variable"],
+                console=console,
+            )
+    return rc
+
+
+def combine_outputs(
+    log_path: Path, name: str, loops: Optional[list[int]] = None
+) -> None:
+    """
+    Combine outputs of given loops, or of all loops if not given, into one
+    report.
+    """
+    if loops is None:
+        outputs = [f"{log_path}/*.xml"]
+    else:
+        outputs = [
+            str(log_path / f"output_{count}.xml")
+            for count in loops
+            if (log_path / f"output_{count}.xml").exists()
+        ]
+    if not outputs:
+        logger.info("No loop selected for combined report")
+        return
     try:
         rebot_cli(
             [
                 "--name",
                 name,
                 "--outputdir",
-                f"{LOG_PATH}/report",
-                f"{LOG_PATH}/*.xml",
+                f"{log_path}/report",
+                *outputs,
             ]
         )
         logger.success("Reports are combined successfully!")
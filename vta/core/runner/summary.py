@@ -0,0 +1,189 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Incremental summary of stability loops.
+
+Each `output_N.xml` is streamed into a compact running summary right after
+its loop finished, instead of loading all outputs with rebot at the end of
+the campaign. The summary is saved as `summary.json` after every loop and
+rendered to `summary.html` by `report`.
+"""
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+from rich.console import Console
+from rich.table import Table
+
+from vta.core.RobotOutput import iter_test_results
+
+
+class LoopSummary:
+    FILE_NAME = "summary.json"
+
+    def __init__(self, log_path: Path, name: str = "Stability Test") -> None:
+        self.log_path = Path(log_path)
+        self.file = self.log_path / self.FILE_NAME
+        self.name = name
+        # {loop: {"rc", "passed", "failed", "skipped", "elapsed", "failures",
+        #         "statuses": {test name: status}}}
+        self.loops: dict[int, dict] = {}
+        # {test name: {"PASS": n, "FAIL": n, "SKIP": n}}
+        self.tests: dict[str, Counter] = {}
+        self.error_keywords: Counter = Counter()
+        if self.file.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.file, "r") as f:
+            data = json.load(f)
+        self.loops = {int(k): v for k, v in data["loops"].items()}
+        self.tests = {k: Counter(v) for k, v in data["tests"].items()}
+        self.error_keywords = Counter(data["error_keywords"])
+
+    def save(self) -> None:
+        data = {
+            "name": self.name,
+            "loops": self.loops,
+            "tests": self.tests,
+            "error_keywords": self.error_keywords,
+        }
+        tmp = self.file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.file)
+
+    def add(self, count: int, rc: int) -> dict:
+        """
+        Fold `output_{count}.xml` into the summary and return the loop entry.
+        """
+        output = self.log_path / f"output_{count}.xml"
+        if count in self.loops:
+            # loop is run again after an interrupted campaign
+            for name, status in self.loops[count]["statuses"].items():
+                self.tests[name][status] -= 1
+            for failure in self.loops[count]["failures"]:
+                if failure["keyword"]:
+                    self.error_keywords[failure["keyword"]] -= 1
+        loop = {
+            "rc": rc,
+            "passed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "elapsed": 0,
+            "failures": [],
+            "statuses": {},
+        }
+        if output.exists():
+            for test in iter_test_results(output):
+                status = test["status"]
+                self.tests.setdefault(test["name"], Counter())[status] += 1
+                loop["statuses"][test["name"]] = status
+                loop["elapsed"] += test["duration"]
+                if status == "PASS":
+                    loop["passed"] += 1
+                elif status == "SKIP":
+                    loop["skipped"] += 1
+                else:
+                    loop["failed"] += 1
+                    loop["failures"].append(
+                        {
+                            "test": test["name"],
+                            "message": test["message"],
+                            "keyword": test["failed_keyword"],
+                        }
+                    )
+                    if test["failed_keyword"]:
+                        self.error_keywords[test["failed_keyword"]] += 1
+        else:
+            logger.warning(f"{output} not exist, only exit code is recorded!")
+        self.loops[count] = loop
+        self.save()
+        return loop
+
+    @property
+    def failed_loops(self) -> list[int]:
+        return sorted(
+            c for c, loop in self.loops.items() if loop["rc"] or loop["failed"]
+        )
+
+    def selected_loops(self, sample: int = 10) -> list[int]:
+        """
+        Return failed loops plus `sample` loops spread evenly over the campaign.
+        """
+        loops = sorted(self.loops)
+        if not loops:
+            return []
+        selected = set(self.failed_loops)
+        if sample > 0:
+            step = max(len(loops) / sample, 1)
+            selected.update(
+                loops[int(i * step)] for i in range(min(sample, len(loops)))
+            )
+            selected.add(loops[-1])
+        return sorted(selected)
+
+    def report(self, console: Optional[Console] = None) -> None:
+        """
+        Print summary tables and save them to `summary.html`.
+        """
+        console = console or Console(record=True)
+        failed_loops = self.failed_loops
+        passed = len(self.loops) - len(failed_loops)
+        overview = Table(title=self.name)
+        for column in ("Loops", "Passed", "Failed", "Total Duration"):
+            overview.add_column(column, justify="center")
+        overview.add_row(
+            str(len(self.loops)),
+            f"[green]{passed}[/green]",
+            f"[red]{len(self.loops) - passed}[/red]",
+            f"{sum(loop['elapsed'] for loop in self.loops.values()) / 1000:.1f}s",
+        )
+        console.print(overview)
+
+        tests = Table(title="Test Statistics")
+        for column in ("Test", "Pass", "Fail", "Skip"):
+            tests.add_column(column, justify="center")
+        for name, stat in self.tests.items():
+            tests.add_row(
+                name,
+                f"[green]{stat['PASS']}[/green]",
+                f"[red]{stat['FAIL']}[/red]",
+                str(stat["SKIP"]),
+            )
+        console.print(tests)
+
+        if failed_loops:
+            failures = Table(title="Failures")
+            for column in ("Loop", "Test", "Keyword", "Message"):
+                failures.add_column(column)
+            for count in failed_loops:
+                loop = self.loops[count]
+                for failure in loop["failures"] or [
+                    {"test": "", "keyword": "", "message": f"exit code {loop['rc']}"}
+                ]:
+                    failures.add_row(
+                        str(count),
+                        failure["test"],
+                        failure["keyword"],
+                        failure["message"],
+                    )
+            console.print(failures)
+
+        if +self.error_keywords:
+            keywords = Table(title="Error Keywords")
+            keywords.add_column("Keyword")
+            keywords.add_column("Count", justify="center")
+            for keyword, number in (+self.error_keywords).most_common():
+                keywords.add_row(keyword, str(number))
+            console.print(keywords)
+
+        if console.record:
+            console.save_html(str(self.log_path / "summary.html"))
@@ -4,41 +4,313 @@
 # \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
 # ============================================================================================================
 
+import json
 import os
 import shutil
+import threading
 import time
 from pathlib import Path
 from typing import Optional
 
+import psutil
 from loguru import logger
 
+from .catalog import AmbiguousTaskError, get_catalog
+from .journal import CampaignJournal
 
-def rotate_folder(folder_path: str, days: int = 7) -> None:
-    current_time = time.time()
-    days_in_seconds = days * 24 * 60 * 60
 
-    for root, dirs, files in os.walk(folder_path):
-        for directory in dirs:
-            folder = os.path.join(root, directory)
-            folder_time = os.path.getmtime(folder)
+class RetentionService(threading.Thread):
+    """
+    Background retention of run folders below the log root.
 
-            if (current_time - folder_time) > days_in_seconds:
-                # Delete the folder and its contents
-                shutil.rmtree(folder)
-                logger.warning(
-                    f"Delete folder {folder} which is created `{days}days` ago!"
+    Run folders older than `compress_days` are zipped, runs and archives older
+    than `days` are deleted, then the oldest entries are deleted until the log
+    root fits `max_size_gb`. Runs of unfinished campaigns (see
+    `CampaignJournal`) are kept as they are, so they can still be resumed.
+    Sizes are kept in an index file so unchanged runs are not walked again.
+    Only one service per log root runs at a time.
+
+    Only the entries directly below the log root are handled, folders nested
+    in a run are kept or removed together with their run. The thread is not a
+    daemon, so an exiting process waits for the current archive or deletion
+    instead of killing it halfway, `stop()` skips the remaining entries.
+    """
+
+    INDEX_FILE = ".retention.json"
+    LOCK_FILE = ".retention.lock"
+    STALE_LOCK = 60 * 60
+
+    def __init__(
+        self,
+        log_root: Path,
+        days: int = 7,
+        max_size_gb: Optional[float] = 50,
+        compress_days: int = 1,
+    ) -> None:
+        super().__init__(name="RetentionService", daemon=False)
+        self.log_root = Path(log_root)
+        self.max_age = days * 24 * 60 * 60
+        self.compress_age = compress_days * 24 * 60 * 60
+        self.max_size = int(max_size_gb * 1024**3) if max_size_gb else None
+        self.index_file = self.log_root / self.INDEX_FILE
+        self.lock_file = self.log_root / self.LOCK_FILE
+        self.index: dict[str, dict] = {}
+        self.stopping = threading.Event()
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    def _stale_lock(self) -> bool:
+        """
+        A lock is stale if its owner process is gone, a lock without pid (of
+        an older service) if it is too old. The age of a lock with pid is not
+        checked, the first scan of a huge log root may take hours.
+        """
+        try:
+            content = self.lock_file.read_text()
+            mtime = self.lock_file.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        try:
+            pid = int(content)
+        except ValueError:
+            return time.time() - mtime > self.STALE_LOCK
+        return not psutil.pid_exists(pid)
+
+    def _acquire(self) -> bool:
+        self.log_root.mkdir(parents=True, exist_ok=True)
+        if self._stale_lock():
+            self.lock_file.unlink(missing_ok=True)
+        try:
+            fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        try:
+            os.write(fd, str(os.getpid()).encode())
+        finally:
+            os.close(fd)
+        return True
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_file, "r") as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+
+    def _save_index(self) -> None:
+        tmp = self.index_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.index_file)
+
+    @staticmethod
+    def _folder_size(folder: Path) -> int:
+        size = 0
+        stack = [folder]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        size += entry.stat(follow_symlinks=False).st_size
+        return size
+
+    def _scan(self) -> None:
+        """
+        Refresh index with run folders and archives of the log root, sizes
+        are only recalculated for entries modified since last scan.
+        """
+        index = {}
+        with os.scandir(self.log_root) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.name.endswith(".partial.zip"):
+                    # archive interrupted by a previous service
+                    os.remove(entry.path)
+                    continue
+                if not (entry.is_dir() or entry.name.endswith(".zip")):
+                    continue
+                mtime = entry.stat().st_mtime
+                cached = self.index.get(entry.name)
+                if cached and cached["mtime"] == mtime:
+                    index[entry.name] = cached
+                    continue
+                size = (
+                    self._folder_size(Path(entry.path))
+                    if entry.is_dir()
+                    else entry.stat().st_size
                 )
+                index[entry.name] = {
+                    "mtime": mtime,
+                    "size": size,
+                    "archive": not entry.is_dir(),
+                }
+        self.index = index
+
+    def _unfinished_campaign(self, folder: Path) -> bool:
+        journal = folder / CampaignJournal.FILE_NAME
+        return journal.exists() and not CampaignJournal(folder).finished
+
+    def _remove(self, name: str, reason: str) -> None:
+        path = self.log_root / name
+        if self.index[name]["archive"]:
+            path.unlink(missing_ok=True)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+        del self.index[name]
+        logger.warning(f"Delete {path} {reason}!")
+
+    def _archive_path(self, name: str) -> Path:
+        """
+        Return a free archive path of given run, an existing archive (e.g. of
+        a run whose deletion was interrupted after compression) is never
+        overwritten.
+        """
+        archive = self.log_root / f"{name}.zip"
+        count = 1
+        while archive.exists():
+            archive = self.log_root / f"{name}_{count}.zip"
+            count += 1
+        return archive
+
+    def _compress(self, name: str) -> None:
+        folder = self.log_root / name
+        partial = shutil.make_archive(
+            str(self.log_root / f"{name}.partial"), "zip", root_dir=folder
+        )
+        archive = self._archive_path(name)
+        os.replace(partial, archive)
+        # keep age of the run for the retention
+        mtime = self.index[name]["mtime"]
+        os.utime(archive, (mtime, mtime))
+        shutil.rmtree(folder, ignore_errors=True)
+        del self.index[name]
+        self.index[archive.name] = {
+            "mtime": mtime,
+            "size": archive.stat().st_size,
+            "archive": True,
+        }
+        logger.info(f"Compress {folder} to {archive}")
+
+    def enforce(self) -> None:
+        now = time.time()
+        # campaigns which may still be resumed are neither compressed nor
+        # deleted, whatever their age
+        unfinished = {
+            name
+            for name, entry in self.index.items()
+            if not entry["archive"] and self._unfinished_campaign(self.log_root / name)
+        }
+        for name, entry in list(self.index.items()):
+            if self.stopping.is_set():
+                return
+            age = now - entry["mtime"]
+            if name in unfinished:
+                if age > self.max_age:
+                    logger.warning(
+                        f"Keep unfinished campaign {self.log_root / name} which "
+                        f"is older than {self.max_age // 86400}days!"
+                    )
+            elif age > self.max_age:
+                self._remove(name, f"which is older than {self.max_age // 86400}days")
+            elif not entry["archive"] and age > self.compress_age:
+                try:
+                    self._compress(name)
+                except Exception:
+                    logger.exception(f"Failed to compress {name}!")
+
+        if self.max_size is None:
+            return
+        total = sum(entry["size"] for entry in self.index.values())
+        for name in sorted(self.index, key=lambda n: self.index[n]["mtime"]):
+            if total <= self.max_size or self.stopping.is_set():
+                break
+            if now - self.index[name]["mtime"] < self.compress_age:
+                # never delete recent runs which may still be written
+                break
+            if name in unfinished:
+                continue
+            total -= self.index[name]["size"]
+            self._remove(name, "to keep log size budget")
+        if total > self.max_size and not self.stopping.is_set():
+            kept = [name for name in unfinished if name in self.index]
+            logger.warning(
+                f"Log size {total / 1024**3:.1f}GB exceeds budget "
+                f"{self.max_size / 1024**3:.1f}GB with recent runs and "
+                f"unfinished campaigns {kept} only!"
+            )
+
+    def run(self) -> None:
+        if not self._acquire():
+            logger.debug(f"Retention of {self.log_root} is running elsewhere")
+            return
+        try:
+            self._load_index()
+            self._scan()
+            self.enforce()
+            self._save_index()
+        except Exception:
+            logger.exception(f"Retention of {self.log_root} failed!")
+        finally:
+            self.lock_file.unlink(missing_ok=True)
+
+
+_services: dict[Path, RetentionService] = {}
+
+
+def rotate_folder(
+    folder_path: str,
+    days: int = 7,
+    max_size_gb: Optional[float] = 50,
+    block: bool = False,
+) -> RetentionService:
+    """
+    Start retention of given log root in background and return the service,
+    a service still running for the same root is returned instead.
+    """
+    root = Path(folder_path).resolve()
+    service = _services.get(root)
+    if service and service.is_alive():
+        return service
+    service = RetentionService(root, days=days, max_size_gb=max_size_gb)
+    _services[root] = service
+    if block:
+        service.run()
+    else:
+        service.start()
+    return service
+
+
+def stop_retention(timeout: Optional[float] = 10) -> None:
+    """
+    Stop all retention services after their current entry and wait for them,
+    call on runner shutdown.
+    """
+    for service in _services.values():
+        service.stop()
+    for service in _services.values():
+        if service.is_alive():
+            service.join(timeout)
+            if service.is_alive():
+                logger.info(f"Waiting for retention of {service.log_root}")
 
 
 def find_file(directory: Path, file_name: str) -> Optional[Path]:
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file == file_name:
-                return Path(root) / file_name
-    return None
+    """
+    Find file by basename or relative path in the cached catalog of given
+    directory, None is returned if not found or ambiguous.
+    """
+    try:
+        return get_catalog(directory).find(file_name)
+    except AmbiguousTaskError as e:
+        logger.error(f"{e}! Pass the relative path to select one.")
+        return None
 
 
 if __name__ == "__main__":
     folder_path = r"C:\Users\ZIU7WX\Desktop\doc\personal\project\rubbish\vta\log"
 
-    rotate_folder(folder_path)
+    rotate_folder(folder_path, block=True)
@@ -29,6 +29,25 @@ def countdown(seconds: int):
         progress.update(task, completed=seconds)
 
 
+class Deadline:
+    """
+    Time budget shared by consecutive waits, each wait gets what the former
+    ones left over.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.end = time.monotonic() + seconds
+
+    @property
+    def remaining(self) -> float:
+        return max(self.end - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+
 if __name__ == "__main__":
 
     # get current datetime
@@ -0,0 +1,196 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import json
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import click
+from loguru import logger
+from rich.table import Table
+
+from vta.core.runner.utils import rotate_folder, stop_retention
+from vta.tasks.ota.runner import ROOT, console, print_phases, run_iterations
+from vta.tasks.ota.timeline import Timeline, percentiles
+
+INVENTORY = Path(__file__).resolve().parent / "inventory.json"
+
+
+def run_unit(
+    unit: dict, iterations: int, package_size: float, log_path: Path, tsmaster_lock
+) -> list[bool]:
+    """
+    Run the OTA iterations of one inventory unit, in its own process.
+
+    Args:
+        unit: Inventory entry with name, putty_* settings, device_id and tsmaster_app/tsmaster_channel
+        iterations: Number of iterations
+        package_size: OTA package size in MB, 0 if unknown
+        log_path: Folder of the unit logs and timelines
+        tsmaster_lock: Lock shared by all units of the same TSMaster application
+
+    Returns:
+        list[bool]: Result of every iteration run
+    """
+    putty_config = {
+        "putty_enabled": True,
+        **{k: v for k, v in unit.items() if k.startswith("putty_")},
+    }
+    log_path.mkdir(parents=True, exist_ok=True)
+    results, _ = run_iterations(
+        iterations,
+        putty_config,
+        unit["device_id"],
+        log_path,
+        package_size,
+        tsmaster_app=unit.get("tsmaster_app", "TSMaster"),
+        tsmaster_channel=unit.get("tsmaster_channel", 0),
+        tsmaster_lock=tsmaster_lock,
+        unit=unit["name"],
+    )
+    return results
+
+
+def load_timelines(log_path: Path) -> list[Timeline]:
+    files = sorted(
+        log_path.glob("timeline_*.json"), key=lambda f: int(f.stem.split("_")[-1])
+    )
+    return [Timeline.load(f) for f in files]
+
+
+def generate_campaign_report(
+    units: list[dict],
+    results: dict[str, list[bool]],
+    timelines: dict[str, list[Timeline]],
+):
+    points = ("p50",)
+    phases = ("download", "installation", "reboot")
+    table = Table(title="OTA Campaign Report")
+    for column in ("Unit", "Port", "Device", "Channel", "Iterations", "PASS", "FAIL"):
+        table.add_column(column, justify="center")
+    for phase in phases:
+        for point in points:
+            table.add_column(f"{phase} {point} (s)", justify="right")
+
+    for unit in units:
+        name = unit["name"]
+        unit_results = results.get(name, [])
+        stats = percentiles(timelines.get(name, []))
+        table.add_row(
+            name,
+            unit.get("putty_comport", ""),
+            unit["device_id"],
+            f"{unit.get('tsmaster_app', 'TSMaster')}:{unit.get('tsmaster_channel', 0)}",
+            str(len(unit_results)),
+            f"[green]{unit_results.count(True)}[/green]",
+            f"[red]{unit_results.count(False)}[/red]",
+            *(
+                f"{stats[phase][point]:.1f}" if phase in stats else "-"
+                for phase in phases
+                for point in points
+            ),
+        )
+
+    all_results = [r for unit_results in results.values() for r in unit_results]
+    table.add_row("─" * 10, *([""] * (len(table.columns) - 1)))
+    table.add_row(
+        "[bold]Total[/bold]",
+        "",
+        "",
+        "",
+        str(len(all_results)),
+        f"[bold green]{all_results.count(True)}[/bold green]",
+        f"[bold red]{all_results.count(False)}[/bold red]",
+    )
+    console.print(table)
+    print_phases(
+        [t for unit_timelines in timelines.values() for t in unit_timelines],
+        "OTA Campaign Phase Timeline (s, MB/s)",
+    )
+
+
+@click.command()
+@click.option(
+    "--inventory",
+    default=str(INVENTORY),
+    type=click.Path(exists=True),
+    help="bench inventory file",
+)
+@click.option(
+    "--iterations", prompt="Enter the number of iterations for the OTA test", type=int
+)
+@click.option(
+    "--package-size",
+    default=0.0,
+    type=float,
+    help="OTA package size in MB for download throughput",
+)
+def main(inventory, iterations, package_size):
+    with open(inventory, "r") as f:
+        config = json.load(f)
+    units = config["units"]
+    names = [unit["name"] for unit in units]
+    if len(set(names)) != len(names):
+        raise click.BadParameter("unit names must be unique", param_hint="--inventory")
+
+    log_path = ROOT / "log" / f"campaign_{datetime.now().strftime('%A_%m%d%Y_%H%M')}"
+    log_path.mkdir(parents=True, exist_ok=True)
+    rotate_folder(ROOT / "log")
+    logger.remove()
+    logger.add(sys.stdout, level="INFO")
+    logger.info(f"Load inventory: {config.get('name', inventory)} - {len(units)} units")
+
+    results: dict[str, list[bool]] = {}
+    timelines: dict[str, list[Timeline]] = {}
+    # one client at a time per TSMaster application, the channels of its units share the RPC server
+    with multiprocessing.Manager() as manager:
+        locks = {
+            app: manager.Lock()
+            for app in {unit.get("tsmaster_app", "TSMaster") for unit in units}
+        }
+        with ProcessPoolExecutor(max_workers=len(units)) as executor:
+            futures = {
+                unit["name"]: executor.submit(
+                    run_unit,
+                    unit,
+                    iterations,
+                    package_size,
+                    log_path / unit["name"],
+                    locks[unit.get("tsmaster_app", "TSMaster")],
+                )
+                for unit in units
+            }
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"{name} aborted: {e}")
+                    results[name] = [False]
+                timelines[name] = load_timelines(log_path / name)
+
+    with open(log_path / "campaign.json", "w") as f:
+        json.dump(
+            {
+                name: {
+                    "results": results[name],
+                    "metrics": percentiles(timelines[name]),
+                }
+                for name in names
+            },
+            f,
+            indent=2,
+        )
+    generate_campaign_report(units, results, timelines)
+    stop_retention()
+    if not all(r and all(r) for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+from vta.api.PuttyHelper import PuttyHelper
+
+ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;?]*[a-zA-Z]")
+
+
+class Subscription:
+    def __init__(
+        self, pattern: str, callback: Optional[Callable] = None, once: bool = True
+    ) -> None:
+        """
+        A pattern waited for in the streamed OTA logs.
+
+        Args:
+            pattern: Regular expression searched in every new log line
+            callback: Called with (tick, match) on the serial reader thread, must return quickly
+            once: Unsubscribe after the first match
+        """
+        self.pattern = re.compile(pattern)
+        self.callback = callback
+        self.once = once
+        self.event = threading.Event()
+        self.match: Optional[re.Match] = None
+        self.tick: Optional[float] = None
+
+    @property
+    def matched(self) -> bool:
+        return self.event.is_set()
+
+
+class LogMonitor:
+    """
+    Stream OTA logs with one background `tail -F` on the serial console.
+
+    Every new line is matched against the subscriptions by the serial reader
+    thread, so waiting for a pattern returns the instant its line arrives
+    instead of polling `wc -l` and `tail | head` every few seconds.
+
+    The target has a single console, so the tail shares it with the commands
+    of the test. Each log line is written whole and tagged with `TAG`: only
+    tagged lines are matched, so command echoes and prompts never match a
+    subscription, and tagged lines are consumed, so they never reach
+    `wait_for_trace` or the output of a command. A prompt or echo written
+    right before a log line only prefixes it, the tag is searched anywhere.
+    """
+
+    LOGS = ("/ota/bsw/log/subda.log", "/ota/bsw/log/otaclient.log")
+    TAG = "OTALOG:"
+    TAILPID_PATTERN = re.compile(r"TAILPID=(\d+)")
+    PROGRESS_PATTERN = re.compile(r"(?i)progress\D{0,32}?(\d{1,3}(?:\.\d+)?)\s*%")
+
+    def __init__(self, putty: PuttyHelper, logs: tuple = LOGS) -> None:
+        self.putty = putty
+        self.logs = logs
+        self.tail_pid: Optional[str] = None
+        self.progress: Optional[float] = None
+        # called with each new progress percentage on the serial reader thread
+        self.on_progress: Optional[Callable[[float], None]] = None
+        self.subscriptions: list[Subscription] = []
+        self._lock = threading.Lock()
+        self._started = threading.Event()
+
+    def start(self) -> bool:
+        """
+        Start `tail -F` from the current end of the logs, new lines only.
+
+        Returns:
+            bool: True if the tail is running
+        """
+        if self.tail_pid:
+            return True
+        self._started.clear()
+        if self._on_line not in self.putty.trace_listeners:
+            self.putty.trace_listeners.append(self._on_line)
+        # tail reports its own pid through the tagging loop, the echoed
+        # command shows `$$`, so only the real pid matches
+        tail = f"exec tail -n 0 -F {' '.join(self.logs)} 2>/dev/null"
+        tag = f"printf '{self.TAG}%s\\n' \"$line\""
+        cmd = f"sh -c 'echo TAILPID=$$; {tail}' | while IFS= read -r line; do {tag}; done &"
+        self.putty.send_command(cmd)
+        if not self._started.wait(10):
+            logger.error("Failed to start OTA log tail")
+            self.stop()
+            return False
+        logger.info(f"Streaming {', '.join(self.logs)} (tail pid {self.tail_pid})")
+        return True
+
+    def stop(self) -> None:
+        """
+        Stop the tail, e.g. before the target restarts.
+        """
+        if self.tail_pid:
+            self.putty.send_command(f"kill {self.tail_pid}")
+            self.tail_pid = None
+        if self._on_line in self.putty.trace_listeners:
+            self.putty.trace_listeners.remove(self._on_line)
+
+    def subscribe(
+        self, pattern: str, callback: Optional[Callable] = None, once: bool = True
+    ) -> Subscription:
+        """
+        Subscribe to a pattern of lines logged from now on.
+
+        Returns:
+            Subscription: Its event is set when the pattern matched
+        """
+        subscription = Subscription(pattern, callback, once)
+        with self._lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def _on_line(self, tick: float, line: str) -> bool:
+        """
+        Match a tagged log line, return True to consume it.
+        """
+        line = ESCAPE_PATTERN.sub("", line).replace("\r", "")
+        _, tag, line = line.partition(self.TAG)
+        if not tag:
+            return False
+        if not self._started.is_set():
+            if match := self.TAILPID_PATTERN.fullmatch(line.strip()):
+                self.tail_pid = match.group(1)
+                self._started.set()
+            return True
+        if match := self.PROGRESS_PATTERN.search(line):
+            progress = float(match.group(1))
+            if progress != self.progress:
+                self.progress = progress
+                logger.info(f"OTA progress: {progress:g}%")
+                if self.on_progress:
+                    self.on_progress(progress)
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            match = subscription.pattern.search(line)
+            if not match:
+                continue
+            subscription.match, subscription.tick = match, tick
+            subscription.event.set()
+            if subscription.once:
+                self.unsubscribe(subscription)
+            if subscription.callback:
+                subscription.callback(tick, match)
+        return True
+
+    def wait(
+        self, subscription: Subscription, timeout: float, report_interval: float = 30
+    ) -> bool:
+        """
+        Wait until the subscription matched, logging the progress meanwhile.
+
+        Returns:
+            bool: True if matched within timeout
+        """
+        deadline = time.monotonic() + timeout
+        while not subscription.event.wait(
+            min(report_interval, max(deadline - time.monotonic(), 0))
+        ):
+            if time.monotonic() >= deadline:
+                self.unsubscribe(subscription)
+                return False
+            progress = "unknown" if self.progress is None else f"{self.progress:g}%"
+            logger.info(
+                f"Waiting for `{subscription.pattern.pattern}`, progress: {progress}"
+            )
+        return True
@@ -3,26 +3,49 @@ from vta.api.ADBClient import ADBClient
 from vta.api.TSmasterAPI.TSRPC import TSMasterRPC
 from vta.api.DeviceClient import DeviceClient
 from vta.library.utility.decorators import timed_step, wait_and_retry
-from vta.library.utility.timelord import countdown
+from vta.library.utility.timelord import Deadline
+from vta.tasks.ota.monitor import LogMonitor
+from vta.tasks.ota.timeline import Timeline
+from contextlib import nullcontext
 from loguru import logger
 import time
-import re
 
 
 class OTA:
-    def __init__(self, putty_config: dict, device_id: str) -> None:
+    def __init__(
+        self,
+        putty_config: dict,
+        device_id: str,
+        iteration: int = None,
+        package_size_mb: float = None,
+        tsmaster_app: str = "TSMaster",
+        tsmaster_channel: int = 0,
+        tsmaster_lock=None,
+    ) -> None:
         """
         Initialize the OTA class with required tools.
 
         Args:
             putty_config: Configuration parameters for PuttyHelper
             device_id: Device ID for ADB and DeviceClient
+            iteration: Iteration number recorded in the timeline
+            package_size_mb: OTA package size to derive the download throughput
+            tsmaster_app: Name of the TSMaster application to connect to
+            tsmaster_channel: CAN channel of this unit in the TSMaster application
+            tsmaster_lock: Lock shared by all units of the same TSMaster application
         """
+        self.timeline = Timeline(iteration, package_size_mb)
         self.putty = PuttyHelper()
         self.adb: ADBClient = ADBClient(device_id=device_id)
-        self.tsmaster = TSMasterRPC()
+        self.tsmaster_channel = tsmaster_channel
+        self.tsmaster_lock = tsmaster_lock or nullcontext()
+        with self.tsmaster_lock:
+            self.tsmaster = TSMasterRPC(app_name=tsmaster_app)
         self.device = DeviceClient()
         self.putty.connect(putty_config)
+        self.log_monitor = LogMonitor(self.putty)
+        self.log_monitor.on_progress = self._on_progress
+        self._progress_phase = "download"
         self.device.connect(device_id=device_id)
         self._set_log_level()
         self.device_id = device_id
@@ -50,7 +73,7 @@ class OTA:
             bool: True if mode switch was successful
         """
         logger.info(f"Switching vehicle to {mode} mode using set_signal_value")
-        signal_path = "0/ZCU_CANFD1/ZCUD/ZcudZCUCANFD1Fr10/VehModMngtGlbSafe1UsgModSts"
+        signal_path = f"{self.tsmaster_channel}/ZCU_CANFD1/ZCUD/ZcudZCUCANFD1Fr10/VehModMngtGlbSafe1UsgModSts"
         mode_signal_map = {
             "abandon": 0,
             "inactive": 1,
@@ -62,12 +85,18 @@ class OTA:
             return False
 
         value = mode_signal_map[mode]
-        self.tsmaster.set_signal_value(signal_path, value)
-        logger.info(f"Set {signal_path} to {value} for mode {mode}")
-        if not self._wait_signal_value(signal_path, value, timeout=3, interval=1):
+        self.timeline.start(f"mode_{mode}")
+        # units on the same TSMaster must not interleave their set and verify
+        with self.tsmaster_lock:
+            self.tsmaster.set_signal_value(signal_path, value)
+            logger.info(f"Set {signal_path} to {value} for mode {mode}")
+            switched = self._wait_signal_value(signal_path, value, timeout=3, interval=1)
+        if not switched:
             logger.error(f"Failed to set {signal_path} to {value} after retries")
+            self.timeline.end(f"mode_{mode}", ok=False)
             return False
 
+        self.timeline.end(f"mode_{mode}")
         return True
 
     def _wait_signal_value(
@@ -192,20 +221,6 @@ class OTA:
             logger.info("OTA downloading is not in progress: neither '发现新版本' nor '安装包下载中' found")
             return False
 
-    def _get_log_line_count(self, log_path: str) -> int:
-        traces = self.putty.send_command_and_return_traces(f"wc -l {log_path}", wait=1, login=False)
-        if traces:
-            for line in traces:
-                clean_line = re.sub(r"\x1b\[[0-9;?]*[a-zA-Z]", "", line)
-                clean_line = clean_line.replace("\r", "").strip()
-                match = re.match(r"^(\d+)", clean_line)
-                if match:
-                    count = int(match.group(1))
-                    logger.info(f"The line cound of subda.log is {count}")
-                    return count
-        logger.error("Unable to get line count!")
-        return 0
-
     @wait_and_retry(interval=1, retry_times=3)
     def trigger_upgrade_via_dhu(self) -> bool:
         """
@@ -228,19 +243,40 @@ class OTA:
             return False
         return True
 
-    def _record_log_start_line(self, attr_name: str, log_path: str = "/ota/bsw/log/subda.log"):
+    def _subscribe_log(self, attr_name: str, pattern: str, callback=None) -> bool:
         """
-        Record the current log line count for later delta checks.
+        Start streaming the OTA logs and subscribe to a pattern of new lines for later monitoring.
         Args:
-            attr_name: The attribute name to store the start line (e.g., '_download_log_start_line').
-            log_path: The log file path to check.
+            attr_name: The attribute name to store the subscription (e.g., '_download_subscription').
+            pattern: The pattern to wait for.
+            callback: Called with (tick, match) the instant the pattern is logged.
+
+        Returns:
+            bool: False if the logs could not be streamed, nothing is subscribed then
         """
-        setattr(self, attr_name, self._get_log_line_count(log_path))
+        if not self.log_monitor.start():
+            logger.error(f"Unable to stream OTA logs, cannot wait for `{pattern}`")
+            setattr(self, attr_name, None)
+            return False
+        # progress is reported per phase
+        self.log_monitor.progress = None
+        setattr(self, attr_name, self.log_monitor.subscribe(pattern, callback))
+        return True
+
+    def _on_progress(self, percent: float) -> None:
+        self.timeline.progress(percent, self._progress_phase)
+
+    def _on_download_completed(self, tick, match) -> None:
+        self.timeline.end("download")
 
-    def _check_restart_complete(self, timeout=150) -> bool:
+    def _on_installation_completed(self, tick, match) -> None:
+        self.timeline.end("installation")
+        self.timeline.start("reboot")
+
+    def _check_restart_complete(self, timeout=300) -> bool:
         """
-        Wait for the device to finish restarting by checking for the 'Starting kernel' prompt
-        in Putty using wait_for_trace. If not found, check for 'map' text on the screen.
+        Wait for the device to finish restarting: the 'Starting kernel' prompt in Putty, then the
+        readiness probes. All waits share one deadline.
 
         Args:
             timeout: Maximum time to wait in seconds.
@@ -248,78 +284,135 @@ class OTA:
         Returns:
             bool: True if restart is complete, False otherwise.
         """
+        deadline = Deadline(timeout)
         logger.info("Waiting for device restart to complete (Putty 'Starting kernel')")
         login_pattern = r"Starting kernel"
-        result, match = self.putty.wait_for_trace(pattern=login_pattern, cmd="", timeout=timeout, login=False)
+        result, match = self.putty.wait_for_trace(
+            pattern=login_pattern, cmd="", timeout=deadline.remaining, login=False
+        )
         if result:
-            logger.success("Detected 'Starting kernel' prompt in Putty. Please wait 30s.")
-            countdown(30)
-            self._set_log_level()
-            return True
-
+            self.timeline.end("reboot")
+            self.timeline.start("boot")
+            logger.success("Detected 'Starting kernel' prompt in Putty, probing readiness.")
+            ready = self._wait_ready(deadline)
+            self.timeline.end("boot", ok=ready)
+            if not ready:
+                logger.error(f"Device not ready {timeout}s after restart.")
+            return ready
+
+        self.timeline.end("reboot", ok=False)
         logger.error("Timeout waiting for device restart to complete (no 'Starting kernel' detected).")
         return False
 
+    def _wait_ready(self, deadline: Deadline) -> bool:
+        """
+        Run the readiness probes in boot order within the deadline: serial prompt, ota_tool, then
+        the Android boot completed property.
+
+        Returns:
+            bool: True if all probes passed
+        """
+        if not self._probe("serial", self._is_serial_ready, deadline):
+            return False
+        self._set_log_level()
+        return self._probe("ota_tool", self._is_ota_tool_ready, deadline) and self._probe(
+            "boot_completed", self._is_boot_completed, deadline
+        )
+
+    def _probe(self, name: str, check, deadline: Deadline, interval: float = 2) -> bool:
+        """
+        Poll a readiness check until it passes or the deadline expires, the wait is recorded as
+        phase `ready_<name>` of the timeline.
+
+        Args:
+            name: Name of the probe
+            check: Callable returning True once ready
+            deadline: Deadline shared by all probes
+            interval: Wait between attempts in seconds
+
+        Returns:
+            bool: True if the check passed
+        """
+        self.timeline.start(f"ready_{name}")
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                ready = bool(check())
+            except Exception as e:
+                logger.debug(f"Probe {name} failed: {e}")
+                ready = False
+            if ready or deadline.expired:
+                break
+            time.sleep(min(interval, deadline.remaining))
+        self.timeline.end(f"ready_{name}", ok=ready, attempts=attempts)
+        if ready:
+            logger.success(f"Probe {name} ready after {attempts} attempt(s)")
+        else:
+            logger.error(f"Probe {name} not ready after {attempts} attempt(s)")
+        return ready
+
+    def _is_serial_ready(self) -> bool:
+        # the echoed command shows `$((1+1))`, so only the shell output matches
+        result, _ = self.putty.wait_for_trace(
+            pattern=r"VTA_READY=2", cmd="echo VTA_READY=$((1+1))", timeout=3, login=False
+        )
+        return result
+
+    def _is_ota_tool_ready(self) -> bool:
+        result, _ = self.putty.wait_for_trace(
+            pattern=r"current slot is:([AB])", cmd="ota_tool -g", timeout=5, login=False
+        )
+        return result
+
+    def _is_boot_completed(self) -> bool:
+        return self.adb.execute_adb_command("getprop sys.boot_completed") == "1"
+
+    def _wait_log(self, attr_name: str, pattern: str, timeout: float, callback=None) -> bool:
+        """
+        Wait for the subscription stored in attr_name, subscribing now if there is none.
+        """
+        subscription = getattr(self, attr_name, None)
+        if subscription is None:
+            if not self._subscribe_log(attr_name, pattern, callback):
+                return False
+            subscription = getattr(self, attr_name)
+        setattr(self, attr_name, None)
+        return self.log_monitor.wait(subscription, timeout)
+
     @timed_step("download_duration")
-    @wait_and_retry(timeout=1800, interval=2)
-    def monitor_download_status(self) -> bool:
+    def monitor_download_status(self, timeout: float = 1800) -> bool:
         """
-        Monitor the OTA download status by polling only new log lines for key patterns.
+        Monitor the OTA download status by waiting for DOWNLOAD-COMPLETED in the streamed logs.
         Returns True if download completes, False otherwise.
         """
-        log_path = "/ota/bsw/log/subda.log"
-        patterns = {
-            "completed": re.compile(r"DOWNLOAD-COMPLETED"),
-        }
-        logger.info("Polling OTA download status from subda.log (single check)")
-
-        start_line = getattr(self, "_download_log_start_line", 0)
-        current_line = self._get_log_line_count(log_path)
-        num_new_lines = max(0, current_line - start_line)
-        traces = []
-        if num_new_lines > 0:
-            setattr(self, "_download_log_start_line", current_line)
-            traces = self.putty.send_command_and_return_traces(
-                f"tail -n +{start_line + 1} {log_path} | head -n {num_new_lines}", wait=1, login=False
-            )
-
-        for line in traces:
-            if patterns["completed"].search(line):
-                logger.success("Package download completed successfully")
-                return True
+        logger.info("Waiting for OTA download completion in subda.log")
+        if self._wait_log("_download_subscription", r"DOWNLOAD-COMPLETED", timeout, self._on_download_completed):
+            logger.success("Package download completed successfully")
+            return True
 
-        logger.info("Package download completion pattern not detected yet")
+        self.timeline.end("download", ok=False)
+        logger.error("Package download completion pattern not detected")
         return False
 
     @timed_step("upgrade_duration")
-    @wait_and_retry(timeout=1800, interval=2)
-    def monitor_upgrade_status(self) -> bool:
+    def monitor_upgrade_status(self, timeout: float = 1800) -> bool:
         """
-        Monitor the OTA upgrade status by polling only new log lines for key patterns.
+        Monitor the OTA upgrade status by waiting for INSTALLATION-COMPLETED in the streamed logs.
         Returns True if upgrade completes, False otherwise.
         """
-        log_path = "/ota/bsw/log/subda.log"
-        patterns = {
-            "completed": re.compile(r"INSTALLATION-COMPLETED"),
-        }
-        logger.info("Polling OTA upgrade status from subda.log (single check)")
-
-        start_line = getattr(self, "_upgrade_log_start_line", 0)
-        current_line = self._get_log_line_count(log_path)
-        num_new_lines = max(0, current_line - start_line)
-        traces = []
-        if num_new_lines > 0:
-            setattr(self, "_upgrade_log_start_line", current_line)
-            traces = self.putty.send_command_and_return_traces(
-                f"tail -n +{start_line + 1} {log_path} | head -n {num_new_lines}", wait=1, login=False
-            )
-
-        for line in traces:
-            if patterns["completed"].search(line):
-                logger.success("Upgrade completed successfully")
-                return True
+        logger.info("Waiting for OTA upgrade completion in subda.log")
+        completed = self._wait_log(
+            "_upgrade_subscription", r"INSTALLATION-COMPLETED", timeout, self._on_installation_completed
+        )
+        # the target restarts after installation
+        self.log_monitor.stop()
+        if completed:
+            logger.success("Upgrade completed successfully")
+            return True
 
-        logger.info("Upgrade completion pattern not detected yet")
+        self.timeline.end("installation", ok=False)
+        logger.error("Upgrade completion pattern not detected")
         return False
 
     def perform_ota_test(
@@ -357,14 +450,18 @@ class OTA:
 
             # Step 1: Download (if not skipped)
             if not skip_download:
+                # subscribe before delivery starts, a fast download is not missed
+                if not self._subscribe_log(
+                    "_download_subscription", r"DOWNLOAD-COMPLETED", self._on_download_completed
+                ):
+                    return False
                 logger.info("Switching to driving mode for package delivery.")
                 if not self.switch_vehicle_mode("driving"):
                     logger.error("Failed to switch to driving mode")
                     return False
+                self.timeline.start("download")
                 if not self._is_downloading_in_progress():
                     return False
-                # Record log start line before monitoring download
-                self._record_log_start_line("_download_log_start_line")
                 logger.info("Monitoring download status.")
                 if not self.monitor_download_status():
                     logger.error("Download package failed.")
@@ -378,17 +475,23 @@ class OTA:
                     logger.error("Failed to switch to inactive mode")
                     return False
 
+                if not self._subscribe_log(
+                    "_upgrade_subscription", r"INSTALLATION-COMPLETED", self._on_installation_completed
+                ):
+                    return False
+                self.timeline.start("trigger")
                 if not self.trigger_upgrade_via_dhu():
+                    self.timeline.end("trigger", ok=False)
                     logger.error("Failed to trigger upgrade via DHU")
                     return False
-                countdown(120)
+                self.timeline.end("trigger")
+                self.timeline.start("installation")
+                self._progress_phase = "installation"
             else:
                 logger.warning("Trigger upgrade step skipped.")
 
             # Step 3: Monitor upgrade (if not skipped)
             if not skip_upgrade_monitor:
-                # Record log start line before monitoring upgrade
-                self._record_log_start_line("_upgrade_log_start_line")
                 logger.info("Monitoring upgrade status.")
                 if not self.monitor_upgrade_status():
                     logger.error("OTA test failed during upgrade process")
@@ -401,7 +504,10 @@ class OTA:
             # Step 4: Check slot switch (if not skipped)
             if not skip_slot_check:
                 logger.info("Checking if OTA slot switched.")
-                if self._is_ota_upgrade_successful(previous_slot):
+                self.timeline.start("slot_check")
+                switched = self._is_ota_upgrade_successful(previous_slot)
+                self.timeline.end("slot_check", ok=switched)
+                if switched:
                     logger.success("OTA test completed successfully and slot switched")
                     if hasattr(self, "download_duration"):
                         logger.success(f"Download duration: {self.download_duration:.2f} seconds")
@@ -426,6 +532,8 @@ class OTA:
         """
         try:
             logger.info("Destroying OTA instance and cleaning up resources")
+            if hasattr(self, "log_monitor") and self.log_monitor:
+                self.log_monitor.stop()
             if hasattr(self, "putty") and self.putty:
                 self.putty.disconnect()
             if hasattr(self, "tsmaster") and self.tsmaster:
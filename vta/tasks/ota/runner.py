@@ -4,25 +4,73 @@ from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from loguru import logger
-from vta.core.runner.utils import rotate_folder
+from vta.core.runner.utils import rotate_folder, stop_retention
 from vta.tasks.ota.ota import OTA
+from vta.tasks.ota.timeline import Timeline, percentiles
 from datetime import datetime
 
 ROOT = Path(__file__).resolve().parent.parent.parent.parent
 LOG_PATH = ROOT / "log" / datetime.now().strftime('%A_%m%d%Y_%H%M')
-LOG_PATH.mkdir(parents=True, exist_ok=True)
+
+PUTTY_CONFIG = {
+    "putty_enabled": True,
+    "putty_comport": "COM44",
+    "putty_baudrate": 921600,
+    "putty_username": "",
+    "putty_password": "",
+}
+DEVICE_ID = "2801750c52300030"
 
 console = Console()
 
 @click.command()
 @click.option("--iterations", prompt="Enter the number of iterations for the OTA test", type=int)
-def main(iterations):
+@click.option("--package-size", default=0.0, type=float, help="OTA package size in MB for download throughput")
+def main(iterations, package_size):
+    LOG_PATH.mkdir(parents=True, exist_ok=True)
+    rotate_folder(ROOT / "log")
+    results, timelines = run_iterations(iterations, PUTTY_CONFIG, DEVICE_ID, LOG_PATH, package_size)
+    generate_report(results, timelines)
+    stop_retention()
+
+def run_iterations(
+    iterations: int,
+    putty_config: dict,
+    device_id: str,
+    log_path: Path,
+    package_size: float = 0.0,
+    tsmaster_app: str = "TSMaster",
+    tsmaster_channel: int = 0,
+    tsmaster_lock=None,
+    unit: str = "",
+) -> tuple[list[bool], list[Timeline]]:
+    """
+    Run OTA iterations on one unit until the first failure.
+
+    Args:
+        iterations: Number of iterations
+        putty_config: Configuration parameters for PuttyHelper
+        device_id: Device ID for ADB and DeviceClient
+        log_path: Folder of the iteration logs and timelines
+        package_size: OTA package size in MB, 0 if unknown
+        tsmaster_app: Name of the TSMaster application
+        tsmaster_channel: CAN channel of the unit in the TSMaster application
+        tsmaster_lock: Lock shared by all units of the same TSMaster application
+        unit: Unit name prefixed to the console log
+
+    Returns:
+        tuple: Result and timeline of every iteration run
+    """
     results = []
+    timelines = []
 
     for i in range(iterations):
         logger.remove()
-        logger.add(sys.stdout, level="DEBUG")
-        iteration_log_path = LOG_PATH / f"log_iter_{i+1}_{datetime.now().strftime('%m%d%Y_%H%M%S')}.log"
+        if unit:
+            logger.add(sys.stdout, level="DEBUG", format=f"{{time:HH:mm:ss}} | {{level}} | {unit} | {{message}}")
+        else:
+            logger.add(sys.stdout, level="DEBUG")
+        iteration_log_path = log_path / f"log_iter_{i+1}_{datetime.now().strftime('%m%d%Y_%H%M%S')}.log"
         logger.add(
             str(iteration_log_path),
             backtrace=True,
@@ -31,19 +79,17 @@ def main(iterations):
             rotation="1 week",
             level="TRACE",
         )
-        rotate_folder(ROOT / "log")
         logger.info(f"Starting iteration {i + 1} of {iterations}")
 
-        putty_config = {
-            "putty_enabled": True,
-            "putty_comport": "COM44",
-            "putty_baudrate": 921600,
-            "putty_username": "",
-            "putty_password": "",
-        }
-        device_id = "2801750c52300030"
-
-        ota = OTA(putty_config=putty_config, device_id=device_id)
+        ota = OTA(
+            putty_config=putty_config,
+            device_id=device_id,
+            iteration=i + 1,
+            package_size_mb=package_size or None,
+            tsmaster_app=tsmaster_app,
+            tsmaster_channel=tsmaster_channel,
+            tsmaster_lock=tsmaster_lock,
+        )
         test_result = ota.perform_ota_test(
             skip_download=False,
             skip_slot_check=False,
@@ -51,6 +97,8 @@ def main(iterations):
             skip_upgrade_monitor=False,
         )
         results.append(test_result)
+        ota.timeline.save(log_path / f"timeline_{i + 1}.json")
+        timelines.append(ota.timeline)
 
         if test_result:
             logger.success(f"Iteration {i + 1} completed successfully")
@@ -61,9 +109,9 @@ def main(iterations):
             break
         del ota
 
-    generate_report(results)
+    return results, timelines
 
-def generate_report(results):
+def generate_report(results, timelines: list[Timeline] = ()):
     success_count = results.count(True)
     failure_count = results.count(False)
     total_iterations = len(results)
@@ -81,6 +129,20 @@ def generate_report(results):
     table.add_row("[bold red]FAIL[/bold red]", str(failure_count))
 
     console.print(table)
+    print_phases(timelines)
+
+def print_phases(timelines: list[Timeline], title: str = "OTA Phase Timeline (s, MB/s)"):
+    stats = percentiles(timelines)
+    if stats:
+        points = ("min", "p50", "p90", "p99", "max")
+        phases = Table(title=title)
+        phases.add_column("Phase")
+        phases.add_column("Count", justify="center")
+        for point in points:
+            phases.add_column(point, justify="right")
+        for metric, stat in stats.items():
+            phases.add_row(metric, str(stat["count"]), *(f"{stat[p]:.1f}" for p in points))
+        console.print(phases)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,149 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+class Timeline:
+    """
+    Timeline of the phases of one OTA iteration.
+
+    Events are stamped with a monotonic clock relative to the creation of the
+    timeline, a phase is the span between its `<name>.start` and `<name>.end`
+    events. Download progress events carry the throughput since the former
+    one when the package size is known.
+    """
+
+    def __init__(
+        self, iteration: Optional[int] = None, package_size_mb: Optional[float] = None
+    ) -> None:
+        self.iteration = iteration
+        self.package_size_mb = package_size_mb
+        self.started = time.time()
+        self.events: list[dict] = []
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+
+    def mark(self, event: str, **data) -> float:
+        """
+        Record an event, return its time in seconds since the timeline start.
+        """
+        t = time.monotonic() - self._t0
+        with self._lock:
+            self.events.append({"event": event, "t": round(t, 3), **data})
+        return t
+
+    def start(self, phase: str, **data) -> None:
+        self.mark(f"{phase}.start", **data)
+
+    def end(self, phase: str, ok: bool = True, **data) -> None:
+        self.mark(f"{phase}.end", ok=ok, **data)
+
+    def progress(self, percent: float, phase: str = "download") -> None:
+        """
+        Record progress of a phase, download progress carries the throughput
+        since the former one.
+        """
+        event = f"{phase}.progress"
+        with self._lock:
+            last = next((e for e in reversed(self.events) if e["event"] == event), None)
+        data = {"percent": percent}
+        t = time.monotonic() - self._t0
+        if (
+            phase == "download"
+            and self.package_size_mb
+            and last
+            and t > last["t"]
+            and percent > last["percent"]
+        ):
+            data["mbps"] = round(
+                (percent - last["percent"])
+                / 100
+                * self.package_size_mb
+                / (t - last["t"]),
+                3,
+            )
+        self.mark(event, **data)
+
+    def _find(self, event: str) -> Optional[dict]:
+        return next((e for e in reversed(self.events) if e["event"] == event), None)
+
+    @property
+    def phases(self) -> dict[str, float]:
+        """
+        Return {phase: duration in seconds} of all successfully ended phases.
+        """
+        result = {}
+        for event in self.events:
+            if event["event"].endswith(".end") and event.get("ok", True):
+                phase = event["event"][: -len(".end")]
+                start = self._find(f"{phase}.start")
+                if start and start["t"] <= event["t"]:
+                    result[phase] = round(event["t"] - start["t"], 3)
+        return result
+
+    @property
+    def metrics(self) -> dict[str, float]:
+        """
+        Return phase durations plus derived download throughput in MB/s.
+        """
+        metrics = dict(self.phases)
+        download = metrics.get("download")
+        if self.package_size_mb and download:
+            metrics["download_mbps"] = round(self.package_size_mb / download, 3)
+        return metrics
+
+    def to_dict(self) -> dict:
+        return {
+            "iteration": self.iteration,
+            "started": self.started,
+            "package_size_mb": self.package_size_mb,
+            "events": self.events,
+            "metrics": self.metrics,
+        }
+
+    def save(self, file: Path) -> None:
+        file = Path(file)
+        tmp = file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        tmp.replace(file)
+
+    @classmethod
+    def load(cls, file: Path) -> "Timeline":
+        with open(file, "r") as f:
+            data = json.load(f)
+        timeline = cls(data.get("iteration"), data.get("package_size_mb"))
+        timeline.started = data.get("started", timeline.started)
+        timeline.events = data.get("events", [])
+        return timeline
+
+
+def percentiles(
+    timelines: list[Timeline], points: tuple = (50, 90, 99)
+) -> dict[str, dict[str, float]]:
+    """
+    Return {metric: {"count", "min", "p50", ..., "max"}} across timelines.
+    """
+    values: dict[str, list[float]] = {}
+    for timeline in timelines:
+        for metric, value in timeline.metrics.items():
+            values.setdefault(metric, []).append(value)
+    result = {}
+    for metric, samples in values.items():
+        array = np.array(samples)
+        stats = {"count": len(array), "min": float(array.min())}
+        for point, value in zip(points, np.percentile(array, points)):
+            stats[f"p{point}"] = float(value)
+        stats["max"] = float(array.max())
+        result[metric] = stats
+    return result
@@ -6,10 +6,15 @@
 
 import os
 import re
+from array import array
+from typing import Iterator
 
 import matplotlib.pyplot as plt
+import numpy as np
 from loguru import logger
 
+ESCAPE_PATTERN = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
 
 class Performance:
     # RESULT = os.path.join('.', "result") # for pyinstaller
@@ -42,6 +47,79 @@ class Performance:
         }
         return mappings.get(self.per_type)
 
+    def line_pattern(self, processes: list[str]) -> re.Pattern:
+        """
+        Compile one pattern matching a data line of any given process, with
+        groups `value` and `name`.
+        """
+        # longest first, so a process is not matched by its prefix
+        names = "|".join(
+            re.escape(p) for p in sorted(set(processes), key=len, reverse=True)
+        )
+        mappings = {
+            "qnxcpu": rf"(?P<value>\d+\.\d+)%\s(?P<name>{names})(?=\s|$)",
+            "qnxmem": rf"(?:^|\s)(?P<name>{names})\s\|.*?\|.*?\|\s+(?P<value>\d+)\s\|",
+            "aoscpu": rf"\s[A-Z]+\s+(?P<value>\d+\.\d+).*?\s(?P<name>{names})(?=\s|$)",
+            "aosmem": rf"K.*?K\s+(?P<value>\d+)K.*?\s(?P<name>{names})(?=\s|$)",
+        }
+        return re.compile(mappings[self.per_type])
+
+    @staticmethod
+    def iter_lines(file: str, block_size: int = 1 << 20) -> Iterator[str]:
+        """
+        Yield lines of given file without escape characters, the file is read
+        in blocks so memory usage does not depend on the file size.
+        """
+        rest = b""
+        with open(file, "rb") as f:
+            while block := f.read(block_size):
+                lines = (rest + block).split(b"\n")
+                rest = lines.pop()
+                for line in lines:
+                    yield ESCAPE_PATTERN.sub("", line.decode("utf-8", "ignore"))
+        if rest:
+            yield ESCAPE_PATTERN.sub("", rest.decode("utf-8", "ignore"))
+
+    def parse(
+        self, file: str, processes: list[str], block_size: int = 1 << 20
+    ) -> dict[str, dict[str, np.ndarray]]:
+        """
+        Extract usage of all processes in a single pass.
+
+        Values of a process are summed per snapshot (e.g. threads of one
+        process), snapshots without the process are skipped like in
+        `data_extraction`. Return {process: {"snapshot": index, "value": sum}}.
+        """
+        separator = re.compile(self.seperator_pattern)
+        pattern = self.line_pattern(processes)
+        snapshots = {p: array("q") for p in processes}
+        values = {p: array("d") for p in processes}
+        current: dict[str, float] = {}
+        index = 0
+
+        def flush() -> None:
+            for name, value in current.items():
+                snapshots[name].append(index)
+                values[name].append(value)
+            current.clear()
+
+        for line in self.iter_lines(file, block_size):
+            if separator.search(line):
+                flush()
+                index += 1
+            if match := pattern.search(line):
+                name = match.group("name")
+                current[name] = current.get(name, 0.0) + float(match.group("value"))
+        flush()
+        logger.debug(f"Parse {index + 1} snapshots of {file}")
+        return {
+            p: {
+                "snapshot": np.frombuffer(snapshots[p], dtype=np.int64).copy(),
+                "value": np.frombuffer(values[p], dtype=np.float64).copy(),
+            }
+            for p in processes
+        }
+
     @property
     def units(self):
         mappings = {
@@ -54,7 +132,7 @@ class Performance:
 
     @staticmethod
     def remove_escape_characters(text):
-        return re.sub(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])", "", text)
+        return ESCAPE_PATTERN.sub("", text)
 
     @staticmethod
     def content_splits(file: str, separator_pattern: str) -> list[str]:
@@ -5,12 +5,8 @@
 # ============================================================================================================
 
 import os
-import random
-import re
 import sys
-import threading
 import time
-from typing import Callable
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -19,12 +15,17 @@ from matplotlib.animation import FuncAnimation
 
 sys.path.append(os.sep.join(os.path.abspath(__file__).split(os.sep)[:-4]))
 
+from sampler import AdbShell, Sampler, SerialShell
+
 from vta.api.PuttyHelper import PuttyHelper
-from vta.library.GenericHelper import GenericHelper
-from vta.library.SystemHelper import SystemHelper
 
 
 class Performance:
+    """
+    Live plot of a `Sampler`, sampling runs on its own thread and the plot
+    only reads its ring buffer.
+    """
+
     RESULT = os.path.join(os.path.dirname(__file__), "result")
     dputty = {
         "putty_enabled": False,
@@ -33,164 +34,131 @@ class Performance:
         "putty_username": "zeekr",
         "putty_password": "Aa123123",
     }
+    # {callback: (performance type, default process, y label)}
+    operation_map = {
+        "qnx_cpu": ("qnxcpu", "AudioSystemControllerDeamon", "CPU Usage (%)"),
+        "qnx_memory": ("qnxmem", "diag_server", "Mem Usage (KB)"),
+        "aos_cpu": ("aoscpu", "com.android.car", "CPU Usage (%)"),
+        "aos_memory": (
+            "aosmem",
+            "/vendor/bin/hw/android.hardware.bluetooth@1.0-service-qti",
+            "Mem Usage (K)",
+        ),
+    }
 
     def __init__(
         self,
         duration=30,
         callback: str = None,
+        processes: list[str] = None,
+        metrics: list[str] = None,
+        interval: float = 1.0,
     ) -> None:
-        self.mputty = PuttyHelper()
-        self.mputty.connect(self.dputty)
+        if callback not in self.operation_map:
+            logger.error("Unknown callback function!")
+            exit(1)
         if not os.path.exists(self.RESULT):
             os.mkdir(self.RESULT)
-
-        self.process = None
+        per_type, process, self.y_label = self.operation_map[callback]
+        self.callback = callback
+        self.processes = processes or [process]
         self.duration = duration
-        self.fig, self.ax = plt.subplots()
-        (self.line,) = self.ax.plot([], [], lw=2)
-        self.x_data = []
-        self.y_data = []
-        self.max_annotation = None
-        self.avg_line = None
-        self.ax.set_xlabel("Time (s)")
-
-        operation_map = {
-            "qnx_cpu": self.qnx_cpu_usage,
-            "qnx_memory": self.qnx_memory_usage,
-            "aos_cpu": self.aos_cpu_usage,
-            "aos_memory": self.aos_memory_usage,
-            "test": self.test,
-        }
-        self.callback = operation_map.get(callback, None)
-        if not self.callback:
-            logger.error("Unknown callback function!")
-            exit(1)
+        self.stopped = False
 
-        self.ani = FuncAnimation(
-            self.fig, self.update_plot, interval=1000, cache_frame_data=False
-        )
-        self.fig.canvas.mpl_connect("close_event", self.on_close)
+        if per_type.startswith("qnx"):
+            self.mputty = PuttyHelper()
+            self.mputty.connect(self.dputty)
+            shell = SerialShell(self.mputty)
+        else:
+            self.mputty = None
+            shell = AdbShell()
+        self.sampler = Sampler(shell, per_type, self.processes, metrics, interval)
+
+    def _draw(self, ax) -> None:
+        times, values = self.sampler.buffer.snapshot()
+        ax.clear()
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel(self.y_label)
+        ax.set_title(f"{self.y_label} of {', '.join(self.processes)} (Real-time)")
+        if not len(times):
+            return
+        x_data = times - times[0]
+        for i, (process, metric) in enumerate(self.sampler.buffer.columns):
+            y_data = values[:, i]
+            ax.plot(x_data, y_data, lw=2, label=f"{process} {metric}")
+            if np.isnan(y_data).all():
+                continue
+            max_index = int(np.nanargmax(y_data))
+            avg_value = np.nanmean(y_data)
+            ax.scatter(
+                x_data[max_index],
+                y_data[max_index],
+                c="red",
+                marker="o",
+                s=100,
+                label=f"Max: {y_data[max_index]:.2f}",
+            )
+            ax.axhline(
+                y=avg_value, color="red", linestyle="--", label=f"Avg: {avg_value:.2f}"
+            )
+        ax.legend(loc="upper left")
 
     def update_plot(self, i):
         elapsed_time = time.time() - self.start_time
         if elapsed_time >= self.duration:
             logger.success(f"Reached time out! {self.duration}")
             self.ani.event_source.stop()
-            self.save_plot()
-        else:
-            data = self.callback()
-            if data:
-                self.x_data.append(elapsed_time)
-                self.y_data.append(data)
-                self.line.set_data(self.x_data, self.y_data)
-                self.update_annotations()
-                self.ax.relim()
-                self.ax.autoscale_view()
-
-    def save_plot(self):
-        title = f"{self.callback.__name__}_{self.process}.png"
-        self.fig.savefig(os.path.join(self.RESULT, title))
-        plt.close()
+            self.stop()
+        self._draw(self.ax)
+
+    def save_plot(self, fig=None):
+        title = f"{self.callback}_{'_'.join(self.processes).replace('/', '_')}.png"
+        if fig is None:
+            fig, ax = plt.subplots()
+            self._draw(ax)
+        fig.savefig(os.path.join(self.RESULT, title))
+        plt.close(fig)
+
+    def stop(self):
+        """
+        Stop sampling, save the plot and disconnect. Both the elapsed duration
+        and closing the window stop, so only the first call has an effect.
+        """
+        if self.stopped:
+            return
+        self.stopped = True
+        if self.sampler.is_alive():
+            self.sampler.stop()
+            self.sampler.join()
+            logger.info(f"Sampling overhead: {self.sampler.overhead()}")
+        # drawn on its own figure, the live window stays open after time out
+        self.save_plot()
+        if self.mputty:
+            self.mputty.disconnect()
 
     def on_close(self, event):
-        self.save_plot()
-        self.mputty.disconnect()
+        self.stop()
 
     def animate(self):
+        """
+        Sample and plot live until the window is closed or duration elapsed.
+        """
+        self.fig, self.ax = plt.subplots()
+        self.ani = FuncAnimation(
+            self.fig, self.update_plot, interval=1000, cache_frame_data=False
+        )
+        self.fig.canvas.mpl_connect("close_event", self.on_close)
         self.start_time = time.time()
+        self.sampler.start()
         plt.show()
 
-    def update_annotations(self):
-        if self.max_annotation:
-            self.max_annotation.remove()
-        if self.avg_line:
-            self.avg_line.remove()
-
-        max_value = max(self.y_data)
-        avg_value = np.mean(self.y_data)
-        max_index = self.y_data.index(max_value)
-
-        self.max_annotation = self.ax.scatter(
-            self.x_data[max_index],
-            max_value,
-            c="red",
-            marker="o",
-            s=100,
-            label=f"Max: {max_value:.2f}%",
-        )
-        self.avg_line = self.ax.axhline(
-            y=avg_value, color="red", linestyle="--", label=f"Avg: {avg_value:.2f}%"
-        )
-
-    def qnx_cpu_usage(self):
-        # 3010567     6  10 Sem       1:16:29   5.59% qvm
-        value = 0
-        self.process = "AudioSystemControllerDeamon"
-        command = f"top -i 1 -b | grep {self.process}"
-        self.ax.set_ylabel("CPU Usage (%)")
-        self.ax.set_title(f"CPU Usage of {self.process} (Real-time)")
-        pattern = r"(\d+\.\d+)%"
-        data = self.mputty.send_command_and_return_traces(
-            cmd=command, wait=2, login=False
-        )
-        res, matched = GenericHelper.match_string(pattern, data)
-        if not res:
-            logger.warning("Nothing matched!")
-        else:
-            for i in matched:
-                value += float(i[0])
-            return value
-
-    def qnx_memory_usage(self):
-        #                    diag_server |        1466484 |          18228 |          27558 |             56 |          12488 |           1532 |          13472 |                 0 |             10 |
-        self.process = "diag_server"
-        pattern = r"\s(\d+)\s\|"
-        command = f"showmem | grep {self.process}"
-        self.ax.set_ylabel("Mem Usage (%)")
-        self.ax.set_title(f"Mem Usage of {self.process} (Real-time)")
-        data = self.mputty.send_command_and_return_traces(
-            cmd=command, wait=3, login=False
-        )
-        matches = re.findall(pattern, data[-1])
-        if matches:
-            logger.success(f"Matched {matches}")
-            return int(matches[2])
-        else:
-            logger.warning("Nothing matched!")
-
-    def aos_cpu_usage(self):
-        # "15384 shell        20   0  10G 4.9M 3.7M R  5.0   0.0   0:00.43 top -d 1"
-        value = 0
-        self.process = "com.android.car"
-        command = f'adb shell "top -n 1| grep {self.process}"'
-        pattern = r"\s[A-Z]+\s+(\d+\.\d+)\s+"
-        self.ax.set_ylabel("CPU Usage (%)")
-        self.ax.set_title(f"CPU Usage of {self.process} (Real-time)")
-        data = GenericHelper.prompt_command(command)
-        res, matched = GenericHelper.match_string(pattern, data)
-        if not res:
-            logger.warning("Nothing matched!")
-        else:
-            for i in matched:
-                value += float(i[0])
-            return value
-
-    def aos_memory_usage(self):
-        #   559  10967908K    7184K    2509K    2376K       0K       0K       0K       0K  /vendor/bin/hw/android.hardware.bluetooth@1.0-service-qti
-        self.process = "android.hardware.bluetooth"
-        GenericHelper.prompt_command("adb root")
-        command = f'adb shell "procrank | grep {self.process}"'
-        pattern = r"(\d+)K\s+"
-        data = GenericHelper.prompt_command(command, timeout=10)
-        matches = re.findall(pattern, data[-1])
-        if matches:
-            logger.success(f"Matched {matches}")
-            return int(matches[2])
-        else:
-            logger.warning("Nothing matched!")
-
-    def test(self):
-        return random.choice([1, 2])
+    def record(self):
+        """
+        Sample headless for duration, then save the plot.
+        """
+        self.sampler.start()
+        self.sampler.event_stop.wait(self.duration)
+        self.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Batch rendering of performance plots.
+
+Charts are rendered with the Agg backend in a process pool, every worker
+reuses one figure for all its charts. Long series are downsampled with LTTB
+(Largest-Triangle-Three-Buckets) before plotting, while max and average are
+always computed on the full series. All charts can be bundled into one
+self-contained HTML report.
+"""
+import base64
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+from loguru import logger
+
+_figure = None
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample (x, y) to `threshold` points keeping the visual shape.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return x, y
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # first and last points are kept, the rest is split into buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    index = np.empty(threshold, dtype=np.int64)
+    index[0], index[-1] = 0, n - 1
+    selected = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket, the last point for the last bucket
+        if i + 2 < len(edges):
+            next_x = x[hi : edges[i + 2]].mean()
+            next_y = y[hi : edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[selected] - next_x) * (y[lo:hi] - y[selected])
+            - (x[selected] - x[lo:hi]) * (next_y - y[selected])
+        )
+        selected = lo + int(area.argmax())
+        index[i + 1] = selected
+    return x[index], y[index]
+
+
+def _render(chart: dict) -> dict:
+    """
+    Render one chart to its png file with the figure of the worker.
+    """
+    global _figure
+    if _figure is None:
+        _figure = plt.figure(figsize=(10, 5))
+    fig = _figure
+    fig.clf()
+    ax = fig.add_subplot()
+
+    y_full = np.asarray(chart["values"], dtype=np.float64)
+    x_full = np.arange(len(y_full), dtype=np.float64)
+    max_index = int(y_full.argmax())
+    max_value = float(y_full[max_index])
+    average = float(y_full.mean())
+    x_data, y_data = lttb(x_full, y_full, chart.get("max_points", 2000))
+
+    ax.plot(x_data, y_data)
+    ax.set_ylabel(f"{chart['y_label']} ({chart['units']})")
+    ax.set_title(chart["title"])
+    # mark max point and average line
+    ax.scatter(max_index, max_value, color="red", label="Max Point", marker="o")
+    ax.text(
+        max_index,
+        max_value,
+        f"Max Value: {max_value: .2f}",
+        color="red",
+        ha="right",
+        va="bottom",
+    )
+    ax.axhline(y=average, color="green", linestyle="--", label="Average Line")
+    ax.text(0.5, average, f"Average Value: {average: 0.2f}", color="green", va="bottom")
+    fig.savefig(chart["file"])
+    return {
+        "title": chart["title"],
+        "file": chart["file"],
+        "units": chart["units"],
+        "count": len(y_full),
+        "max": max_value,
+        "avg": average,
+    }
+
+
+def render_all(
+    charts: list[dict], workers: Optional[int] = None, max_points: int = 2000
+) -> list[dict]:
+    """
+    Render charts {"title", "y_label", "units", "values", "file"} in parallel
+    and return {"title", "file", "units", "count", "max", "avg"} of each
+    rendered chart, in the given order. Charts without values are skipped.
+    """
+    charts = [{**c, "max_points": max_points} for c in charts if len(c["values"])]
+    for chart in charts:
+        os.makedirs(os.path.dirname(chart["file"]), exist_ok=True)
+    if not charts:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(charts))
+    if workers == 1:
+        results = [_render(chart) for chart in charts]
+    else:
+        chunksize = max(1, len(charts) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_render, charts, chunksize=chunksize))
+    for result in results:
+        logger.success(f"save file to {result['file']}")
+    return results
+
+
+def write_html(
+    results: list[dict], file: str, title: str = "Performance Report"
+) -> str:
+    """
+    Write one HTML file embedding all rendered charts with their max/avg.
+    """
+    rows = []
+    charts = []
+    for i, result in enumerate(results):
+        name = html.escape(result["title"])
+        rows.append(
+            f"<tr><td><a href='#c{i}'>{name}</a></td><td>{result['count']}</td>"
+            f"<td>{result['max']:.2f}</td><td>{result['avg']:.2f}</td>"
+            f"<td>{html.escape(result['units'] or '')}</td></tr>"
+        )
+        with open(result["file"], "rb") as f:
+            image = base64.b64encode(f.read()).decode()
+        charts.append(
+            f"<h2 id='c{i}'>{name}</h2><img src='data:image/png;base64,{image}'/>"
+        )
+    content = (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title><style>"
+        "body{font-family:sans-serif;margin:2em}"
+        "table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:4px 8px}"
+        "img{max-width:100%}</style></head><body>"
+        f"<h1>{html.escape(title)}</h1><p>{datetime.now():%Y-%m-%d %H:%M:%S}</p>"
+        "<table><tr><th>Chart</th><th>Samples</th><th>Max</th><th>Average</th>"
+        f"<th>Unit</th></tr>{''.join(rows)}</table>{''.join(charts)}</body></html>"
+    )
+    with open(file, "w", encoding="utf-8") as f:
+        f.write(content)
+    logger.success(f"save report to {file}")
+    return file
@@ -9,13 +9,15 @@ import os
 
 from loguru import logger
 from performance import Performance
+from report import render_all, write_html
+from store import SampleStore
 
 
-def load_config(file: str) -> list[dict]:
+def load_config(file: str) -> dict:
     with open(file, "r") as f:
         data: dict = json.load(f)
     logger.success(f"Load config: {data['name']} - v{data['version']}")
-    return data.get("data")
+    return data
 
 
 if __name__ == "__main__":
@@ -24,20 +26,60 @@ if __name__ == "__main__":
     main_path = __file__
     config_file = os.path.join(os.path.dirname(main_path), "perf.json")
     config = load_config(config_file)
-    for cfg in config:
+    # samples are only kept for comparison when the capture is labelled
+    build: str = config.get("build")
+    bench: str = config.get("bench")
+    store = SampleStore()
+    charts = []
+    for cfg in config.get("data"):
         file: str = os.path.join(os.path.dirname(main_path), cfg.get("source"))
         per_type: str = cfg.get("type")
         processes: list[str] = cfg.get("processes")
         title: str = cfg.get("title")
         mp = Performance(per_type)
         if cfg.get("enabled"):
-            chunks = mp.content_splits(file, mp.seperator_pattern)
-            for process in processes:
-                y_data = mp.data_extraction(chunks, mp.match_pattern(process))
-                mp.save_plot(
-                    y_data,
-                    y_label=per_type,
-                    title=f"{title}_{process.replace('/', '_')}",
+            # all processes are extracted in a single pass over the capture
+            columns = mp.parse(file, processes)
+            if build and bench:
+                # the capture is written until its last snapshot, so the
+                # modification time stamps the end
+                interval = cfg.get("interval", 1.0)
+                snapshots = max(
+                    (
+                        int(c["snapshot"][-1]) + 1
+                        for c in columns.values()
+                        if len(c["snapshot"])
+                    ),
+                    default=0,
+                )
+                store.write(
+                    build,
+                    bench,
+                    per_type,
+                    columns,
+                    start=os.path.getmtime(file) - snapshots * interval,
+                    interval=interval,
+                )
+            for process in dict.fromkeys(processes):
+                chart_title = f"{title}_{process.replace('/', '_')}"
+                values = columns[process]["value"]
+                if not len(values):
+                    logger.warning(f"{chart_title} data is empty!")
+                    continue
+                charts.append(
+                    {
+                        "title": chart_title,
+                        "y_label": per_type,
+                        "units": mp.units,
+                        "values": values,
+                        "file": f"{os.path.join(mp.type_result, chart_title)}.png",
+                    }
                 )
         else:
             logger.warning(f"{per_type} is disabled!")
+    # plots are rendered in a process pool, long series downsampled to 2000
+    results = render_all(charts, max_points=config.get("max_points", 2000))
+    if results:
+        write_html(
+            results, os.path.join(Performance.RESULT, "report.html"), config["name"]
+        )
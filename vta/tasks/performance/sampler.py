@@ -0,0 +1,429 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Headless realtime sampler of process performance.
+
+A `Sampler` thread keeps one shell open to the target (`SerialShell` for QNX,
+`AdbShell` for Android) and runs a single full `top`, `showmem`, `procrank`
+or `dumpsys meminfo` per tick, whatever the number of processes. The output
+is parsed into a per-PID table from which all tracked processes and metrics
+are taken and published to a `RingBuffer`. Consumers such as the live plot
+of `performance_realtime` only read the buffer, so they never block sampling
+and vice versa.
+"""
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+ESCAPE_PATTERN = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
+
+def _size_kb(text: str) -> float:
+    """
+    Convert sizes like `4.4M`, `18G`, `2376K`, `512` (KB) or `0(bytes)` to KB.
+    """
+    text = text.strip()
+    if text.endswith("(bytes)"):
+        return float(text[: -len("(bytes)")]) / 1024
+    scale = {"K": 1, "M": 1024, "G": 1024 * 1024, "T": 1024 * 1024 * 1024}
+    if text and text[-1].upper() in scale:
+        return float(text[:-1]) * scale[text[-1].upper()]
+    return float(text)
+
+
+def _add(table: dict[int, dict], pid: int, name: str, **metrics: float) -> None:
+    # rows of the same pid (threads) are summed
+    row = table.setdefault(pid, {"name": name})
+    for metric, value in metrics.items():
+        row[metric] = row.get(metric, 0.0) + value
+
+
+def parse_qnx_top(lines: list[str]) -> dict[int, dict]:
+    # PID   TID PRI STATE    HH:MM:SS    CPU  COMMAND
+    pattern = re.compile(
+        r"^\s*(\d+)\s+\d+\s+\d+\s+\S+\s+[\d:]+\s+(\d+\.\d+)%\s+(.+?)\s*$"
+    )
+    table: dict[int, dict] = {}
+    for line in lines:
+        if match := pattern.match(line):
+            _add(table, int(match[1]), match[3], cpu=float(match[2]))
+    return table
+
+
+def parse_showmem(lines: list[str]) -> dict[int, dict]:
+    # name | pid | AS (KB) | Total mem (KB) | Stack (KB) | Code (KB) | Data (KB) |
+    # Heap (KB) | Shared Lib(bytes) | Mapped Mem (KB) |
+    metrics = ("as", "total", "stack", "code", "data", "heap", "shared", "mapped")
+    table: dict[int, dict] = {}
+    for line in lines:
+        cells = [c.strip() for c in line.split("|")]
+        if len(cells) < 10 or not cells[1].isdigit():
+            continue
+        try:
+            values = {m: _size_kb(c) for m, c in zip(metrics, cells[2:10])}
+        except ValueError:
+            continue
+        # shared libraries are given in bytes
+        values["shared"] /= 1024
+        _add(table, int(cells[1]), cells[0], **values)
+    return table
+
+
+def parse_aos_top(lines: list[str]) -> dict[int, dict]:
+    # PID USER PR NI VIRT RES SHR S %CPU %MEM TIME+ ARGS
+    pattern = re.compile(
+        r"^\s*(\d+)\s+\S+\s+\S+\s+\S+\s+(\S+)\s+(\S+)\s+(\S+)\s+[A-Z]\s+"
+        r"(\d+\.?\d*)\s+(\d+\.?\d*)\s+\S+\s+(.+?)\s*$"
+    )
+    table: dict[int, dict] = {}
+    for line in lines:
+        if match := pattern.match(line):
+            try:
+                sizes = {
+                    "virt": _size_kb(match[2]),
+                    "res": _size_kb(match[3]),
+                    "shr": _size_kb(match[4]),
+                }
+            except ValueError:
+                continue
+            _add(
+                table,
+                int(match[1]),
+                match[7],
+                cpu=float(match[5]),
+                mem=float(match[6]),
+                **sizes,
+            )
+    return table
+
+
+def parse_procrank(lines: list[str]) -> dict[int, dict]:
+    # PID Vss Rss Pss Uss [Swap PSwap USwap ZSwap] cmdline
+    metrics: list[str] = []
+    table: dict[int, dict] = {}
+    for line in lines:
+        fields = line.split()
+        if fields[:1] == ["PID"]:
+            metrics = [f.lower() for f in fields[1:-1]]
+            continue
+        if not metrics or len(fields) <= len(metrics) + 1 or not fields[0].isdigit():
+            continue
+        try:
+            values = {m: _size_kb(v) for m, v in zip(metrics, fields[1:])}
+        except ValueError:
+            continue
+        _add(table, int(fields[0]), " ".join(fields[len(metrics) + 1 :]), **values)
+    return table
+
+
+def parse_meminfo(lines: list[str]) -> dict[int, dict]:
+    # Total PSS by process:
+    #     233,979K: system_server (pid 1217)
+    header = re.compile(r"^\s*Total (\w+) by (\w+)")
+    pattern = re.compile(r"^\s*([\d,]+)K: (.+?) \(pid (\d+)")
+    metric = None
+    table: dict[int, dict] = {}
+    for line in lines:
+        if match := header.match(line):
+            # only the by process sections, others repeat the processes
+            metric = match[1].lower() if match[2] == "process" else None
+        elif metric and (match := pattern.match(line)):
+            _add(
+                table,
+                int(match[3]),
+                match[2],
+                **{metric: float(match[1].replace(",", ""))},
+            )
+    return table
+
+
+# {performance type: (command, parser, default metric)}
+COLLECTORS: dict[str, tuple[str, Callable[[list[str]], dict[int, dict]], str]] = {
+    "qnxcpu": ("top -i 1 -b", parse_qnx_top, "cpu"),
+    "qnxmem": ("showmem", parse_showmem, "total"),
+    "aoscpu": ("top -b -n 1", parse_aos_top, "cpu"),
+    "aosmem": ("procrank", parse_procrank, "pss"),
+    "aosmeminfo": ("dumpsys meminfo", parse_meminfo, "pss"),
+}
+
+
+def _marker() -> str:
+    return f"__VTA_{uuid.uuid4().hex[:8]}__"
+
+
+class SerialShell:
+    """
+    Run commands on the logged in serial console of a `PuttyHelper`.
+
+    Output is collected until an echoed end marker instead of sleeping a
+    fixed time per command.
+    """
+
+    def __init__(self, putty, login: bool = True) -> None:
+        self.putty = putty
+        if login:
+            self.putty.login()
+
+    def run(self, cmd: str, timeout: float = 10.0) -> list[str]:
+        marker = _marker()
+        traces = self.putty.waitTrace_queue
+        traces.queue.clear()
+        self.putty.event_waitTrace.set()
+        try:
+            self.putty.send_command(f"{cmd}; echo {marker}")
+            lines = []
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"`{cmd}` did not finish in {timeout}s")
+                try:
+                    _, line = traces.get(timeout=min(remaining, 0.5))
+                except queue.Empty:
+                    continue
+                # the echoed command line contains the marker too
+                if line == marker:
+                    return lines
+                lines.append(line)
+        finally:
+            self.putty.event_waitTrace.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class AdbShell:
+    """
+    Run commands in one persistent `adb shell` instead of a new adb process
+    per command.
+    """
+
+    def __init__(self, device: Optional[str] = None, root: bool = True) -> None:
+        adb = ["adb"] + (["-s", device] if device else [])
+        if root:
+            subprocess.run(adb + ["root"], capture_output=True, timeout=10)
+            subprocess.run(adb + ["wait-for-device"], capture_output=True, timeout=30)
+        self.process = subprocess.Popen(
+            adb + ["shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        self.lines: queue.Queue[str] = queue.Queue()
+        threading.Thread(target=self._reader, name="AdbShell", daemon=True).start()
+
+    def _reader(self) -> None:
+        for raw in iter(self.process.stdout.readline, b""):
+            self.lines.put(raw.decode("utf-8", "ignore").rstrip("\r\n"))
+        logger.warning("adb shell closed!")
+
+    def run(self, cmd: str, timeout: float = 10.0) -> list[str]:
+        if self.process.poll() is not None:
+            raise ConnectionError("adb shell is not running!")
+        # drop the rest of a former command which timed out
+        self.lines.queue.clear()
+        marker = _marker()
+        self.process.stdin.write(f"{cmd}; echo {marker}\n".encode())
+        self.process.stdin.flush()
+        lines = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"`{cmd}` did not finish in {timeout}s")
+            try:
+                line = self.lines.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if line.strip() == marker:
+                return lines
+            lines.append(line)
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.terminate()
+
+
+class RingBuffer:
+    """
+    Fixed size buffer of the latest samples, one column per key.
+    """
+
+    def __init__(self, columns: list, capacity: int = 3600) -> None:
+        self.columns = list(dict.fromkeys(columns))
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.full((capacity, len(self.columns)), np.nan)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: float, values: dict) -> None:
+        row = [values.get(c, np.nan) for c in self.columns]
+        with self._lock:
+            index = self.count % self.capacity
+            self.times[index] = timestamp
+            self.values[index] = row
+            self.count += 1
+
+    def snapshot(self, column=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return copies of (time, values) ordered from oldest to latest, values
+        are a column if `column` is given, else a matrix. A value missing in
+        a tick is NaN.
+        """
+        with self._lock:
+            size = min(self.count, self.capacity)
+            start = self.count % self.capacity if self.count > self.capacity else 0
+            order = (np.arange(size) + start) % self.capacity
+            times = self.times[order]
+            values = self.values[order]
+        if column is not None:
+            values = values[:, self.columns.index(column)]
+        return times, values
+
+
+class Sampler(threading.Thread):
+    """
+    Sample `metrics` of `processes` of given performance type every
+    `interval` seconds, metrics default to the main one of the type.
+
+    A process is matched by the name of a table row or its basename, rows of
+    all its PIDs are summed. Buffer columns and subscriber values are keyed
+    by (process, metric). Subscribers are called with (timestamp, values) on
+    the sampler thread after each tick, they must return quickly; the full
+    table of the latest tick is kept in `table`.
+    """
+
+    def __init__(
+        self,
+        shell,
+        per_type: str,
+        processes: list[str],
+        metrics: Optional[list[str]] = None,
+        interval: float = 1.0,
+        capacity: int = 3600,
+        timeout: float = 10.0,
+    ) -> None:
+        super().__init__(name=f"Sampler-{per_type}", daemon=True)
+        self.shell = shell
+        self.per_type = per_type
+        self.command, self.parser, metric = COLLECTORS[per_type]
+        self.processes = list(dict.fromkeys(processes))
+        self.metrics = list(dict.fromkeys(metrics or [metric]))
+        self.interval = interval
+        self.timeout = timeout
+        self.buffer = RingBuffer(
+            [(p, m) for p in self.processes for m in self.metrics], capacity
+        )
+        self.subscribers: list[Callable[[float, dict], None]] = []
+        self.table: dict[int, dict] = {}
+        self.ticks = 0
+        self.errors = 0
+        self.overruns = 0
+        self.command_time = 0.0
+        self.parse_time = 0.0
+        self.self_cpu = 0.0
+        self.event_stop = threading.Event()
+
+    def subscribe(self, callback: Callable[[float, dict], None]) -> None:
+        self.subscribers.append(callback)
+
+    def stop(self) -> None:
+        self.event_stop.set()
+
+    def extract(self, table: dict[int, dict]) -> dict[tuple[str, str], float]:
+        wanted = set(self.processes)
+        values: dict[tuple[str, str], float] = {}
+        for row in table.values():
+            name = row["name"]
+            if name not in wanted:
+                name = os.path.basename(name.split()[0]) if name.split() else name
+                if name not in wanted:
+                    continue
+            for metric in self.metrics:
+                if metric in row:
+                    key = (name, metric)
+                    values[key] = values.get(key, 0.0) + row[metric]
+        return values
+
+    def tick(self) -> dict[tuple[str, str], float]:
+        timestamp = time.time()
+        start = time.perf_counter()
+        lines = self.shell.run(self.command, self.timeout)
+        parsed = time.perf_counter()
+        table = self.parser([ESCAPE_PATTERN.sub("", line) for line in lines])
+        values = self.extract(table)
+        self.parse_time += time.perf_counter() - parsed
+        self.command_time += parsed - start
+        # the sampling command shows up in its own cpu snapshot
+        program = self.command.split()[0]
+        self.self_cpu += sum(
+            row.get("cpu", 0.0)
+            for row in table.values()
+            if row["name"].split()[:1] == [program]
+        )
+        self.table = table
+        self.buffer.append(timestamp, values)
+        self.ticks += 1
+        for callback in self.subscribers:
+            try:
+                callback(timestamp, values)
+            except Exception:
+                logger.exception(f"Subscriber {callback} failed!")
+        return values
+
+    def overhead(self) -> dict[str, float]:
+        """
+        Return the sampling overhead: average command and parse time per tick
+        in ms, the share of the interval spent sampling, overran ticks and the
+        average cpu % of the sampling command on the target (cpu types only).
+        """
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "errors": self.errors,
+            "overruns": self.overruns,
+            "command_ms": self.command_time / ticks * 1000,
+            "parse_ms": self.parse_time / ticks * 1000,
+            "duty": (self.command_time + self.parse_time) / ticks / self.interval,
+            "target_cpu": self.self_cpu / ticks,
+        }
+
+    def run(self) -> None:
+        next_tick = time.monotonic()
+        while not self.event_stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"{self.per_type} sample failed: {e}")
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # command is slower than the interval, do not try to catch up
+                self.overruns += 1
+                logger.debug(f"{self.per_type} sample overran by {-delay:.2f}s")
+                next_tick = time.monotonic()
+                delay = 0
+            self.event_stop.wait(delay)
+        self.shell.close()
+        overhead = self.overhead()
+        logger.info(
+            f"{self.per_type} sampler stopped after {self.ticks} ticks, "
+            f"command {overhead['command_ms']:.1f}ms, "
+            f"parse {overhead['parse_ms']:.2f}ms, duty {overhead['duty']:.1%}"
+        )
@@ -0,0 +1,154 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Storage I/O benchmark with the bundled tiotest binaries.
+
+The binary of the target is pushed with `SystemHelper.PC2Android` or
+`SystemHelper.PC2QNX`, every scenario of `storage.json` is run `iterations`
+times and the throughput/latency tables are parsed. Results are written to
+the `SampleStore` of the CPU/memory samples as type `tiotest_<target>`, one
+column per `<scenario>:<item>:<metric>`, and compared with the `base` build
+if one is configured.
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from loguru import logger
+
+sys.path.append(os.sep.join(os.path.abspath(__file__).split(os.sep)[:-4]))
+
+from sampler import AdbShell, SerialShell
+from store import SampleStore
+from tiotest import HIGHER_IS_BETTER, parse_tiotest, tiotest_command
+
+from vta.api.PuttyHelper import PuttyHelper
+from vta.library.SystemHelper import SystemHelper
+
+BINARIES = {
+    "android": os.path.join(os.path.dirname(__file__), "bin", "tiotest_la"),
+    "qnx": os.path.join(os.path.dirname(__file__), "bin", "tiotest_qnx"),
+}
+
+
+def open_shell(config: dict):
+    """
+    Push the tiotest binary of the target and return (shell, remote binary).
+    """
+    target = config.get("target", "android")
+    device = config.get("device", "1234567")
+    binary = config.get("binary", "/data/local/tmp/tiotest")
+    if target == "android":
+        SystemHelper.PC2Android(BINARIES[target], binary, device)
+        shell = AdbShell(device)
+    else:
+        # the copy over the nfs share uses its own serial connection
+        SystemHelper.PC2QNX(
+            config["comport"],
+            BINARIES[target],
+            binary,
+            device,
+            config.get("username", "root"),
+            config.get("password", "root"),
+        )
+        putty = PuttyHelper()
+        putty.connect(
+            {
+                "putty_enabled": True,
+                "putty_comport": config["comport"],
+                "putty_username": config.get("username", "root"),
+                "putty_password": config.get("password", "root"),
+            }
+        )
+        shell = SerialShell(putty)
+    shell.run(f"chmod +x {binary}")
+    return shell, binary
+
+
+def run_scenarios(shell, binary: str, config: dict) -> dict[str, list[float]]:
+    """
+    Run all enabled scenarios, return {"<scenario>:<item>:<metric>": [value
+    per iteration]}.
+    """
+    directory = config.get("directory", "/data/local/tmp/tiotest_files")
+    iterations = config.get("iterations", 3)
+    timeout = config.get("timeout", 600)
+    shell.run(f"mkdir -p {directory}")
+    results: dict[str, list[float]] = {}
+    for scenario in config.get("scenarios", []):
+        if not scenario.get("enabled", True):
+            logger.warning(f"{scenario['name']} is disabled!")
+            continue
+        cmd = tiotest_command(binary, directory, scenario)
+        for iteration in range(1, iterations + 1):
+            logger.info(f"Run {scenario['name']} {iteration}/{iterations}: {cmd}")
+            parsed = parse_tiotest(shell.run(cmd, timeout))
+            if not parsed:
+                logger.error(f"No tiotest result of {scenario['name']}!")
+                continue
+            for item, metrics in parsed.items():
+                for metric, value in metrics.items():
+                    key = f"{scenario['name']}:{item}:{metric}"
+                    results.setdefault(key, []).append(value)
+    shell.run(f"rm -rf {directory}")
+    return results
+
+
+def save_results(config: dict, results: dict[str, list[float]]) -> bool:
+    """
+    Store results and compare them with the base build, return False if
+    any throughput or latency regressed.
+    """
+    build, bench, base = config.get("build"), config.get("bench"), config.get("base")
+    if not (build and bench):
+        logger.warning("build or bench not set, results are not stored!")
+        return True
+    per_type = f"tiotest_{config.get('target', 'android')}"
+    store = SampleStore()
+    store.write(
+        build,
+        bench,
+        per_type,
+        {
+            key: {"snapshot": np.arange(len(values)), "value": np.array(values)}
+            for key, values in results.items()
+        },
+        start=time.time(),
+        higher_is_better=[k for k in results if k.endswith(HIGHER_IS_BETTER)],
+    )
+    if not base or not store.file(base, bench, per_type).exists():
+        return True
+    # median over iterations, single runs are noisy
+    regressions = [
+        row
+        for row in store.compare(
+            base, build, bench, per_type, "p50", config.get("tolerance", 0.1)
+        )
+        if row["regression"]
+    ]
+    for row in regressions:
+        logger.error(
+            f"{row['process']} regressed {row['change']:+.1%}: "
+            f"{row['base']:.3f} -> {row['build']:.3f}"
+        )
+    return not regressions
+
+
+if __name__ == "__main__":
+    config_file = os.path.join(os.path.dirname(__file__), "storage.json")
+    with open(config_file, "r") as f:
+        config: dict = json.load(f)
+    logger.success(f"Load config: {config['name']} - v{config['version']}")
+    shell, binary = open_shell(config)
+    try:
+        results = run_scenarios(shell, binary, config)
+    finally:
+        shell.close()
+    if not save_results(config, results):
+        exit(1)
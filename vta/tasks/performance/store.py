@@ -0,0 +1,296 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Columnar store of parsed performance samples.
+
+Samples are kept as compressed numpy archives, one per build, bench and
+performance type:
+
+    <root>/<build>/<bench>/<per_type>.npz
+
+Each archive holds the process names plus a `time` (epoch seconds) and a
+`value` column per process, so comparing SOC builds only loads a few arrays
+instead of parsing the captures again:
+
+python store.py compare <base build> <build> --bench <bench> --type qnxcpu
+"""
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import click
+import numpy as np
+from loguru import logger
+from rich.console import Console
+from rich.table import Table
+
+STORE = Path(__file__).parent / "result" / "store"
+
+
+class SampleStore:
+    def __init__(self, root: Path = STORE) -> None:
+        self.root = Path(root)
+        # {file: (mtime, {process: (time, value)}, {higher is better process})}
+        self._cache: dict[Path, tuple[float, dict[str, tuple], set[str]]] = {}
+
+    def file(self, build: str, bench: str, per_type: str) -> Path:
+        return self.root / build / bench / f"{per_type}.npz"
+
+    def write(
+        self,
+        build: str,
+        bench: str,
+        per_type: str,
+        columns: dict[str, dict[str, np.ndarray]],
+        start: Optional[float] = None,
+        interval: float = 1.0,
+        higher_is_better: Iterable[str] = (),
+    ) -> Path:
+        """
+        Save columns returned by `Performance.parse`, snapshot `n` is stamped
+        `start + n * interval`.
+
+        Samples are merged per process: processes in `columns` replace their
+        previous samples of the same key, other processes already stored
+        (e.g. of scenarios disabled in this run) are kept.
+
+        Processes in `higher_is_better` (e.g. throughput) regress when they
+        drop instead of grow.
+        """
+        start = time.time() if start is None else start
+        file = self.file(build, bench, per_type)
+        series: dict[str, tuple] = {}
+        higher: set[str] = set()
+        if file.exists():
+            series, higher = self._read(build, bench, per_type)
+            series, higher = dict(series), higher - set(columns)
+        for process, column in columns.items():
+            snapshot = np.asarray(column["snapshot"], dtype=np.float64)
+            series[process] = (
+                start + snapshot * interval,
+                np.asarray(column["value"], dtype=np.float64),
+            )
+        higher.update(higher_is_better)
+
+        processes = list(series)
+        arrays = {
+            "processes": np.array(processes, dtype=str),
+            "higher": np.array(sorted(higher), dtype=str),
+        }
+        for i, process in enumerate(processes):
+            arrays[f"time_{i}"], arrays[f"value_{i}"] = series[process]
+
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, file)
+        self._cache.pop(file, None)
+        logger.success(f"Store {len(columns)} {per_type} processes to {file}")
+        return file
+
+    def _read(self, build: str, bench: str, per_type: str) -> tuple[dict, set[str]]:
+        file = self.file(build, bench, per_type)
+        mtime = file.stat().st_mtime
+        cached = self._cache.get(file)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        with np.load(file) as data:
+            columns = {
+                str(process): (data[f"time_{i}"], data[f"value_{i}"])
+                for i, process in enumerate(data["processes"])
+            }
+            higher = set(map(str, data["higher"])) if "higher" in data else set()
+        self._cache[file] = (mtime, columns, higher)
+        return columns, higher
+
+    def _load(self, build: str, bench: str, per_type: str) -> dict[str, tuple]:
+        return self._read(build, bench, per_type)[0]
+
+    def builds(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def benches(self, build: str) -> list[str]:
+        return sorted(p.name for p in (self.root / build).iterdir() if p.is_dir())
+
+    def processes(self, build: str, bench: str, per_type: str) -> list[str]:
+        return list(self._load(build, bench, per_type))
+
+    def series(
+        self,
+        build: str,
+        bench: str,
+        per_type: str,
+        process: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (time, value) of a process, optionally limited to [start, end).
+        """
+        times, values = self._load(build, bench, per_type)[process]
+        if start is not None or end is not None:
+            lo = 0 if start is None else np.searchsorted(times, start, "left")
+            hi = len(times) if end is None else np.searchsorted(times, end, "left")
+            times, values = times[lo:hi], values[lo:hi]
+        return times, values
+
+    def stats(
+        self,
+        build: str,
+        bench: str,
+        per_type: str,
+        process: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        percentiles: Iterable[float] = (50, 90, 99),
+    ) -> dict[str, float]:
+        """
+        Return {"count", "min", "max", "avg", "p50", ...} of a process.
+        """
+        _, values = self.series(build, bench, per_type, process, start, end)
+        percentiles = list(percentiles)
+        if not len(values):
+            return {"count": 0}
+        result = {
+            "count": len(values),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "avg": float(values.mean()),
+        }
+        for p, v in zip(percentiles, np.percentile(values, percentiles)):
+            result[f"p{p:g}"] = float(v)
+        return result
+
+    def windows(
+        self,
+        build: str,
+        bench: str,
+        per_type: str,
+        process: str,
+        window: float,
+    ) -> dict[str, np.ndarray]:
+        """
+        Return max and average of consecutive windows of `window` seconds as
+        columns {"start", "count", "max", "avg"}.
+        """
+        times, values = self.series(build, bench, per_type, process)
+        if not len(times):
+            return {k: np.empty(0) for k in ("start", "count", "max", "avg")}
+        index = ((times - times[0]) // window).astype(np.int64)
+        # samples are ordered by time, so each window is one contiguous slice
+        bounds = np.flatnonzero(np.diff(index)) + 1
+        heads = np.concatenate(([0], bounds))
+        counts = np.diff(np.concatenate((heads, [len(values)])))
+        return {
+            "start": times[0] + index[heads] * window,
+            "count": counts,
+            "max": np.maximum.reduceat(values, heads),
+            "avg": np.add.reduceat(values, heads) / counts,
+        }
+
+    def compare(
+        self,
+        base: str,
+        build: str,
+        bench: str,
+        per_type: str,
+        metric: str = "p90",
+        tolerance: float = 0.05,
+    ) -> list[dict]:
+        """
+        Compare `metric` of all processes of `build` against `base`, a process
+        regresses if it grew by more than `tolerance` (relative), or dropped
+        by more if higher is better.
+        """
+        base_processes = self.processes(base, bench, per_type)
+        _, higher = self._read(build, bench, per_type)
+        result = []
+        for process in self.processes(build, bench, per_type):
+            if process not in base_processes:
+                continue
+            before = self.stats(base, bench, per_type, process).get(metric)
+            after = self.stats(build, bench, per_type, process).get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else float(after > 0)
+            worse = -change if process in higher else change
+            result.append(
+                {
+                    "process": process,
+                    "base": before,
+                    "build": after,
+                    "change": change,
+                    "regression": worse > tolerance,
+                }
+            )
+        return result
+
+
+@click.group()
+def cli() -> None:
+    pass
+
+
+@cli.command()
+@click.argument("build")
+@click.option("--bench", required=True, help="bench name")
+@click.option("--type", "per_type", required=True, help="performance type")
+@click.option("--root", default=str(STORE), help="store directory")
+def stats(build: str, bench: str, per_type: str, root: str) -> None:
+    store = SampleStore(Path(root))
+    table = Table(title=f"{build} {bench} {per_type}")
+    columns = ("count", "min", "max", "avg", "p50", "p90", "p99")
+    table.add_column("Process")
+    for column in columns:
+        table.add_column(column, justify="right")
+    for process in store.processes(build, bench, per_type):
+        stat = store.stats(build, bench, per_type, process)
+        table.add_row(process, *(f"{stat.get(c, 0):.2f}" for c in columns))
+    Console().print(table)
+
+
+@cli.command()
+@click.argument("base")
+@click.argument("build")
+@click.option("--bench", required=True, help="bench name")
+@click.option("--type", "per_type", required=True, help="performance type")
+@click.option("--metric", default="p90", help="count, min, max, avg or pNN")
+@click.option("--tolerance", default=0.05, type=float, help="relative growth")
+@click.option("--root", default=str(STORE), help="store directory")
+def compare(
+    base: str,
+    build: str,
+    bench: str,
+    per_type: str,
+    metric: str,
+    tolerance: float,
+    root: str,
+) -> None:
+    result = SampleStore(Path(root)).compare(
+        base, build, bench, per_type, metric, tolerance
+    )
+    table = Table(title=f"{per_type} {metric}: {base} -> {build}")
+    for column in ("Process", base, build, "Change"):
+        table.add_column(column, justify="right")
+    for row in result:
+        color = "red" if row["regression"] else "green"
+        table.add_row(
+            row["process"],
+            f"{row['base']:.2f}",
+            f"{row['build']:.2f}",
+            f"[{color}]{row['change']:+.1%}[/{color}]",
+        )
+    Console().print(table)
+    if any(row["regression"] for row in result):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    cli()
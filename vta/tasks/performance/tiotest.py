@@ -0,0 +1,70 @@
+# ============================================================================================================
+# C O P Y R I G H T
+# ------------------------------------------------------------------------------------------------------------
+# \copyright (C) 2024 Robert Bosch GmbH. All rights reserved.
+# ============================================================================================================
+
+"""
+Command line and result tables of the tiotest binaries, kept apart from
+`storage.py` so they can be used without a target connection.
+"""
+import re
+
+# tiotest test numbers, skipped with -k
+TESTS = {"write": 0, "random_write": 1, "read": 2, "random_read": 3}
+RATE_PATTERN = re.compile(
+    r"^\|\s*(Write|Random Write|Read|Random Read)\s+[\d.]+\s+MBs\s*\|\s*([\d.]+)\s+s\s*"
+    r"\|\s*([\d.]+)\s+MB/s\s*\|\s*(\d*)\s*\|\s*([\d.]+)\s*%\s*\|\s*([\d.]+)\s*%\s*\|"
+)
+LATENCY_PATTERN = re.compile(
+    r"^\|\s*(Write|Random Write|Read|Random Read|Total)\s*\|\s*([\d.]+)\s+ms\s*"
+    r"\|\s*([\d.]+)\s+ms\s*\|"
+)
+# metrics which regress when they drop
+HIGHER_IS_BETTER = ("rate", "iops")
+
+
+def parse_tiotest(lines: list[str]) -> dict[str, dict[str, float]]:
+    """
+    Return {item: {"time", "rate", "iops", "usr_cpu", "sys_cpu", "latency_avg",
+    "latency_max"}} of the tiotest tables, item is e.g. "Random Read".
+    """
+    result: dict[str, dict[str, float]] = {}
+    for line in lines:
+        if match := RATE_PATTERN.match(line.strip()):
+            item = result.setdefault(match[1], {})
+            item["time"] = float(match[2])
+            item["rate"] = float(match[3])
+            if match[4]:
+                item["iops"] = float(match[4])
+            item["usr_cpu"] = float(match[5])
+            item["sys_cpu"] = float(match[6])
+        elif match := LATENCY_PATTERN.match(line.strip()):
+            item = result.setdefault(match[1], {})
+            item["latency_avg"] = float(match[2])
+            item["latency_max"] = float(match[3])
+    return result
+
+
+def tiotest_command(binary: str, directory: str, scenario: dict) -> str:
+    """
+    Build the tiotest command line of a scenario:
+    {"threads", "size" (MB per thread), "block" (bytes), "random" (ops per
+    thread), "tests": ["write", "random_write", "read", "random_read"],
+    "sync", "direct"}
+    """
+    cmd = [
+        binary,
+        f"-d {directory}",
+        f"-t {scenario.get('threads', 1)}",
+        f"-f {scenario.get('size', 64)}",
+        f"-b {scenario.get('block', 4096)}",
+        f"-r {scenario.get('random', 1000)}",
+    ]
+    tests = scenario.get("tests", list(TESTS))
+    cmd += [f"-k {number}" for name, number in TESTS.items() if name not in tests]
+    if scenario.get("sync"):
+        cmd.append("-S")
+    if scenario.get("direct"):
+        cmd.append("--direct-io")
+    return " ".join(cmd)